@@ -0,0 +1,192 @@
+"""
+Sparse fieldsets for list serializers.
+
+    GET /api/payments/?fields=id,amount,payment_date,payment_status
+    GET /api/investors/?omit=phone,kyc_status,kyc_status_display
+
+SparseFieldsetMixin drops the fields not asked for and works out which
+model lookups the remaining fields read. Views use that to narrow the
+queryset with .only(), or to skip model instances entirely and build
+rows from values() dicts (the fast path), which is what list views do.
+"""
+from functools import partial
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .metrics import timed
+
+
+def _display_value(labels, lookup, row):
+    return labels.get(row[lookup], row[lookup])
+
+
+def _field_value(field, lookup, row):
+    value = row[lookup]
+    return None if value is None else field.to_representation(value)
+
+
+def _query_list(request, name):
+    value = request.query_params.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin selecting output fields with ?fields= and ?omit=.
+
+    Fields are selected only when the serializer has a request in its
+    context, so other callers keep the full representation.
+
+    Lookups and the values() fast path are derived automatically for
+    model fields, get_<field>_display sources and dotted sources through
+    foreign keys. Other fields (properties) declare the lookups they read
+    in Meta.value_sources and a build_<field>(row) method computing the
+    value from a values() row.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        selected = _query_list(request, self.fields_query_param)
+        omitted = _query_list(request, self.omit_query_param)
+        unknown = sorted(set(selected + omitted) - set(self.fields))
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param if set(unknown) & set(selected) else self.omit_query_param:
+                    f"Unknown field(s): {', '.join(unknown)}."
+            })
+
+        keep = set(selected or self.fields) - set(omitted)
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+    # Lookups
+
+    def _field_lookup(self, name, field):
+        """(lookup, kind) for a field, kind being 'value', 'display' or 'related'"""
+        model = self.Meta.model
+        attrs = field.source_attrs
+        display = len(attrs) == 1 and attrs[0].startswith('get_') and attrs[0].endswith('_display')
+        if display:
+            attrs = [attrs[0][len('get_'):-len('_display')]]
+
+        path = []
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None, None
+            if not model_field.concrete and not model_field.many_to_one:
+                return None, None
+            path.append(attr)
+            if index < len(attrs) - 1:
+                if not model_field.many_to_one and not model_field.one_to_one:
+                    return None, None
+                model = model_field.related_model
+            elif model_field.is_relation:
+                return '__'.join(path), 'related'
+            elif display:
+                return '__'.join(path), 'display'
+        return '__'.join(path), 'value'
+
+    def lookups(self):
+        """Model lookups read by the selected fields, or None if unknown"""
+        declared = getattr(self.Meta, 'value_sources', {})
+        lookups = []
+        for name, field in self.fields.items():
+            if name in declared:
+                names = declared[name]
+            else:
+                lookup, _ = self._field_lookup(name, field)
+                if lookup is None:
+                    return None
+                names = [lookup]
+            lookups.extend(lookup for lookup in names if lookup not in lookups)
+        return lookups
+
+    def narrow_queryset(self, queryset):
+        """
+        Restrict a queryset to the columns the selected fields read.
+
+        Loads only those columns with .only() and drops select_related()
+        joins nothing reads. Querysets are returned unchanged when a field
+        has no known lookups.
+        """
+        lookups = self.lookups()
+        if lookups is None:
+            return queryset
+        columns = [lookup for lookup in lookups if lookup not in queryset.query.annotations]
+        relations = {lookup.rsplit('__', 1)[0] for lookup in columns if '__' in lookup}
+        return queryset.select_related(None).select_related(*relations).only(*columns)
+
+    # values() fast path
+
+    def _value_builders(self):
+        builders = []
+        for name, field in self.fields.items():
+            build = getattr(self, f'build_{name}', None)
+            if build is None:
+                lookup, kind = self._field_lookup(name, field)
+                if lookup is None:
+                    return None
+                if kind == 'display':
+                    model_field = self.Meta.model._meta.get_field(lookup)
+                    labels = {value: str(label) for value, label in model_field.flatchoices}
+                    build = partial(_display_value, labels, lookup)
+                elif kind == 'related' or isinstance(field, serializers.ReadOnlyField):
+                    build = itemgetter(lookup)
+                else:
+                    build = partial(_field_value, field, lookup)
+            builders.append((name, build))
+        return builders
+
+    def supports_values(self):
+        """Whether the selected fields can be built from values() rows"""
+        return self.lookups() is not None and self._value_builders() is not None
+
+    def represent_values(self, rows):
+        """Representations of values() rows, equal to serializing instances"""
+        builders = self._value_builders()
+        return [{name: build(row) for name, build in builders} for row in rows]
+
+
+class SparseListMixin:
+    """
+    Viewset mixin listing through a sparse fieldset serializer.
+
+    Uses the values() fast path when the selected fields support it and
+    falls back to model instances narrowed with .only().
+    """
+
+    def sparse_list(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        serializer = serializer_class(context=self.get_serializer_context())
+
+        if serializer.supports_values():
+            rows = queryset.values(*serializer.lookups())
+            page = self.paginate_queryset(rows)
+            with timed('serialize'):
+                data = serializer.represent_values(page if page is not None else rows)
+        else:
+            queryset = serializer.narrow_queryset(queryset)
+            page = self.paginate_queryset(queryset)
+            with timed('serialize'):
+                data = serializer_class(
+                    page if page is not None else queryset,
+                    many=True,
+                    context=self.get_serializer_context()
+                ).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,348 @@
+"""
+Per-request instrumentation exposed in Prometheus text format.
+
+RequestMetricsMiddleware records, for every request, per view:
+
+    wall time             http_request_duration_seconds
+    database queries      http_request_db_queries
+    database time         http_request_db_duration_seconds
+    response size         http_response_size_bytes
+    serialize/render time http_request_phase_seconds{phase=...}
+    repeated SQL (N+1)    http_request_repeated_queries_total
+
+Queries are captured with connection.execute_wrapper(). Statements are
+reduced to their shape (parameters are already placeholders; IN lists
+and literals are collapsed), and a shape executed
+METRICS_REPEATED_QUERY_THRESHOLD times or more in one request is flagged
+as a likely N+1. Requests slower than METRICS_SLOW_REQUEST_MS are logged
+as one JSON object on the apps.common.metrics logger.
+
+Each process aggregates in memory. With METRICS_DIR set, a process also
+writes its totals to its own file there (atomically, at most every
+METRICS_FLUSH_INTERVAL seconds), and the metrics endpoint merges the
+files of every worker, so the totals cover all gunicorn workers. Files
+of exited workers are kept so totals never go backwards; clear the
+directory when the server (not a worker) restarts.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Request wall time', DURATION_BUCKETS),
+    'http_request_db_queries': ('Database queries per request', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Database time per request', DURATION_BUCKETS),
+    'http_response_size_bytes': ('Response body size (streamed responses excluded)', SIZE_BUCKETS),
+    'http_request_phase_seconds': ('Time spent serializing and rendering response data', DURATION_BUCKETS),
+}
+COUNTERS = {
+    'http_requests_total': 'Requests by view, method and status',
+    'http_request_repeated_queries_total': 'Requests repeating one SQL shape (likely N+1)',
+    'http_slow_requests_total': 'Requests slower than METRICS_SLOW_REQUEST_MS',
+}
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def sql_shape(sql):
+    """Statement with literals and IN lists collapsed, for spotting repeats"""
+    return _LITERAL.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+class MetricsRegistry:
+    """
+    Histograms and counters of one process.
+
+    Series are keyed by metric name and a tuple of (label, value) pairs.
+    Histogram series hold one count per bucket (cumulative counts are
+    computed on output), then the overflow count and the sum.
+    """
+
+    def __init__(self, directory=''):
+        self.pid = os.getpid()
+        self.directory = directory
+        self.path = os.path.join(directory, f'metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json') if directory else ''
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.flushed_at = 0.0
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self):
+        """JSON-safe copy of the series"""
+        with self.lock:
+            return {
+                'histograms': [[name, list(labels), list(series)] for (name, labels), series in self.histograms.items()],
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            }
+
+    def flush(self, force=False):
+        """Write the series to this process's file (at most every METRICS_FLUSH_INTERVAL seconds)"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed_at = now
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temp_path, self.path)
+
+    def collect(self):
+        """Snapshots of every process: this one live, the others from their files"""
+        snapshots = [self.snapshot()]
+        if not self.directory or not os.path.isdir(self.directory):
+            return snapshots
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if not filename.endswith('.json') or path == self.path:
+                continue
+            try:
+                with open(path) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The registry of the current process (recreated after a fork)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None or _registry.pid != os.getpid():
+            _registry = MetricsRegistry(settings.METRICS_DIR)
+        return _registry
+
+
+def _label_text(labels):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+
+
+def _series_name(name, labels):
+    return f'{name}{{{_label_text(labels)}}}' if labels else name
+
+
+def render_prometheus(snapshots):
+    """Merge process snapshots and render them in Prometheus text format 0.0.4"""
+    histograms = {}
+    counters = {}
+    for snapshot in snapshots:
+        for name, labels, series in snapshot['histograms']:
+            if name not in HISTOGRAMS or len(series) != len(HISTOGRAMS[name][1]) + 2:
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.setdefault(key, [0] * len(series))
+            for index, value in enumerate(series):
+                merged[index] += value
+        for name, labels, value in snapshot['counters']:
+            if name in COUNTERS:
+                key = (name, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0) + value
+
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), series[:-1]):
+                cumulative += count
+                lines.append(f"{_series_name(name + '_bucket', (*labels, ('le', bound)))} {cumulative}")
+            lines.append(f"{_series_name(name + '_sum', labels)} {series[-1]:.6g}")
+            lines.append(f"{_series_name(name + '_count', labels)} {cumulative}")
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f'{_series_name(name, labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class RequestRecord:
+    """Measurements of one request, filled in while it runs"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.phases = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            shape = sql_shape(sql)
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+                self.shapes[shape] += 1
+
+    def add_phase(self, phase, seconds):
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to a phase of the current request:
+
+        with timed('serialize'):
+            data = serializer.data
+    """
+    record = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if record is not None:
+            record.add_phase(phase, time.perf_counter() - started)
+
+
+@contextmanager
+def track_queries():
+    """
+    Count this thread's queries towards the current request.
+
+    For work a request hands to other threads (which use their own
+    database connections); the request's context must be copied to the
+    thread, as sync_to_async does.
+    """
+    record = _current.get()
+    with ExitStack() as stack:
+        if record is not None:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(record))
+        yield
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-view request metrics; see the module docstring.
+
+    Place first in MIDDLEWARE so the measured time covers the whole stack.
+    """
+    _warned_shapes = set()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        record = RequestRecord()
+        token = _current.set(record)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(record))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, record, time.perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        # Time DRF's rendering, which happens after the view returns
+        record = _current.get()
+        if record is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: record.add_phase('render', time.perf_counter() - started)
+            )
+        return response
+
+    def record(self, request, response, record, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else '<unmatched>'
+        labels = {'view': view}
+        registry = get_registry()
+
+        registry.inc('http_requests_total', {**labels, 'method': request.method, 'status': response.status_code})
+        registry.observe('http_request_duration_seconds', labels, duration)
+        registry.observe('http_request_db_queries', labels, record.queries)
+        registry.observe('http_request_db_duration_seconds', labels, record.db_time)
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+            registry.observe('http_response_size_bytes', labels, size)
+        for phase, seconds in record.phases.items():
+            registry.observe('http_request_phase_seconds', {**labels, 'phase': phase}, seconds)
+
+        threshold = settings.METRICS_REPEATED_QUERY_THRESHOLD
+        repeated = [(shape, count) for shape, count in record.shapes.most_common(3) if count >= threshold]
+        if repeated:
+            registry.inc('http_request_repeated_queries_total', labels)
+            for shape, count in repeated:
+                if (view, shape) not in self._warned_shapes:
+                    self._warned_shapes.add((view, shape))
+                    logger.warning('Repeated query in %s (%d times): %s', view, count, shape[:500])
+
+        if duration * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+            registry.inc('http_slow_requests_total', labels)
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 1),
+                'db_queries': record.queries,
+                'db_ms': round(record.db_time * 1000, 1),
+                'response_bytes': size,
+                'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in record.phases.items()},
+                'repeated_queries': [{'sql': shape[:500], 'count': count} for shape, count in repeated],
+            }))
+
+        registry.flush()
@@ -0,0 +1,264 @@
+"""
+List pagination shared by the API viewsets.
+
+KeysetPagination keeps the default page-number responses and adds an
+opt-in keyset (cursor) mode. A keyset page filters on the sort key of the
+last row seen instead of using OFFSET, and no COUNT(*) is run, so the
+thousandth page costs the same as the first one when a matching index
+exists.
+
+    GET /api/payments/?pagination=cursor
+    GET /api/payments/?pagination=cursor&cursor=<next cursor>
+
+Either mode accepts ?count=estimate to report the planner's row estimate
+instead of an exact COUNT(*) (PostgreSQL; other databases count exactly).
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import Paginator, InvalidPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _cursor_value(value):
+    """JSON-safe form of a keyset value, parsed back with Field.to_python()"""
+    if isinstance(value, (date, Decimal)):
+        return value.isoformat() if isinstance(value, date) else str(value)
+    return value
+
+
+def estimate_count(queryset):
+    """
+    Row count for a queryset from the query planner.
+
+    Uses the top-level row estimate of EXPLAIN on PostgreSQL, which reads
+    statistics instead of scanning the table. Falls back to an exact
+    count on other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def is_keyset_request(request):
+    """Whether a request asks for keyset (cursor) pages"""
+    return (
+        request.query_params.get(KeysetPagination.mode_query_param) == 'cursor'
+        or KeysetPagination.cursor_query_param in request.query_params
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Django paginator counting with estimate_count()"""
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number):
+        # The estimate may be low; pages past it are returned empty
+        # instead of raising EmptyPage
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    The keyset follows the queryset's ordering (the view's default
+    ordering, or ?ordering=) with the primary key appended as a
+    tiebreaker. Only non-null columns of the model can be part of a
+    keyset; other orderings are rejected in keyset mode.
+
+    Keyset responses contain next, previous and results, plus count when
+    ?count= is given. Both modes accept ?page_size= (up to 500).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count_mode = request.query_params.get(self.count_query_param)
+        if self.count_mode not in (None, 'exact', 'estimate'):
+            raise ValidationError({self.count_query_param: "Must be 'exact' or 'estimate'."})
+
+        self.keyset = is_keyset_request(request)
+        if not self.keyset:
+            if self.count_mode == 'estimate':
+                self.django_paginator_class = EstimatedCountPaginator
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_keyset(queryset)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            response = super().get_paginated_response(data)
+            if self.count_mode == 'estimate':
+                response.data['count_is_estimate'] = True
+            return response
+
+        fields = [('next', self.get_next_link()), ('previous', self.get_previous_link())]
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+            if self.count_mode == 'estimate':
+                fields.insert(1, ('count_is_estimate', True))
+        return Response(OrderedDict(fields + [('results', data)]))
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return response
+
+    # Keyset mode
+
+    def paginate_keyset(self, queryset):
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.count = None
+        if self.count_mode == 'exact':
+            self.count = queryset.count()
+        elif self.count_mode == 'estimate':
+            self.count = estimate_count(queryset)
+
+        # values() rows need the keyset columns to build cursors
+        if queryset._fields is not None:
+            missing = [name for name, _ in self.ordering if name not in queryset._fields]
+            if missing:
+                queryset = queryset.values(*queryset._fields, *missing)
+
+        cursor = self.decode_cursor()
+        reverse = bool(cursor and cursor['reverse'])
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(cursor['position'], reverse))
+        order_by = [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.ordering
+        ]
+        page_size = self.get_page_size(self.request)
+        rows = list(queryset.order_by(*order_by)[:page_size + 1])
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.first_position = self.position(rows[0]) if rows else None
+        self.last_position = self.position(rows[-1]) if rows else None
+        if not rows and cursor:
+            # Paged past the end (or start): link back to where we came from
+            self.first_position = self.last_position = cursor['position']
+            self.has_next, self.has_previous = reverse, not reverse
+        return rows
+
+    def get_keyset_ordering(self, queryset):
+        """[(field name, descending)] for the queryset, ending with the pk"""
+        meta = queryset.model._meta
+        pk = meta.pk.name
+        ordering = []
+        for term in queryset.query.order_by or queryset.query.get_meta().ordering or ():
+            if not isinstance(term, str) or term == '?':
+                raise ValidationError({self.mode_query_param: 'This ordering cannot be used with cursor pagination.'})
+            descending = term.startswith('-')
+            name = term.lstrip('-')
+            name = pk if name == 'pk' else name
+            try:
+                field = meta.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete or field.null or field.is_relation:
+                raise ValidationError({
+                    self.mode_query_param: f"Ordering by '{name}' cannot be used with cursor pagination."
+                })
+            ordering.append((field.attname, descending))
+            if name == pk:
+                break
+        else:
+            descending = ordering[-1][1] if ordering else True
+            ordering.append((meta.pk.attname, descending))
+        self.fields = {field.attname: field for field in meta.concrete_fields}
+        return ordering
+
+    def keyset_filter(self, position, reverse):
+        """Rows after (or before, when reverse) a position in the ordering"""
+        conditions = []
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {prior: position[prior] for prior, _ in self.ordering[:index]}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': position[name]}))
+
+        # Redundant bound on the leading column lets the database use a
+        # range scan on the composite index
+        name, descending = self.ordering[0]
+        bound = Q(**{f"{name}__{'lte' if descending != reverse else 'gte'}": position[name]})
+        return bound & reduce(or_, conditions)
+
+    def position(self, row):
+        if isinstance(row, dict):
+            return {name: row[name] for name, _ in self.ordering}
+        return {name: getattr(row, name) for name, _ in self.ordering}
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            'o': [('-' if descending else '') + name for name, descending in self.ordering],
+            'p': [_cursor_value(position[name]) for name, _ in self.ordering],
+            'r': int(reverse),
+        }
+        data = json.dumps(payload, separators=(',', ':')).encode()
+        cursor = base64.urlsafe_b64encode(data).decode().rstrip('=')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self):
+        encoded = self.request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            ordering = [('-' if descending else '') + name for name, descending in self.ordering]
+            if payload['o'] != ordering or len(payload['p']) != len(ordering):
+                raise ValueError('Cursor does not match the ordering')
+            position = {
+                name: self.fields[name].to_python(value)
+                for (name, _), value in zip(self.ordering, payload['p'])
+            }
+            return {'position': position, 'reverse': bool(payload['r'])}
+        except (TypeError, ValueError, KeyError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
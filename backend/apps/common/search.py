@@ -0,0 +1,172 @@
+"""
+Indexed, ranked search for the list endpoints.
+
+Searchable models keep the text of their search_fields in a maintained
+search_text column, so a search reads one indexed column of one table
+instead of ILIKE '%term%' over several columns and joins:
+
+    PostgreSQL  GIN index with pg_trgm trigram ops on search_text; terms
+                match with ILIKE (served by the index), results are
+                ranked by trigram word similarity.
+    SQLite      FTS5 table with the trigram tokenizer over search_text,
+                kept in sync by triggers; results are ranked by bm25.
+
+Other databases, terms shorter than three characters (below trigram
+size) and SQLite builds without FTS5 fall back to a plain substring
+match on search_text. The index is created by the apps' migrations
+with install_search_index() and can be rebuilt with
+`python manage.py rebuild_search_index`.
+"""
+from django.db import connections
+from rest_framework import filters
+
+from .pagination import is_keyset_request
+
+
+SEARCH_COLUMN = 'search_text'
+RANK_ANNOTATION = 'search_rank'
+
+# Shortest term a trigram index can serve
+MIN_INDEXED_TERM = 3
+
+
+def _fts_table(table):
+    return f'{table}_fts'
+
+
+def install_search_index(schema_editor, table):
+    """Create the search index for a table's search_text column"""
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(table + "_search_trgm")} '
+            f'ON {quote(table)} USING gin ({SEARCH_COLUMN} gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite' and _sqlite_has_fts5(schema_editor.connection):
+        fts = _fts_table(table)
+        remove_search_index(schema_editor, table)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {quote(fts)} USING fts5("
+            f"{SEARCH_COLUMN}, content={quote(table)}, content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {quote(fts + "_ai")} AFTER INSERT ON {quote(table)} BEGIN '
+            f'INSERT INTO {quote(fts)}(rowid, {SEARCH_COLUMN}) VALUES (new.id, new.{SEARCH_COLUMN}); END'
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {quote(fts + "_ad")} AFTER DELETE ON {quote(table)} BEGIN '
+            f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {SEARCH_COLUMN}) "
+            f"VALUES ('delete', old.id, old.{SEARCH_COLUMN}); END"
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {quote(fts + "_au")} AFTER UPDATE OF {SEARCH_COLUMN} ON {quote(table)} BEGIN '
+            f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {SEARCH_COLUMN}) "
+            f"VALUES ('delete', old.id, old.{SEARCH_COLUMN}); "
+            f'INSERT INTO {quote(fts)}(rowid, {SEARCH_COLUMN}) VALUES (new.id, new.{SEARCH_COLUMN}); END'
+        )
+        schema_editor.execute(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')")
+
+
+def remove_search_index(schema_editor, table):
+    """Drop the search index created by install_search_index()"""
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {quote(table + "_search_trgm")}')
+    elif vendor == 'sqlite':
+        fts = _fts_table(table)
+        for suffix in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {quote(fts + suffix)}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {quote(fts)}')
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def _has_fts_table(connection, table):
+    """Whether the FTS5 table exists (cached per connection)"""
+    cache = connection.__dict__.setdefault('_search_fts_tables', {})
+    if table not in cache:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [_fts_table(table)]
+            )
+            cache[table] = cursor.fetchone() is not None
+    return cache[table]
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter over the model's indexed search_text column.
+
+    Every term must match (as with SearchFilter). Matching rows are
+    annotated with search_rank, higher meaning more relevant; see
+    RankedOrderingFilter. Views whose model has no search_text column
+    get the default SearchFilter behaviour.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        model = queryset.model
+        if not terms or SEARCH_COLUMN not in {field.name for field in model._meta.concrete_fields}:
+            return super().filter_queryset(request, queryset, view)
+
+        connection = connections[queryset.db]
+        table = model._meta.db_table
+        indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM]
+        short = [term for term in terms if len(term) < MIN_INDEXED_TERM]
+
+        if connection.vendor == 'sqlite' and indexed and _has_fts_table(connection, table):
+            # Joined rather than a correlated subquery, so MATCH runs once
+            # per query and not once per matching row
+            quote = connection.ops.quote_name
+            fts = quote(_fts_table(table))
+            queryset = queryset.extra(
+                tables=[_fts_table(table)],
+                where=[f'{fts}.rowid = {quote(table)}.{quote(model._meta.pk.column)}', f'{fts} MATCH %s'],
+                params=[' '.join(_fts_phrase(term) for term in indexed)],
+                select={RANK_ANNOTATION: f'-{fts}.rank'},
+            )
+        else:
+            short = terms
+            if connection.vendor == 'postgresql':
+                from django.contrib.postgres.search import TrigramWordSimilarity
+                queryset = queryset.annotate(**{
+                    RANK_ANNOTATION: TrigramWordSimilarity(' '.join(terms), SEARCH_COLUMN)
+                })
+
+        for term in short:
+            queryset = queryset.filter(**{f'{SEARCH_COLUMN}__icontains': term})
+        return queryset
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter putting the best search matches first.
+
+    Without an explicit ?ordering=, searched querysets are ordered by
+    search_rank and then the view's default ordering. Keyset pages keep
+    the default ordering, since the rank is not a stable cursor key.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = queryset.query
+        ranked = (
+            (RANK_ANNOTATION in query.annotations or RANK_ANNOTATION in query.extra)
+            and self.ordering_param not in request.query_params
+            and not is_keyset_request(request)
+        )
+        if ranked:
+            ordering = self.get_default_ordering(view) or []
+            return queryset.order_by(f'-{RANK_ANNOTATION}', *ordering)
+        return super().filter_queryset(request, queryset, view)
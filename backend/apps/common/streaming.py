@@ -0,0 +1,43 @@
+"""
+Streaming responses that stay streamed under the ASGI server.
+
+Django 4.2's ASGI handler reads a response built on a synchronous
+iterator with sync_to_async(list), so an export or a downloaded ZIP is
+produced in full and held in memory before the first byte is sent. The
+responses here hand the iterator to the request's sync thread one chunk
+at a time instead; under WSGI they behave like their Django parents.
+
+Iterators that read from the database must keep running in the thread
+that owns the request's connection, so chunks are pulled with
+thread_sensitive=True.
+"""
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+
+
+_END = object()
+
+
+class ChunkedAsyncIterationMixin:
+    """Serve a synchronous streaming_content to ASGI one chunk per thread hop"""
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+
+        iterator = iter(self.streaming_content)
+        next_chunk = sync_to_async(next, thread_sensitive=True)
+        while (part := await next_chunk(iterator, _END)) is not _END:
+            yield part
+
+
+class ChunkedStreamingHttpResponse(ChunkedAsyncIterationMixin, StreamingHttpResponse):
+    """StreamingHttpResponse for generators, streamed under WSGI and ASGI"""
+
+
+class ChunkedFileResponse(ChunkedAsyncIterationMixin, FileResponse):
+    """FileResponse streamed under WSGI and ASGI, read in 64 KiB blocks"""
+
+    block_size = 64 * 1024
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages of /api/payments/ (ordered by -payment_date, -created_at, -id)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        # Several payments per date, so pages split runs of equal sort keys
+        Payment.objects.bulk_create([
+            Payment(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('100.00') + index,
+                currency='USD',
+                payment_status='VERIFIED',
+                payment_date=date(2024, 1, 1) + timedelta(days=index // 4),
+                due_date=date(2024, 1, 1),
+            )
+            for index in range(23)
+        ])
+        cls.expected = list(
+            Payment.objects.order_by('-payment_date', '-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_walks_every_row_once_forward_and_back(self):
+        pages = [self.get('/api/payments/', {'pagination': 'cursor', 'page_size': 5})]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+
+        self.assertEqual([len(page['results']) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([row['id'] for page in pages for row in page['results']], self.expected)
+        self.assertNotIn('count', pages[0])
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.get(backwards[-1]['previous']))
+        self.assertEqual(
+            [[row['id'] for row in page['results']] for page in backwards],
+            [[row['id'] for row in page['results']] for page in reversed(pages)],
+        )
+
+    def test_follows_the_requested_ordering(self):
+        first = self.get('/api/payments/', {'pagination': 'cursor', 'page_size': 10, 'ordering': 'amount'})
+        second = self.get(first['next'])
+
+        amounts = [Decimal(row['amount']) for row in first['results'] + second['results']]
+        self.assertEqual(amounts, sorted(amounts))
+        self.assertEqual(len(amounts), 20)
+
+    def test_exact_count_on_request(self):
+        page = self.get('/api/payments/', {'pagination': 'cursor', 'count': 'exact'})
+        self.assertEqual(page['count'], 23)
+
+    def test_rejects_nullable_ordering_and_bad_cursors(self):
+        response = self.client.get('/api/payments/', {'pagination': 'cursor', 'ordering': 'verification_date'})
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.get('/api/payments/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+        # A cursor from one ordering can't be replayed against another
+        by_amount = self.get('/api/payments/', {'pagination': 'cursor', 'page_size': 5, 'ordering': 'amount'})
+        cursor = by_amount['next'].split('cursor=')[1].split('&')[0]
+        self.assertEqual(self.client.get('/api/payments/', {'cursor': cursor}).status_code, 404)
+
+    def test_page_number_mode_is_unchanged(self):
+        page = self.get('/api/payments/', {'page_size': 5, 'page': 2})
+        self.assertEqual(page['count'], 23)
+        self.assertEqual([row['id'] for row in page['results']], self.expected[5:10])
@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.common.search import _fts_table, _has_fts_table
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+def fts_available():
+    return connection.vendor == 'sqlite' and _has_fts_table(connection, Investor._meta.db_table)
+
+
+class IndexedSearchTests(TestCase):
+    """Search over search_text, through the FTS5 index on SQLite"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.jane = cls.investor('Jane', 'Wanjiru', 'jane@example.com')
+        cls.john = cls.investor('John', 'Kamau', 'john@example.com')
+
+    @staticmethod
+    def investor(first_name, last_name, email):
+        return Investor.objects.create(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def require_fts(self):
+        if not fts_available():
+            self.skipTest('needs SQLite with FTS5')
+
+    def search(self, path, term):
+        response = self.client.get(path, {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def fts_rowids(self, model, term):
+        table = _fts_table(model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM "{table}" WHERE "{table}" MATCH %s', [f'"{term}"'])
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def test_substring_and_multi_term_search(self):
+        self.assertEqual(self.search('/api/investors/', 'anjir'), [self.jane.pk])
+        self.assertEqual(self.search('/api/investors/', 'example.com'), [self.jane.pk, self.john.pk])
+        self.assertEqual(self.search('/api/investors/', 'john kamau'), [self.john.pk])
+        self.assertEqual(self.search('/api/investors/', 'jane kamau'), [])
+        # Shorter than a trigram: plain substring match
+        self.assertEqual(self.search('/api/investors/', 'Wa'), [self.jane.pk])
+
+    def test_renamed_investor_is_found_by_the_new_name(self):
+        self.jane.last_name = 'Achieng'
+        self.jane.save()
+
+        self.assertEqual(self.search('/api/investors/', 'achieng'), [self.jane.pk])
+        self.assertEqual(self.search('/api/investors/', 'wanjiru'), [])
+
+    def test_payments_follow_their_investor_name(self):
+        payment = Payment.objects.create(
+            investor=self.jane,
+            payment_type='QUARTERLY',
+            amount=Decimal('500.00'),
+            currency='USD',
+            payment_status='PENDING',
+            payment_date=date(2024, 3, 31),
+            due_date=date(2024, 3, 31),
+            reference_number='MPESA-QK12AB',
+        )
+        self.assertEqual(self.search('/api/payments/', 'qk12ab'), [payment.pk])
+        self.assertEqual(self.search('/api/payments/', 'wanjiru'), [payment.pk])
+
+        self.jane.last_name = 'Achieng'
+        self.jane.save()
+        self.assertEqual(self.search('/api/payments/', 'achieng'), [payment.pk])
+        self.assertEqual(self.search('/api/payments/', 'wanjiru'), [])
+
+    def test_triggers_keep_the_fts_table_in_sync(self):
+        self.require_fts()
+        self.assertEqual(self.fts_rowids(Investor, 'kamau'), [self.john.pk])
+
+        self.john.first_name = 'Johnny'
+        self.john.last_name = 'Otieno'
+        self.john.save()
+        self.assertEqual(self.fts_rowids(Investor, 'kamau'), [])
+        self.assertEqual(self.fts_rowids(Investor, 'otieno'), [self.john.pk])
+
+        self.john.delete()
+        self.assertEqual(self.fts_rowids(Investor, 'otieno'), [])
+
+        created = self.investor('Akinyi', 'Otieno', 'akinyi@example.com')
+        self.assertEqual(self.fts_rowids(Investor, 'otieno'), [created.pk])
+
+    def test_search_results_are_ranked(self):
+        self.require_fts()
+        # Created first, so the default ordering (-created_at) would list it last
+        often = self.investor('Njeri', 'Njeri', 'njeri.njeri@example.com')
+        once = self.investor('Mary', 'Njeri', 'mary@example.com')
+
+        response = self.client.get('/api/investors/', {'search': 'njeri'})
+        self.assertEqual([row['id'] for row in response.data['results']], [often.pk, once.pk])
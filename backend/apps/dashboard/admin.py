@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import KpiSnapshot
+
+
+@admin.register(KpiSnapshot)
+class KpiSnapshotAdmin(admin.ModelAdmin):
+    """
+    Read-only admin view of the KPI snapshots.
+    Rows are written by the snapshot_kpis command.
+    """
+    list_display = [
+        'date',
+        'period',
+        'as_of',
+        'total_committed',
+        'total_raised_usd',
+        'raised_in_period_usd',
+        'collection_rate',
+        'overdue_count',
+        'overdue_amount_usd',
+    ]
+    list_filter = ['period']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
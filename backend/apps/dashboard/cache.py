@@ -0,0 +1,145 @@
+"""
+Versioned response cache for the dashboard endpoints.
+
+A single data version lives in the cache. Every write to
+payments or investors bumps it (see signals.py), which makes all cached
+dashboard responses unreachable at once; nothing has to be deleted.
+Responses are keyed by data version, endpoint, query parameters and the
+current date (overdue figures change at midnight), and the same key
+doubles as the ETag so polling clients get 304 Not Modified.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+
+VERSION_KEY = 'dashboard:data-version'
+STATS_KEYS = {
+    'hits': 'dashboard:stats:hits',
+    'misses': 'dashboard:stats:misses',
+    'not_modified': 'dashboard:stats:not-modified',
+}
+
+
+def get_cache():
+    """Return the cache backend configured for the dashboard"""
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def data_version():
+    """Return the current dashboard data version, initializing it if needed"""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version lost to eviction or a restart
+        # never reuses a version that may still have cached responses.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """
+    Invalidate every cached dashboard response.
+
+    Writes a fresh clock-based version instead of incrementing, because
+    incr() is a non-atomic read and write on the file-based cache: two
+    workers bumping at once could both write version + 1. Concurrent
+    bumps now each leave a version that differs from the old one.
+    """
+    get_cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _increment_stat(name):
+    # Approximate on the file-based cache, whose incr() isn't atomic
+    # across processes; exact on Redis
+    cache = get_cache()
+    key = STATS_KEYS[name]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cache_stats():
+    """
+    Return hit/miss counters for tuning.
+
+    Counters are shared across workers when the cache backend is, and
+    may miss concurrent increments on the file-based cache.
+    """
+    cache = get_cache()
+    stats = {name: cache.get(key) or 0 for name, key in STATS_KEYS.items()}
+    served = stats['hits'] + stats['not_modified']
+    total = served + stats['misses']
+    stats['hit_ratio'] = round(served / total, 4) if total else 0
+    stats['data_version'] = data_version()
+    return stats
+
+
+def reset_cache_stats():
+    """Reset the hit/miss counters"""
+    get_cache().delete_many(list(STATS_KEYS.values()))
+
+
+def cache_key(endpoint, params, version=None):
+    """
+    Build the cache key (also used as the ETag) for a dashboard response.
+
+    Args:
+        endpoint: Name identifying the endpoint
+        params: Iterable of (name, values) query parameter pairs
+        version: Data version (defaults to the current one)
+    """
+    if version is None:
+        version = data_version()
+    source = json.dumps(
+        [version, endpoint, sorted(params), timezone.now().date().isoformat()],
+        default=str
+    )
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+def cached_dashboard_view(view_func):
+    """
+    Cache a dashboard API view's response data until the next data write.
+
+    Apply below @api_view/@permission_classes so authentication and
+    permission checks still run on every request.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        params = list(request.query_params.lists()) + sorted(kwargs.items())
+        digest = cache_key(view_func.__name__, params)
+        etag = f'"{digest}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            _increment_stat('not_modified')
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = get_cache()
+        key = f'dashboard:response:{digest}'
+        data = cache.get(key)
+        if data is not None:
+            _increment_stat('hits')
+            return Response(data, headers=headers)
+
+        _increment_stat('misses')
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.DASHBOARD_CACHE_TIMEOUT)
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    return wrapper
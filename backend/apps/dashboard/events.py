@@ -0,0 +1,332 @@
+"""
+Live dashboard events, streamed to browsers as server-sent events.
+
+Model signals (see signals.py) publish compact events once the writing
+transaction commits. A broker carries them to every server process, where
+the process's EventHub hands them to the /api/dashboard/events/ streams
+connected to it:
+
+    local     in-process only (runserver, a single worker)
+    file      appended to DASHBOARD_EVENTS_FILE, tailed by every process
+    postgres  NOTIFY on a channel, LISTENed to by every process
+
+Besides the data events, each hub with listeners recomputes the overview
+KPIs at most every DASHBOARD_EVENTS_KPI_INTERVAL seconds after a write and
+sends the fields that changed as a 'kpis' event, so the cost is one
+aggregate per process however many browsers are connected.
+
+Browsers can't send an Authorization header with EventSource, so a
+stream is opened with a ticket from POST /api/dashboard/events/ticket/
+instead of the access token: a signed user id that is only accepted by
+the events endpoint and expires after DASHBOARD_EVENTS_TICKET_MAX_AGE
+seconds, so the URLs that end up in access logs and browser history
+carry no reusable credential.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import connection, connections
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'dashboard_events'
+
+# Events buffered per stream; a stream further behind is told to resync
+QUEUE_SIZE = 100
+
+# Truncate the file broker's log once it grows beyond this many bytes
+FILE_MAX_BYTES = 1024 * 1024
+
+# Signing salt: tickets are valid for the events stream only
+TICKET_SALT = 'apps.dashboard.events.ticket'
+
+
+class EventHub:
+    """
+    Subscribers of one process.
+
+    Streams subscribe from the event loop and read their asyncio queue;
+    broadcast() may be called from any thread.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self._kpi_timer = None
+        self._kpis = None
+
+    def subscribe(self):
+        """Register a stream; call from the event loop serving it"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if not self._started:
+                get_broker().start(self)
+                self._started = True
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def broadcast(self, event):
+        """Queue an event on every stream of this process"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, event)
+            except RuntimeError:
+                # Loop closed under a stream that never unsubscribed
+                self.unsubscribe((loop, queue))
+        if subscribers and event['event'] != 'kpis':
+            self._schedule_kpis()
+
+    def _schedule_kpis(self):
+        with self._lock:
+            if self._kpi_timer is not None:
+                return
+            self._kpi_timer = threading.Timer(settings.DASHBOARD_EVENTS_KPI_INTERVAL, self._send_kpis)
+            self._kpi_timer.daemon = True
+            self._kpi_timer.start()
+
+    def _send_kpis(self):
+        from .kpis import format_overview, overview_kpis
+
+        with self._lock:
+            self._kpi_timer = None
+        try:
+            kpis = format_overview(overview_kpis())
+        except Exception:
+            logger.exception('Could not compute dashboard KPIs')
+            return
+        finally:
+            connections.close_all()
+
+        changed = {key: value for key, value in kpis.items() if self._kpis is None or self._kpis.get(key) != value}
+        self._kpis = kpis
+        if changed:
+            self.broadcast({'event': 'kpis', 'data': changed})
+
+
+def _deliver(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # The client can't keep up; replace its backlog with one resync
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({'event': 'resync', 'data': {}})
+
+
+class LocalBroker:
+    """Delivers events to the publishing process only"""
+
+    def start(self, hub):
+        pass
+
+    def publish(self, event):
+        get_hub().broadcast(event)
+
+
+class FileBroker:
+    """
+    Fans events out through an append-only file.
+
+    Each event is one JSON line appended under an exclusive lock; every
+    process with listeners tails the file from a background thread.
+    Publishers truncate the file once it exceeds FILE_MAX_BYTES and tailers
+    start over from the top when they notice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def publish(self, event):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with open(self.path, 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                if handle.tell() > FILE_MAX_BYTES:
+                    handle.truncate(0)
+                handle.write(line)
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def start(self, hub):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        open(self.path, 'a').close()
+        threading.Thread(target=self._tail, args=(hub,), name='dashboard-events', daemon=True).start()
+
+    def _tail(self, hub):
+        with open(self.path) as handle:
+            handle.seek(0, os.SEEK_END)
+            pending = ''
+            while True:
+                pending += handle.readline()
+                if pending.endswith('\n'):
+                    _broadcast_json(hub, pending)
+                    pending = ''
+                    continue
+                time.sleep(0.2)
+                if os.stat(self.path).st_size < handle.tell():
+                    handle.seek(0)
+                    pending = ''
+
+
+class PostgresBroker:
+    """
+    Fans events out with PostgreSQL NOTIFY.
+
+    Publishing uses the request's own connection; every process with
+    listeners keeps one extra connection LISTENing on CHANNEL. Payloads
+    must stay under PostgreSQL's 8000 byte limit.
+    """
+
+    def publish(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(event, separators=(',', ':'))])
+
+    def start(self, hub):
+        threading.Thread(target=self._listen, args=(hub,), name='dashboard-events', daemon=True).start()
+
+    def _listen(self, hub):
+        while True:
+            listener = None
+            try:
+                listener = connection.get_new_connection(connection.get_connection_params())
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([listener], [], [], 30) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        _broadcast_json(hub, listener.notifies.pop(0).payload)
+            except Exception:
+                logger.exception('Dashboard event listener lost its connection; reconnecting')
+                time.sleep(5)
+            finally:
+                if listener is not None:
+                    listener.close()
+
+
+def _broadcast_json(hub, payload):
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        logger.warning('Ignoring malformed dashboard event %r', payload)
+        return
+    hub.broadcast(event)
+
+
+_hub = None
+_broker = None
+_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    with _lock:
+        if _hub is None:
+            _hub = EventHub()
+        return _hub
+
+
+def get_broker():
+    """The broker selected by DASHBOARD_EVENTS_BACKEND"""
+    global _broker
+    with _lock:
+        if _broker is None:
+            backend = settings.DASHBOARD_EVENTS_BACKEND
+            if backend == 'local':
+                _broker = LocalBroker()
+            elif backend == 'file':
+                _broker = FileBroker(settings.DASHBOARD_EVENTS_FILE)
+            elif backend == 'postgres':
+                _broker = PostgresBroker()
+            else:
+                raise ValueError(f'Unknown DASHBOARD_EVENTS_BACKEND {backend!r}')
+        return _broker
+
+
+def publish(name, data):
+    """
+    Publish an event to every connected stream.
+
+    Call once the write is committed (signals.py uses
+    transaction.on_commit). Failures are logged, never raised: live
+    updates must not break the write that triggered them.
+    """
+    try:
+        get_broker().publish({'event': name, 'data': data})
+    except Exception:
+        logger.exception('Could not publish dashboard event %s', name)
+
+
+def issue_ticket(user):
+    """Short-lived ticket opening an events stream as user"""
+    return signing.TimestampSigner(salt=TICKET_SALT).sign(str(user.pk))
+
+
+def ticket_user(ticket):
+    """Active user a ticket was issued to, or None if it is invalid or expired"""
+    try:
+        user_id = signing.TimestampSigner(salt=TICKET_SALT).unsign(
+            ticket, max_age=settings.DASHBOARD_EVENTS_TICKET_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def format_sse(event):
+    """One event in the text/event-stream wire format"""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], separators=(',', ':'))}\n\n"
+
+
+async def stream():
+    """
+    Server-sent events for one client of this process's hub.
+
+    Sends a comment every DASHBOARD_EVENTS_KEEPALIVE seconds so proxies
+    keep the connection open, and ends after DASHBOARD_EVENTS_MAX_AGE
+    seconds: Django 4.2 doesn't tell a streaming response that its client
+    went away, so this bounds abandoned streams, and EventSource reconnects
+    by itself.
+    """
+    hub = get_hub()
+    subscriber = hub.subscribe()
+    _, queue = subscriber
+    deadline = time.monotonic() + settings.DASHBOARD_EVENTS_MAX_AGE
+    try:
+        yield f'retry: {settings.DASHBOARD_EVENTS_RETRY_MS}\n\n'
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.DASHBOARD_EVENTS_KEEPALIVE, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(subscriber)
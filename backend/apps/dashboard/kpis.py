@@ -0,0 +1,134 @@
+"""
+KPI engine for the dashboard.
+
+Each function computes a whole family of metrics in a single aggregate
+query using conditional (filtered) aggregation, so a dashboard request
+costs one round trip per table instead of one per number. Money raised
+is summed from the investor ledger, which holds verified totals already
+converted to USD.
+"""
+from decimal import Decimal
+
+from django.db.models import Sum, Count, Q
+from django.utils import timezone
+
+from apps.investors.models import Investor
+from apps.payments.models import InvestorLedger, Payment
+
+
+# Project target (fixed at $800,000)
+PROJECT_TARGET = Decimal('800000.00')
+
+
+def investor_metrics():
+    """
+    Investor counts and committed capital in one query.
+
+    Returns:
+        Dict with total_investors, active_investors, lp_count, gp_count,
+        kyc_pending_count and total_committed.
+    """
+    metrics = Investor.objects.aggregate(
+        total_investors=Count('id'),
+        active_investors=Count('id', filter=Q(investor_status='ACTIVE')),
+        lp_count=Count('id', filter=Q(investor_type='LP')),
+        gp_count=Count('id', filter=Q(investor_type='GP')),
+        kyc_pending_count=Count('id', filter=Q(kyc_status='PENDING')),
+        total_committed=Sum('share_amount'),
+    )
+    metrics['total_committed'] = metrics['total_committed'] or Decimal('0.00')
+    return metrics
+
+
+def payment_metrics(today=None):
+    """
+    Payment counts by status in one query, and total raised (USD) from
+    the investor ledgers in another.
+
+    A pending payment is overdue once its due date has passed and "not
+    due" while its due date is today or later; pending payments without a
+    due date count as neither.
+
+    Args:
+        today: Reference date for overdue checks (defaults to today)
+
+    Returns:
+        Dict with total_raised, verified_count, pending_count,
+        pending_not_due_count, failed_count and overdue_count.
+    """
+    today = today or timezone.now().date()
+    pending = Q(payment_status='PENDING')
+    overdue = pending & Q(due_date__lt=today)
+
+    metrics = Payment.objects.aggregate(
+        verified_count=Count('id', filter=Q(payment_status='VERIFIED')),
+        pending_count=Count('id', filter=pending),
+        pending_not_due_count=Count('id', filter=pending & Q(due_date__gte=today)),
+        failed_count=Count('id', filter=Q(payment_status='FAILED')),
+        overdue_count=Count('id', filter=overdue),
+    )
+    total_raised = InvestorLedger.objects.aggregate(total=Sum('total_verified_usd'))['total']
+    metrics['total_raised'] = Decimal(total_raised or 0).quantize(Decimal('0.01'))
+    return metrics
+
+
+def overview_kpis(today=None):
+    """
+    All overview KPIs, derived from investor_metrics() and payment_metrics().
+
+    Args:
+        today: Reference date for overdue checks (defaults to today)
+    """
+    investors = investor_metrics()
+    payments = payment_metrics(today)
+
+    total_committed = investors['total_committed']
+    total_raised = payments['total_raised']
+    total_outstanding = total_committed - total_raised
+
+    # Collection rate (of committed amount)
+    collection_rate = 0
+    if total_committed > 0:
+        collection_rate = float((total_raised / total_committed) * 100)
+
+    # Target achieved rate (of project target)
+    target_achieved_rate = 0
+    if PROJECT_TARGET > 0:
+        target_achieved_rate = float((total_committed / PROJECT_TARGET) * 100)
+
+    return {
+        'project_target': PROJECT_TARGET,
+        'total_committed': total_committed,
+        'total_raised': total_raised,
+        'total_outstanding': total_outstanding,
+        'collection_rate': collection_rate,
+        'target_achieved_rate': target_achieved_rate,
+        'total_investors': investors['total_investors'],
+        'active_investors': investors['active_investors'],
+        'verified_payments_count': payments['verified_count'],
+        'pending_payments_count': payments['pending_count'],
+        'overdue_payments_count': payments['overdue_count'],
+        'lp_count': investors['lp_count'],
+        'gp_count': investors['gp_count'],
+        'kyc_pending_count': investors['kyc_pending_count'],
+    }
+
+
+def format_overview(kpis):
+    """Overview KPIs as the overview endpoint returns them (amounts as strings)"""
+    return {
+        'project_target': str(kpis['project_target']),
+        'total_committed': str(kpis['total_committed']),
+        'total_raised': str(kpis['total_raised']),
+        'total_outstanding': str(kpis['total_outstanding']),
+        'collection_rate': round(kpis['collection_rate'], 2),
+        'target_achieved_rate': round(kpis['target_achieved_rate'], 2),
+        'total_investors': kpis['total_investors'],
+        'active_investors': kpis['active_investors'],
+        'verified_payments_count': kpis['verified_payments_count'],
+        'pending_payments_count': kpis['pending_payments_count'],
+        'overdue_payments_count': kpis['overdue_payments_count'],
+        'lp_count': kpis['lp_count'],
+        'gp_count': kpis['gp_count'],
+        'kyc_pending_count': kpis['kyc_pending_count'],
+    }
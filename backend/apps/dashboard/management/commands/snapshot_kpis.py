@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.dashboard.snapshots import first_data_date, last_daily_snapshot, take_snapshots
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD.')
+
+
+class Command(BaseCommand):
+    """
+    Materialize daily and monthly KPI snapshots for the trend charts.
+
+    Usage:
+        python manage.py snapshot_kpis
+        python manage.py snapshot_kpis --backfill
+        python manage.py snapshot_kpis --backfill --since 2024-01-01
+
+    By default only the days after the latest snapshot are added, up to
+    yesterday (the last complete day), continuing from that snapshot's
+    totals; the first run starts at the earliest investor or payment date.
+    Run daily. --backfill replays the whole history and recomputes every
+    day from --since (default: the earliest data), e.g. after importing or
+    correcting past payments.
+    """
+    help = 'Write KPI snapshots for the days since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Recompute existing snapshots too, from --since or the earliest data',
+        )
+        parser.add_argument('--since', type=_date, help='First day to snapshot with --backfill (YYYY-MM-DD)')
+        parser.add_argument('--until', type=_date, help='Last day to snapshot (default: yesterday)')
+
+    def handle(self, *args, **options):
+        until = options['until'] or timezone.now().date() - timedelta(days=1)
+        if options['since'] and not options['backfill']:
+            raise CommandError('--since needs --backfill.')
+
+        seed = None if options['backfill'] else last_daily_snapshot()
+        first = seed.date + timedelta(days=1) if seed else options['since'] or first_data_date()
+        if first is None:
+            self.stdout.write('No investors or payments yet; nothing to snapshot.')
+            return
+        if first > until:
+            self.stdout.write(self.style.SUCCESS('Snapshots are up to date.'))
+            return
+
+        daily, monthly = take_snapshots(first, until, seed=seed)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {daily} daily and {monthly} monthly snapshot(s) for {first} to {until}.'
+        ))
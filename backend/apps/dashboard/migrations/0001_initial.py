@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:49
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KpiSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('DAILY', 'Daily'), ('MONTHLY', 'Monthly')], help_text='Length of the period this row covers', max_length=10)),
+                ('date', models.DateField(help_text='First day of the period')),
+                ('as_of', models.DateField(help_text='Last day included in the figures')),
+                ('total_committed', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Share amounts of investors who had joined', max_digits=14)),
+                ('total_raised_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Verified payments to date, converted to USD', max_digits=14)),
+                ('raised_in_period_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Verified payments dated within the period, converted to USD', max_digits=14)),
+                ('total_outstanding', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Committed minus raised', max_digits=14)),
+                ('collection_rate', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Raised as a percentage of committed', max_digits=7)),
+                ('overdue_count', models.IntegerField(default=0, help_text='Payments past their due date and not yet verified')),
+                ('overdue_amount_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Overdue payments converted to USD', max_digits=14)),
+                ('lp_count', models.IntegerField(default=0, help_text='Limited Partners who had joined')),
+                ('gp_count', models.IntegerField(default=0, help_text='General Partners who had joined')),
+                ('lp_committed', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('gp_committed', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('lp_raised_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('gp_raised_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'KPI Snapshot',
+                'verbose_name_plural': 'KPI Snapshots',
+                'ordering': ['period', 'date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='kpisnapshot',
+            constraint=models.UniqueConstraint(fields=('period', 'date'), name='unique_kpi_snapshot_period_date'),
+        ),
+    ]
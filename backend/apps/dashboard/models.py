@@ -0,0 +1,98 @@
+from decimal import Decimal
+
+from django.db import models
+
+
+class KpiSnapshot(models.Model):
+    """
+    Dashboard KPIs as they stood at the end of a day or month.
+
+    Written by the snapshot_kpis command (see snapshots.py) so trend
+    charts read a handful of rows instead of re-aggregating every payment.
+    Daily rows describe the end of `date`; monthly rows start on the first
+    of the month and describe the end of `as_of`, which is the month's
+    last day once the month is complete.
+    """
+
+    PERIOD_CHOICES = [
+        ('DAILY', 'Daily'),
+        ('MONTHLY', 'Monthly'),
+    ]
+
+    period = models.CharField(
+        max_length=10,
+        choices=PERIOD_CHOICES,
+        help_text='Length of the period this row covers'
+    )
+    date = models.DateField(
+        help_text='First day of the period'
+    )
+    as_of = models.DateField(
+        help_text='Last day included in the figures'
+    )
+
+    # Capital
+    total_committed = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Share amounts of investors who had joined'
+    )
+    total_raised_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Verified payments to date, converted to USD'
+    )
+    raised_in_period_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Verified payments dated within the period, converted to USD'
+    )
+    total_outstanding = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Committed minus raised'
+    )
+    collection_rate = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Raised as a percentage of committed'
+    )
+
+    # Overdue
+    overdue_count = models.IntegerField(
+        default=0,
+        help_text='Payments past their due date and not yet verified'
+    )
+    overdue_amount_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Overdue payments converted to USD'
+    )
+
+    # LP / GP split
+    lp_count = models.IntegerField(default=0, help_text='Limited Partners who had joined')
+    gp_count = models.IntegerField(default=0, help_text='General Partners who had joined')
+    lp_committed = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    gp_committed = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    lp_raised_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    gp_raised_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'KPI Snapshot'
+        verbose_name_plural = 'KPI Snapshots'
+        ordering = ['period', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'date'], name='unique_kpi_snapshot_period_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_period_display()} KPIs for {self.date}"
@@ -0,0 +1,130 @@
+"""
+Overdue investor rollups computed with SQL grouping.
+
+Overdue payments are grouped per investor in the database with a
+currency-correct sum, a count and the oldest due date, and ordered in
+SQL, so the endpoint can paginate with a cursor and never materializes
+the whole overdue backlog.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import CharField, Sum, Count, Min, Q, Value
+from django.db.models.functions import Cast, Concat, LPad
+from django.utils import timezone
+from rest_framework.pagination import CursorPagination
+
+from apps.payments.models import Payment, usd_amount_expression
+
+
+# Aging buckets as (key, min days overdue, max days overdue or None)
+AGING_BUCKETS = [
+    ('0_30', 1, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('90_plus', 91, None),
+]
+
+
+class OverdueInvestorPagination(CursorPagination):
+    """
+    Cursor pagination over grouped overdue rows, most overdue first.
+
+    CursorPagination positions on its first ordering field only and falls
+    back to offsets among equal values, which skips rows when paging
+    back over ties. cursor_key is unique, so no offsets are needed.
+    """
+    ordering = ('cursor_key',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def overdue_payments(today=None):
+    """Return the queryset of PENDING payments past their due date"""
+    today = today or timezone.now().date()
+    return Payment.objects.filter(payment_status='PENDING', due_date__lt=today)
+
+
+def overdue_investor_rows(today=None, min_days=0, min_amount=None):
+    """
+    Group overdue payments per investor in one query.
+
+    Args:
+        today: Reference date (defaults to today)
+        min_days: Only investors whose oldest overdue payment is at least
+            this many days overdue
+        min_amount: Only investors owing at least this amount (USD)
+
+    Returns:
+        A values() queryset with investor, investor name/email/type,
+        total_overdue_amount, overdue_payments_count, oldest_due_date and
+        cursor_key ("<oldest due date>:<zero-padded investor id>").
+    """
+    today = today or timezone.now().date()
+
+    rows = overdue_payments(today).order_by().values(
+        'investor',
+        'investor__first_name',
+        'investor__last_name',
+        'investor__email',
+        'investor__investor_type',
+    ).annotate(
+        total_overdue_amount=Sum(usd_amount_expression()),
+        overdue_payments_count=Count('id'),
+        oldest_due_date=Min('due_date'),
+    ).annotate(
+        cursor_key=Concat(
+            Cast('oldest_due_date', CharField()),
+            Value(':'),
+            LPad(Cast('investor', CharField()), 12, Value('0')),
+            output_field=CharField(),
+        ),
+    )
+
+    if min_days:
+        rows = rows.filter(oldest_due_date__lte=today - timedelta(days=min_days))
+    if min_amount is not None:
+        rows = rows.filter(total_overdue_amount__gte=min_amount)
+    return rows
+
+
+def format_overdue_row(row, today=None):
+    """Shape a grouped row for the API response"""
+    today = today or timezone.now().date()
+    return {
+        'investor_id': row['investor'],
+        'investor_name': f"{row['investor__first_name']} {row['investor__last_name']}".strip(),
+        'investor_email': row['investor__email'],
+        'investor_type': row['investor__investor_type'],
+        'total_overdue_amount': str(Decimal(row['total_overdue_amount'] or 0).quantize(Decimal('0.01'))),
+        'overdue_payments_count': row['overdue_payments_count'],
+        'oldest_due_date': row['oldest_due_date'].isoformat(),
+        'days_overdue': (today - row['oldest_due_date']).days,
+    }
+
+
+def aging_summary(today=None):
+    """
+    Count and sum (USD) overdue payments per aging bucket in one query.
+
+    Returns:
+        Dict mapping bucket key to {'count', 'amount'}.
+    """
+    today = today or timezone.now().date()
+    aggregates = {}
+    for key, min_days, max_days in AGING_BUCKETS:
+        window = Q(due_date__lte=today - timedelta(days=min_days))
+        if max_days is not None:
+            window &= Q(due_date__gte=today - timedelta(days=max_days))
+        aggregates[f'{key}_count'] = Count('id', filter=window)
+        aggregates[f'{key}_amount'] = Sum(usd_amount_expression(), filter=window)
+
+    totals = overdue_payments(today).aggregate(**aggregates)
+    return {
+        key: {
+            'count': totals[f'{key}_count'],
+            'amount': str(Decimal(totals[f'{key}_amount'] or 0).quantize(Decimal('0.01'))),
+        }
+        for key, _, _ in AGING_BUCKETS
+    }
@@ -0,0 +1,90 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from apps.payments.signals import payments_bulk_changed
+from .cache import bump_data_version
+from .events import publish
+
+
+# Bulk events list at most this many investor ids; beyond that clients
+# are told that many investors changed (investor_ids: null)
+MAX_EVENT_INVESTOR_IDS = 200
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=Investor)
+@receiver(post_delete, sender=Investor)
+@receiver(payments_bulk_changed)
+def invalidate_dashboard(sender, **kwargs):
+    """
+    Bump the dashboard data version once the current transaction commits.
+
+    Bumping before commit would let a concurrent request cache data that
+    does not include this write under the new version.
+    """
+    transaction.on_commit(bump_data_version)
+
+
+def payment_event_data(payment):
+    """Compact payment payload for live events"""
+    investor_name = None
+    if Payment.investor.is_cached(payment):
+        investor_name = payment.investor.full_name
+    return {
+        'id': payment.pk,
+        'investor': payment.investor_id,
+        'investor_name': investor_name,
+        'amount': str(payment.amount),
+        'currency': payment.currency,
+        'payment_status': payment.payment_status,
+        'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
+    }
+
+
+@receiver(post_save, sender=Payment)
+def publish_payment_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    payment.created, or payment.verified / payment.failed when a save
+    changes the status (verify_payment(), mark_failed()), else payment.updated
+    """
+    if created:
+        name = 'payment.created'
+    elif update_fields and 'payment_status' in update_fields:
+        name = {'VERIFIED': 'payment.verified', 'FAILED': 'payment.failed'}.get(
+            instance.payment_status, 'payment.updated'
+        )
+    else:
+        name = 'payment.updated'
+    transaction.on_commit(partial(publish, name, payment_event_data(instance)))
+
+
+@receiver(post_delete, sender=Payment)
+def publish_payment_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(publish, 'payment.deleted', {'id': instance.pk, 'investor': instance.investor_id}))
+
+
+@receiver(post_save, sender=Investor)
+@receiver(post_delete, sender=Investor)
+def publish_investor_changed(sender, instance, signal, created=False, **kwargs):
+    name = 'investor.changed' if signal is post_save else 'investor.deleted'
+    transaction.on_commit(partial(publish, name, {
+        'id': instance.pk,
+        'name': instance.full_name,
+        'investor_status': instance.investor_status,
+        'created': created,
+    }))
+
+
+@receiver(payments_bulk_changed)
+def publish_payments_changed(sender, investor_ids, **kwargs):
+    investor_ids = sorted(investor_ids)
+    transaction.on_commit(partial(publish, 'payments.changed', {
+        'investor_count': len(investor_ids),
+        'investor_ids': investor_ids if len(investor_ids) <= MAX_EVENT_INVESTOR_IDS else None,
+    }))
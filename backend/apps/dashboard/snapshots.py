@@ -0,0 +1,301 @@
+"""
+Materialized KPI history for trend charts.
+
+KPIs for a run of days are rebuilt from a few grouped queries, whatever
+the number of days: each query returns per-day changes (investors
+joining, payments verified, payments falling overdue or being verified
+late), and the running totals are accumulated in Python. The results are
+stored as KpiSnapshot rows, from which trend_data() reads month-over-month
+and year-over-year series with a single range lookup.
+
+A daily run continues from the latest daily snapshot: its totals seed
+the running totals and the queries only read changes dated after it, so
+the cost follows the days added rather than the whole history. Rows
+dated on or before an existing snapshot (back-dated imports, corrected
+payments) are only picked up by a full replay (snapshot_kpis --backfill).
+
+Past figures are reconstructed from the dates on the rows: an investor
+counts from their joined_date with their current share amount, a
+verified payment counts from its payment_date, and a payment is overdue
+on the days after its due date until the day it was verified (pending
+payments still are). Payments that failed or were refunded don't count.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import TruncDate
+
+from apps.investors.models import Investor
+from apps.payments.models import Payment, usd_amount_expression
+from .cache import bump_data_version
+from .models import KpiSnapshot
+from .timeline import bucket_label
+
+
+# Running totals accumulated from the per-day changes
+TOTALS = [
+    'total_committed', 'lp_count', 'gp_count', 'lp_committed', 'gp_committed',
+    'total_raised_usd', 'lp_raised_usd', 'gp_raised_usd',
+    'overdue_count', 'overdue_amount_usd',
+]
+
+# Snapshot fields served by the trend endpoint
+TREND_METRICS = [
+    'total_committed', 'total_raised_usd', 'raised_in_period_usd', 'total_outstanding',
+    'collection_rate', 'overdue_count', 'overdue_amount_usd',
+    'lp_count', 'gp_count', 'lp_committed', 'gp_committed', 'lp_raised_usd', 'gp_raised_usd',
+]
+
+CENTS = Decimal('0.01')
+
+
+def _add(changes, day, values):
+    day_changes = changes.setdefault(day, {})
+    for field, value in values.items():
+        day_changes[field] = day_changes.get(field, 0) + (value or 0)
+
+
+def daily_changes(last, after=None):
+    """
+    Per-day changes of the running totals, up to and including last.
+
+    Args:
+        last: Last day to read changes for
+        after: Only read changes dated after this day (default: all)
+
+    Returns:
+        Dict mapping a date to {total: change} for the days with changes
+    """
+    changes = {}
+    lp, gp = Q(investor_type='LP'), Q(investor_type='GP')
+
+    investors = Investor.objects.filter(joined_date__lte=last)
+    payments = Payment.objects.all()
+    if after is not None:
+        investors = investors.filter(joined_date__gt=after)
+
+    joined = investors.order_by().values('joined_date').annotate(
+        total_committed=Sum('share_amount'),
+        lp_count=Count('id', filter=lp),
+        gp_count=Count('id', filter=gp),
+        lp_committed=Sum('share_amount', filter=lp),
+        gp_committed=Sum('share_amount', filter=gp),
+    )
+    for row in joined:
+        _add(changes, row.pop('joined_date'), row)
+
+    usd = usd_amount_expression()
+    verified = payments.filter(payment_status='VERIFIED', payment_date__lte=last)
+    if after is not None:
+        verified = verified.filter(payment_date__gt=after)
+    raised = verified.order_by().values('payment_date').annotate(
+        total_raised_usd=Sum(usd),
+        lp_raised_usd=Sum(usd, filter=Q(investor__investor_type='LP')),
+        gp_raised_usd=Sum(usd, filter=Q(investor__investor_type='GP')),
+    )
+    for row in raised:
+        _add(changes, row.pop('payment_date'), row)
+
+    # A payment becomes overdue the day after its due date, and stops
+    # being overdue the day it is verified
+    verified_late = Q(payment_status='VERIFIED', verification_date__date__gt=F('due_date'))
+    became_overdue = payments.filter(Q(payment_status='PENDING') | verified_late, due_date__lt=last)
+    caught_up = payments.filter(verified_late, verification_date__date__lte=last)
+    if after is not None:
+        became_overdue = became_overdue.filter(due_date__gte=after)
+        caught_up = caught_up.filter(verification_date__date__gt=after)
+
+    became_overdue = became_overdue.order_by().values('due_date').annotate(count=Count('id'), amount=Sum(usd))
+    for row in became_overdue:
+        _add(changes, row['due_date'] + timedelta(days=1), {
+            'overdue_count': row['count'], 'overdue_amount_usd': row['amount']
+        })
+
+    caught_up = caught_up.annotate(
+        verified_on=TruncDate('verification_date')
+    ).order_by().values('verified_on').annotate(count=Count('id'), amount=Sum(usd))
+    for row in caught_up:
+        _add(changes, row['verified_on'], {
+            'overdue_count': -row['count'], 'overdue_amount_usd': -(row['amount'] or 0)
+        })
+
+    return changes
+
+
+def daily_kpis(first, last, seed=None):
+    """
+    KPIs at the end of each day from first to last.
+
+    Args:
+        first: First day to yield
+        last: Last day to yield
+        seed: Daily KpiSnapshot of the day before first. Its totals are
+            the starting point and only later changes are read; without
+            it every change since the earliest data is replayed.
+
+    Yields:
+        (day, dict of KpiSnapshot field values) in date order
+    """
+    if seed is not None:
+        changes = daily_changes(last, after=seed.date)
+        totals = {field: getattr(seed, field) for field in TOTALS}
+    else:
+        changes = daily_changes(last)
+        totals = dict.fromkeys(TOTALS, 0)
+        for day in sorted(day for day in changes if day < first):
+            for field, value in changes[day].items():
+                totals[field] += value
+
+    day = first
+    while day <= last:
+        day_changes = changes.get(day, {})
+        for field, value in day_changes.items():
+            totals[field] += value
+
+        kpis = {
+            field: value if field.endswith('_count') else Decimal(value).quantize(CENTS)
+            for field, value in totals.items()
+        }
+        kpis['raised_in_period_usd'] = Decimal(day_changes.get('total_raised_usd', 0)).quantize(CENTS)
+        kpis['total_outstanding'] = kpis['total_committed'] - kpis['total_raised_usd']
+        kpis['collection_rate'] = Decimal('0.00')
+        if kpis['total_committed'] > 0:
+            kpis['collection_rate'] = (kpis['total_raised_usd'] / kpis['total_committed'] * 100).quantize(CENTS)
+        yield day, kpis
+        day += timedelta(days=1)
+
+
+def first_data_date():
+    """Earliest joined or payment date, or None without data"""
+    dates = [
+        Investor.objects.aggregate(first=Min('joined_date'))['first'],
+        Payment.objects.aggregate(first=Min('payment_date'))['first'],
+    ]
+    dates = [day for day in dates if day]
+    return min(dates) if dates else None
+
+
+def last_daily_snapshot():
+    """The latest daily snapshot, or None"""
+    return KpiSnapshot.objects.filter(period='DAILY').order_by('-date').first()
+
+
+def take_snapshots(first, last, seed=None):
+    """
+    Write daily snapshots for first..last and monthly snapshots for the
+    months those days fall in, replacing existing rows.
+
+    Monthly rows of a month still in progress are written as of `last`
+    and completed by later runs.
+
+    Args:
+        first: First day to snapshot
+        last: Last day to snapshot
+        seed: Daily KpiSnapshot of the day before first, to continue from
+            (see daily_kpis); without it the history is replayed
+
+    Returns:
+        (daily rows written, monthly rows written)
+    """
+    daily, monthly = [], {}
+    if seed is not None:
+        # Collections of first's month up to the seed come from its daily rows
+        raised_before = KpiSnapshot.objects.filter(
+            period='DAILY', date__gte=first.replace(day=1), date__lt=first
+        ).aggregate(raised=Sum('raised_in_period_usd'))['raised']
+        days = daily_kpis(first, last, seed)
+        raised_in_months = {first.replace(day=1): raised_before or Decimal('0.00')}
+    else:
+        days = daily_kpis(first.replace(day=1), last)
+        raised_in_months = {}
+
+    for day, kpis in days:
+        if day >= first:
+            daily.append(KpiSnapshot(period='DAILY', date=day, as_of=day, **kpis))
+
+        month = day.replace(day=1)
+        raised_in_months[month] = raised_in_months.get(month, 0) + kpis['raised_in_period_usd']
+        monthly[month] = KpiSnapshot(
+            period='MONTHLY', date=month, as_of=day, **{**kpis, 'raised_in_period_usd': raised_in_months[month]}
+        )
+
+    update_fields = ['as_of', 'raised_in_period_usd', 'total_outstanding', 'collection_rate', 'updated_at', *TOTALS]
+    with transaction.atomic():
+        for rows in (daily, list(monthly.values())):
+            KpiSnapshot.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['period', 'date'],
+                update_fields=update_fields,
+            )
+        # Trend responses are cached with the rest of the dashboard
+        transaction.on_commit(bump_data_version)
+    return len(daily), len(monthly)
+
+
+def previous_period(day, period):
+    if period == 'daily':
+        return day - timedelta(days=1)
+    return (day - timedelta(days=1)).replace(day=1)
+
+
+def year_earlier(day):
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:  # 29 February
+        return day.replace(year=day.year - 1, day=28)
+
+
+def _format(value):
+    if value is None or isinstance(value, int):
+        return value
+    return str(value)
+
+
+def trend_data(period, metric, start, end):
+    """
+    One snapshot metric over time, with the previous period and the same
+    period a year earlier for each point.
+
+    Args:
+        period: 'daily' or 'monthly'
+        metric: One of TREND_METRICS
+        start: First day (daily) or month (monthly) to include
+        end: Last day or month to include
+
+    Returns:
+        Dict with labels, dates, data, previous and year_ago (lists
+        aligned with labels; null where no snapshot exists). Only periods
+        with a snapshot are included.
+    """
+    if period == 'monthly':
+        start, end = start.replace(day=1), end.replace(day=1)
+
+    rows = dict(
+        KpiSnapshot.objects.filter(
+            period=period.upper(),
+            date__gte=previous_period(year_earlier(start), period),
+            date__lte=end,
+        ).values_list('date', metric)
+    )
+    days = sorted(day for day in rows if day >= start)
+    return {
+        'period': period,
+        'metric': metric,
+        'labels': [day.isoformat() if period == 'daily' else bucket_label(day, 'monthly') for day in days],
+        'dates': [day.isoformat() for day in days],
+        'data': [_format(rows[day]) for day in days],
+        'previous': [_format(rows.get(previous_period(day, period))) for day in days],
+        'year_ago': [_format(rows.get(year_earlier(day))) for day in days],
+    }
+
+
+def default_trend_range(period, today):
+    """The last 30 days, or the last 12 months including the current one"""
+    if period == 'daily':
+        return today - timedelta(days=29), today
+    month = today.month - 11
+    return date(today.year + (month - 1) // 12, (month - 1) % 12 + 1, 1), today
@@ -0,0 +1,110 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.dashboard.cache import VERSION_KEY, bump_data_version, data_version
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from apps.payments.signals import payments_bulk_changed
+
+
+class DataVersionTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.delete(VERSION_KEY)
+
+    def test_bump_changes_the_version(self):
+        before = data_version()
+        bump_data_version()
+        self.assertNotEqual(data_version(), before)
+
+    def test_bump_does_not_read_the_old_version(self):
+        # Two workers bumping at once must not both write old + 1
+        before = data_version()
+        with mock.patch.object(cache, 'get', side_effect=AssertionError('read during bump')):
+            bump_data_version()
+        first = data_version()
+        bump_data_version()
+        self.assertNotIn(data_version(), (before, first))
+
+
+class DashboardInvalidationTests(TestCase):
+    """Cached dashboard responses last until the next committed write"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def overview(self, **headers):
+        return self.client.get('/api/dashboard/overview/', **headers)
+
+    def add_payment(self):
+        return Payment.objects.create(
+            investor=self.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('2500.00'),
+            currency='USD',
+            payment_status='VERIFIED',
+            payment_date=date(2024, 3, 31),
+            due_date=date(2024, 3, 31),
+        )
+
+    def test_repeated_requests_are_served_from_the_cache(self):
+        first = self.overview()
+        with self.assertNumQueries(0):
+            second = self.overview()
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        not_modified = self.overview(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_committed_payment_invalidates_the_cache(self):
+        before = self.overview()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_payment()
+
+        after = self.overview()
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertNotEqual(after.data, before.data)
+        self.assertEqual(self.overview(HTTP_IF_NONE_MATCH=before['ETag']).status_code, 200)
+
+    def test_version_is_bumped_only_on_commit(self):
+        version = data_version()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.add_payment()
+        self.assertEqual(data_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(data_version(), version)
+
+    def test_investor_delete_and_bulk_writes_invalidate(self):
+        for write in (
+            lambda: payments_bulk_changed.send(sender=Payment, investor_ids=[self.investor.pk]),
+            lambda: Investor.objects.get(pk=self.investor.pk).delete(),
+        ):
+            version = data_version()
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertNotEqual(data_version(), version)
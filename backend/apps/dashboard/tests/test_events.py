@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.authentication.models import User
+from apps.dashboard.events import issue_ticket, ticket_user
+from apps.payments.models import Payment
+from apps.payments.signals import payments_bulk_changed
+
+
+class EventsTicketTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='viewer', password='pass', role='VIEWER')
+
+    def test_ticket_needs_authentication(self):
+        response = APIClient().post('/api/dashboard/events/ticket/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_issued_ticket_opens_the_stream(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/dashboard/events/ticket/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ticket_user(response.data['ticket']), self.user)
+        # Authenticated; the test server is WSGI, so the stream itself is refused
+        stream = self.client.get('/api/dashboard/events/', {'ticket': response.data['ticket']})
+        self.assertEqual(stream.status_code, 503)
+
+    def test_tampered_ticket_is_rejected(self):
+        ticket = issue_ticket(self.user)
+        response = self.client.get('/api/dashboard/events/', {'ticket': ticket[:-1] + 'x'})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(DASHBOARD_EVENTS_TICKET_MAX_AGE=-1)
+    def test_expired_ticket_is_rejected(self):
+        response = self.client.get('/api/dashboard/events/', {'ticket': issue_ticket(self.user)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_ticket_of_inactive_user_is_rejected(self):
+        ticket = issue_ticket(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(ticket_user(ticket))
+
+    def test_access_token_in_query_string_is_not_accepted(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        response = self.client.get('/api/dashboard/events/', {'token': token})
+        self.assertEqual(response.status_code, 401)
+
+    def test_signed_values_for_other_purposes_are_not_tickets(self):
+        from django.core import signing
+
+        self.assertIsNone(ticket_user(signing.TimestampSigner().sign(str(self.user.pk))))
+
+
+class PaymentsChangedEventTests(TestCase):
+
+    def test_reports_the_investor_count(self):
+        with mock.patch('apps.dashboard.signals.publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            payments_bulk_changed.send(sender=Payment, investor_ids={3, 1, 2})
+
+        publish.assert_called_once_with('payments.changed', {'investor_count': 3, 'investor_ids': [1, 2, 3]})
@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.dashboard.kpis import payment_metrics
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+TODAY = date(2024, 6, 15)
+
+
+class PaymentMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        for payment_status, due_date in [
+            ('PENDING', TODAY - timedelta(days=1)),
+            ('PENDING', TODAY),
+            ('PENDING', TODAY + timedelta(days=30)),
+            ('PENDING', None),
+            ('VERIFIED', TODAY - timedelta(days=1)),
+            ('FAILED', None),
+        ]:
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('500.00'),
+                payment_status=payment_status,
+                payment_date=date(2024, 6, 1),
+                due_date=due_date,
+            )
+
+    def test_counts_by_status_and_due_date(self):
+        metrics = payment_metrics(today=TODAY)
+
+        self.assertEqual(metrics['pending_count'], 4)
+        self.assertEqual(metrics['overdue_count'], 1)
+        self.assertEqual(metrics['verified_count'], 1)
+        self.assertEqual(metrics['failed_count'], 1)
+
+    def test_pending_without_a_due_date_is_neither_due_nor_overdue(self):
+        # Due today or later; the payment without a due date is left out
+        self.assertEqual(payment_metrics(today=TODAY)['pending_not_due_count'], 2)
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+class OverdueInvestorsTests(TestCase):
+    """GET /api/dashboard/overdue-investors/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.today = timezone.now().date()
+        cls.jane = cls.investor('Jane')
+        cls.john = cls.investor('John')
+        cls.mary = cls.investor('Mary')
+
+        # Jane: two overdue payments (10 and 45 days), one paid, one not yet due
+        cls.pay(cls.jane, '100.00', days_overdue=10)
+        cls.pay(cls.jane, '250.50', days_overdue=45)
+        cls.pay(cls.jane, '999.00', days_overdue=20, payment_status='VERIFIED')
+        cls.pay(cls.jane, '999.00', days_overdue=-5)
+        # John: one payment 75 days overdue
+        cls.pay(cls.john, '1000.00', days_overdue=75)
+        # Mary: one payment 120 days overdue, one due today (not overdue)
+        cls.pay(cls.mary, '40.00', days_overdue=120)
+        cls.pay(cls.mary, '999.00', days_overdue=0)
+
+    @classmethod
+    def investor(cls, first_name):
+        return Investor.objects.create(
+            first_name=first_name,
+            last_name='Doe',
+            email=f'{first_name.lower()}@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=cls.today - timedelta(days=400),
+        )
+
+    @classmethod
+    def pay(cls, investor, amount, days_overdue, payment_status='PENDING'):
+        due_date = cls.today - timedelta(days=days_overdue)
+        return Payment.objects.create(
+            investor=investor,
+            payment_type='QUARTERLY',
+            amount=Decimal(amount),
+            currency='USD',
+            payment_status=payment_status,
+            payment_date=due_date,
+            due_date=due_date,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url='/api/dashboard/overdue-investors/', params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_groups_overdue_payments_per_investor_most_overdue_first(self):
+        data = self.get()
+
+        rows = [
+            (row['investor_id'], row['total_overdue_amount'], row['overdue_payments_count'], row['days_overdue'])
+            for row in data['results']
+        ]
+        self.assertEqual(rows, [
+            (self.mary.pk, '40.00', 1, 120),
+            (self.john.pk, '1000.00', 1, 75),
+            (self.jane.pk, '350.50', 2, 45),
+        ])
+        jane = data['results'][2]
+        self.assertEqual(jane['investor_name'], 'Jane Doe')
+        self.assertEqual(jane['oldest_due_date'], (self.today - timedelta(days=45)).isoformat())
+
+    def test_min_days_and_min_amount_filters(self):
+        def investors(**params):
+            return [row['investor_id'] for row in self.get(params=params)['results']]
+
+        self.assertEqual(investors(min_days=60), [self.mary.pk, self.john.pk])
+        self.assertEqual(investors(min_days=75), [self.mary.pk, self.john.pk])
+        self.assertEqual(investors(min_days=76), [self.mary.pk])
+        self.assertEqual(investors(min_amount='350.50'), [self.john.pk, self.jane.pk])
+        self.assertEqual(investors(min_days=60, min_amount='100'), [self.john.pk])
+
+        for params in ({'min_days': 'x'}, {'min_amount': 'lots'}):
+            response = self.client.get('/api/dashboard/overdue-investors/', params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_aging_buckets_cover_every_overdue_payment(self):
+        aging = self.get()['aging']
+
+        self.assertEqual(aging, {
+            '0_30': {'count': 1, 'amount': '100.00'},
+            '31_60': {'count': 1, 'amount': '250.50'},
+            '61_90': {'count': 1, 'amount': '1000.00'},
+            '90_plus': {'count': 1, 'amount': '40.00'},
+        })
+        # Filters narrow the list, not the aging summary
+        self.assertEqual(self.get(params={'min_days': 100})['aging'], aging)
+
+    def test_cursor_pages_have_no_duplicates_or_gaps(self):
+        # Ties on the oldest due date, so pages split runs of equal sort keys
+        extra = [self.investor(f'Investor{index}') for index in range(10)]
+        for index, investor in enumerate(extra):
+            self.pay(investor, '10.00', days_overdue=30 + index // 4)
+        cache.clear()
+        expected = self.get(params={'page_size': 100})['results']
+
+        pages = [self.get(params={'page_size': 3})]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+
+        walked = [row['investor_id'] for page in pages for row in page['results']]
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(walked, [row['investor_id'] for row in expected])
+        self.assertEqual(len(set(walked)), 13)
+        days = [row['days_overdue'] for row in expected]
+        self.assertEqual(days, sorted(days, reverse=True))
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.get(backwards[-1]['previous']))
+        self.assertEqual(
+            [row['investor_id'] for page in reversed(backwards) for row in page['results']],
+            walked,
+        )
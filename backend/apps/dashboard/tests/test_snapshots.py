@@ -0,0 +1,105 @@
+import io
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.dashboard.models import KpiSnapshot
+from apps.dashboard.snapshots import TOTALS, daily_changes, last_daily_snapshot, take_snapshots
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+FIELDS = ['period', 'date', 'as_of', 'raised_in_period_usd', 'total_outstanding', 'collection_rate', *TOTALS]
+
+
+def at_noon(day):
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+class SnapshotReplayTests(TestCase):
+    """Snapshots continued from the last daily row match a full replay"""
+
+    FIRST = date(2024, 1, 1)
+    LAST = date(2024, 3, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        investors = [
+            Investor.objects.create(
+                first_name=f'Investor{index}',
+                last_name='Test',
+                email=f'investor{index}@example.com',
+                investor_type='LP' if index % 3 else 'GP',
+                share_amount=Decimal('10000.00') * (index + 1),
+                joined_date=cls.FIRST + timedelta(days=index * 9),
+            )
+            for index in range(8)
+        ]
+        for index in range(60):
+            investor = investors[index % len(investors)]
+            due = cls.FIRST + timedelta(days=index + 3)
+            payment = Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('250.25') + index,
+                currency='USD',
+                payment_status='PENDING' if index % 4 == 0 else 'VERIFIED',
+                payment_date=due,
+                due_date=due,
+            )
+            if payment.payment_status == 'VERIFIED':
+                # Every third verified payment is verified a week late
+                verified_on = due + timedelta(days=7 if index % 3 == 0 else 0)
+                Payment.objects.filter(pk=payment.pk).update(verification_date=at_noon(verified_on))
+
+    def snapshot_rows(self):
+        return list(KpiSnapshot.objects.order_by('period', 'date').values(*FIELDS))
+
+    def full_replay(self):
+        take_snapshots(self.FIRST, self.LAST)
+        rows = self.snapshot_rows()
+        KpiSnapshot.objects.all().delete()
+        return rows
+
+    def test_continuing_from_a_snapshot_matches_a_full_replay(self):
+        expected = self.full_replay()
+
+        # Stop mid-month, then continue day by day across a month end
+        take_snapshots(self.FIRST, date(2024, 2, 20))
+        day = date(2024, 2, 21)
+        while day <= self.LAST:
+            take_snapshots(day, day, seed=last_daily_snapshot())
+            day += timedelta(days=1)
+
+        self.assertEqual(self.snapshot_rows(), expected)
+
+    def test_continuing_reads_only_later_changes(self):
+        after = date(2024, 2, 10)
+        changes = daily_changes(self.LAST, after=after)
+
+        self.assertTrue(changes)
+        self.assertGreater(min(changes), after)
+        full = daily_changes(self.LAST)
+        self.assertEqual(changes, {day: values for day, values in full.items() if day > after})
+
+    def snapshot_kpis(self, **options):
+        call_command('snapshot_kpis', stdout=io.StringIO(), **options)
+
+    def test_command_continues_and_backfills(self):
+        expected = self.full_replay()
+
+        self.snapshot_kpis(until=date(2024, 2, 1))
+        self.snapshot_kpis(until=self.LAST)
+        self.assertEqual(self.snapshot_rows(), expected)
+
+        # A back-dated change is only picked up by a full replay
+        Payment.objects.filter(payment_status='PENDING').update(
+            payment_status='VERIFIED', verification_date=at_noon(self.FIRST)
+        )
+        self.snapshot_kpis(until=self.LAST)
+        self.assertEqual(self.snapshot_rows(), expected)
+        self.snapshot_kpis(backfill=True, until=self.LAST)
+        self.assertNotEqual(self.snapshot_rows(), expected)
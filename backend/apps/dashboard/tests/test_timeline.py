@@ -0,0 +1,126 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+
+
+class CollectionsTimelineTests(TestCase):
+    """GET /api/dashboard/collections-timeline/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.lp, cls.gp = [
+            Investor.objects.create(
+                first_name='Jane',
+                last_name=investor_type,
+                email=f'{investor_type.lower()}@example.com',
+                investor_type=investor_type,
+                share_amount=Decimal('10000.00'),
+                joined_date=date(2024, 1, 1),
+            )
+            for investor_type in ('LP', 'GP')
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pay(self, amount, payment_date, investor=None, payment_type='QUARTERLY', payment_status='VERIFIED'):
+        Payment.objects.create(
+            investor=investor or self.lp,
+            payment_type=payment_type,
+            amount=Decimal(amount),
+            currency='USD',
+            payment_status=payment_status,
+            payment_date=payment_date,
+        )
+
+    def timeline(self, **params):
+        response = self.client.get('/api/dashboard/collections-timeline/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_months_are_chronological_and_zero_filled(self):
+        self.pay('300.00', date(2024, 4, 20))
+        self.pay('100.00', date(2024, 1, 5))
+        self.pay('50.50', date(2024, 1, 31))
+        self.pay('999.00', date(2024, 2, 10), payment_status='PENDING')
+
+        data = self.timeline()
+
+        self.assertEqual(data['labels'], ['Jan 2024', 'Feb 2024', 'Mar 2024', 'Apr 2024'])
+        self.assertEqual(data['data'], ['150.50', '0.00', '0.00', '300.00'])
+        self.assertNotIn('series', data)
+
+    def test_range_is_zero_filled_at_both_ends(self):
+        self.pay('100.00', date(2024, 2, 15))
+        self.pay('100.00', date(2024, 6, 15))
+
+        data = self.timeline(start='2024-01-01', end='2024-03-31')
+
+        self.assertEqual(data['labels'], ['Jan 2024', 'Feb 2024', 'Mar 2024'])
+        self.assertEqual(data['data'], ['0.00', '100.00', '0.00'])
+
+    def test_iso_weeks_across_a_year_boundary(self):
+        self.pay('10.00', date(2024, 12, 27))  # Friday, week 52 of 2024
+        self.pay('20.00', date(2024, 12, 31))  # Tuesday, week 1 of 2025
+        self.pay('30.00', date(2025, 1, 2))
+        self.pay('40.00', date(2025, 1, 13))  # week 3, after an empty week 2
+
+        data = self.timeline(period='weekly')
+
+        self.assertEqual(data['labels'], ['Week 52 2024', 'Week 1 2025', 'Week 2 2025', 'Week 3 2025'])
+        self.assertEqual(data['data'], ['10.00', '50.00', '0.00', '40.00'])
+
+    def test_daily_and_quarterly_buckets(self):
+        self.pay('10.00', date(2024, 3, 30))
+        self.pay('20.00', date(2024, 4, 1))
+
+        daily = self.timeline(period='daily')
+        self.assertEqual(daily['labels'], ['2024-03-30', '2024-03-31', '2024-04-01'])
+        self.assertEqual(daily['data'], ['10.00', '0.00', '20.00'])
+
+        quarterly = self.timeline(period='quarterly')
+        self.assertEqual(quarterly['labels'], ['Q1 2024', 'Q2 2024'])
+        self.assertEqual(quarterly['data'], ['10.00', '20.00'])
+
+    def test_group_by_splits_totals_into_series(self):
+        self.pay('100.00', date(2024, 1, 10))
+        self.pay('25.00', date(2024, 1, 20), payment_type='ENTRY_FEE')
+        self.pay('200.00', date(2024, 2, 10), investor=self.gp)
+
+        by_type = self.timeline(group_by='payment_type')
+        self.assertEqual(by_type['data'], ['125.00', '200.00'])
+        self.assertEqual(by_type['series'], [
+            {'key': 'ENTRY_FEE', 'label': 'Entry Fee', 'data': ['25.00', '0.00']},
+            {'key': 'QUARTERLY', 'label': 'Quarterly Payment', 'data': ['100.00', '200.00']},
+        ])
+
+        by_investor = self.timeline(group_by='investor_type', period='weekly', start='2024-01-08', end='2024-01-21')
+        self.assertEqual(by_investor['labels'], ['Week 2 2024', 'Week 3 2024'])
+        self.assertEqual(by_investor['series'], [
+            {'key': 'LP', 'label': 'Limited Partner', 'data': ['100.00', '25.00']},
+        ])
+
+    def test_empty_timeline(self):
+        self.assertEqual(self.timeline(group_by='currency'), {'labels': [], 'data': [], 'series': []})
+
+    def test_rejects_bad_ranges_and_parameters(self):
+        for params in (
+            {'start': '2024-03-01', 'end': '2024-01-01'},
+            {'period': 'daily', 'start': '2020-01-01', 'end': '2024-12-31'},
+            {'start': '2024-02-30'},
+            {'group_by': 'investor'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/api/dashboard/collections-timeline/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
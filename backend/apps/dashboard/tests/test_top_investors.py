@@ -0,0 +1,49 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.ledger import refresh_ledgers
+from apps.payments.models import Payment
+
+
+class TopInvestorsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='viewer', password='pass')
+        for index, paid in enumerate(['500.00', '3000.00', '1500.00']):
+            investor = Investor.objects.create(
+                first_name=f'Investor{index}',
+                last_name='Test',
+                email=f'investor{index}@example.com',
+                investor_type='LP',
+                share_amount=Decimal('10000.00'),
+                joined_date=date(2024, 1, 1),
+            )
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal(paid),
+                payment_status='VERIFIED',
+                payment_date=date(2024, 3, 1),
+            )
+        # Totals are read from the ledger
+        refresh_ledgers(Investor.objects.values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ranks_by_the_total_paid_returned(self):
+        response = self.client.get('/api/dashboard/top-investors/', {'by': 'total_paid'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [str(row['total_paid']) for row in response.data],
+            ['3000.00', '1500.00', '500.00']
+        )
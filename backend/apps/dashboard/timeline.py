@@ -0,0 +1,150 @@
+"""
+Collections timeline computed with database-side date bucketing.
+
+Verified payments are truncated to day/week/month/quarter buckets and summed
+(converted to USD) in SQL, so the cost no longer grows with the number
+of payment rows processed in Python. Buckets are emitted in true
+chronological order with empty periods filled with zero.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncQuarter
+
+from apps.investors.models import Investor
+from apps.payments.models import Payment, usd_amount_expression
+
+
+PERIODS = {
+    'daily': TruncDay,
+    'weekly': TruncWeek,
+    'monthly': TruncMonth,
+    'quarterly': TruncQuarter,
+}
+
+GROUP_BY_FIELDS = {
+    'payment_type': ('payment_type', dict(Payment.PAYMENT_TYPE_CHOICES)),
+    'currency': ('currency', dict(Payment.CURRENCY_CHOICES)),
+    'investor_type': ('investor__investor_type', dict(Investor.INVESTOR_TYPE_CHOICES)),
+}
+
+# Upper bound on zero-filled buckets for a single request
+MAX_BUCKETS = 1000
+
+
+def bucket_start(day, period):
+    """Return the first day of the bucket containing day"""
+    if period == 'daily':
+        return day
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period == 'quarterly':
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def next_bucket(start, period):
+    """Return the first day of the bucket following the one starting at start"""
+    if period == 'daily':
+        return start + timedelta(days=1)
+    if period == 'weekly':
+        return start + timedelta(days=7)
+    months = 3 if period == 'quarterly' else 1
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_label(start, period):
+    """Human-readable label for the bucket starting at start"""
+    if period == 'daily':
+        return start.isoformat()
+    if period == 'weekly':
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"Week {iso_week} {iso_year}"
+    if period == 'quarterly':
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    return start.strftime('%b %Y')
+
+
+def collections_timeline_data(period='monthly', start=None, end=None, group_by=None):
+    """
+    Sum verified payments (USD) per period bucket.
+
+    Args:
+        period: 'daily', 'weekly', 'monthly' or 'quarterly'
+        start: Optional first payment date to include
+        end: Optional last payment date to include
+        group_by: Optional key of GROUP_BY_FIELDS to split totals into series
+
+    Returns:
+        Dict with labels, data (bucket totals as strings) and, when
+        group_by is given, series: [{key, label, data}] per group value.
+
+    Raises:
+        ValueError: If start is after end, or the range would produce
+            more than MAX_BUCKETS buckets
+    """
+    if start and end and start > end:
+        raise ValueError('start must be on or before end.')
+
+    trunc = PERIODS[period]
+    group_field = GROUP_BY_FIELDS[group_by][0] if group_by else None
+
+    payments = Payment.objects.filter(payment_status='VERIFIED')
+    if start:
+        payments = payments.filter(payment_date__gte=start)
+    if end:
+        payments = payments.filter(payment_date__lte=end)
+
+    values = ['bucket', group_field] if group_field else ['bucket']
+    rows = payments.annotate(
+        bucket=trunc('payment_date')
+    ).order_by().values(*values).annotate(
+        total=Sum(usd_amount_expression())
+    )
+
+    totals = {}
+    series = {}
+    for row in rows:
+        bucket = row['bucket']
+        amount = Decimal(row['total'] or 0)
+        totals[bucket] = totals.get(bucket, Decimal('0')) + amount
+        if group_field:
+            group = series.setdefault(row[group_field], {})
+            group[bucket] = group.get(bucket, Decimal('0')) + amount
+
+    if not totals and not (start and end):
+        result = {'labels': [], 'data': []}
+        if group_by:
+            result['series'] = []
+        return result
+
+    first = bucket_start(start or min(totals), period)
+    last = bucket_start(end or max(totals), period)
+
+    buckets = []
+    current = first
+    while current <= last:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f'Range spans more than {MAX_BUCKETS} {period} buckets.')
+        current = next_bucket(current, period)
+
+    def amounts(by_bucket):
+        return [
+            str(by_bucket.get(bucket, Decimal('0')).quantize(Decimal('0.01')))
+            for bucket in buckets
+        ]
+
+    result = {
+        'labels': [bucket_label(bucket, period) for bucket in buckets],
+        'data': amounts(totals),
+    }
+    if group_by:
+        display = GROUP_BY_FIELDS[group_by][1]
+        result['series'] = [
+            {'key': key, 'label': display.get(key, key), 'data': amounts(series[key])}
+            for key in sorted(series)
+        ]
+    return result
@@ -2,10 +2,16 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('bundle/', views.bundle, name='dashboard-bundle'),
+    path('events/', views.events, name='dashboard-events'),
+    path('events/ticket/', views.events_ticket, name='dashboard-events-ticket'),
     path('overview/', views.overview, name='dashboard-overview'),
     path('collections-timeline/', views.collections_timeline, name='dashboard-collections-timeline'),
+    path('trends/', views.kpi_trends, name='dashboard-trends'),
     path('payment-status/', views.payment_status_distribution, name='dashboard-payment-status'),
     path('overdue-investors/', views.overdue_investors, name='dashboard-overdue-investors'),
     path('recent-activity/', views.recent_activity, name='dashboard-recent-activity'),
     path('top-investors/', views.top_investors, name='dashboard-top-investors'),
+    path('cache-stats/', views.cache_statistics, name='dashboard-cache-stats'),
+    path('metrics/', views.metrics, name='dashboard-metrics'),
 ]
@@ -1,20 +1,51 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException, NotAuthenticated
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q, F
+from django.conf import settings
+from django.db.models import F
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from decimal import Decimal
-from datetime import timedelta
-from collections import defaultdict
 
 from apps.investors.models import Investor
 from apps.payments.models import Payment
 from apps.investors.serializers import InvestorListSerializer
 from apps.payments.serializers import PaymentListSerializer
+from apps.authentication.permissions import IsAdminUser
+from apps.common.metrics import get_registry, render_prometheus
+from .bundle import authenticate, render_sections, section_request
+from .cache import cached_dashboard_view, cache_key, cache_stats, reset_cache_stats
+from .events import issue_ticket, stream, ticket_user
+from .kpis import format_overview, overview_kpis, payment_metrics
+from .overdue import (
+    OverdueInvestorPagination,
+    overdue_investor_rows,
+    format_overdue_row,
+    aging_summary
+)
+from .snapshots import TREND_METRICS, default_trend_range, trend_data
+from .timeline import collections_timeline_data, PERIODS, GROUP_BY_FIELDS
+
+
+# Ranking expressions for top_investors, keyed by the 'by' query parameter
+TOP_INVESTOR_ORDERINGS = {
+    'share_amount': 'share_amount',
+    'total_paid': 'total_paid_usd',
+    'outstanding': 'outstanding_usd',
+    'completion': 'completion_percentage',
+}
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def overview(request):
     """
     Dashboard overview with key performance indicators (KPIs).
@@ -24,7 +55,8 @@ def overview(request):
     Returns:
         - project_target: Fixed project target ($800,000)
         - total_committed: Sum of all investor share amounts
-        - total_raised: Sum of all verified payments
+        - total_raised: Sum of all verified payments (converted to USD at the
+          rate on each payment date)
         - total_outstanding: Total committed minus total raised
         - collection_rate: Percentage collected (total_raised / total_committed * 100)
         - target_achieved_rate: Percentage of project target achieved
@@ -37,70 +69,12 @@ def overview(request):
         - gp_count: Number of General Partners
         - kyc_pending_count: Number of investors with KYC pending
     """
-    # Project target (fixed at $800,000)
-    PROJECT_TARGET = Decimal('800000.00')
-
-    # Investor metrics
-    total_investors = Investor.objects.count()
-    active_investors = Investor.objects.filter(investor_status='ACTIVE').count()
-
-    lp_count = Investor.objects.filter(investor_type='LP').count()
-    gp_count = Investor.objects.filter(investor_type='GP').count()
-
-    kyc_pending_count = Investor.objects.filter(kyc_status='PENDING').count()
-
-    # Financial metrics
-    total_committed = Investor.objects.aggregate(
-        total=Sum('share_amount')
-    )['total'] or Decimal('0.00')
-
-    total_raised = Payment.objects.filter(
-        payment_status='VERIFIED'
-    ).aggregate(
-        total=Sum('amount')
-    )['total'] or Decimal('0.00')
-
-    total_outstanding = total_committed - total_raised
-
-    # Collection rate (of committed amount)
-    collection_rate = 0
-    if total_committed > 0:
-        collection_rate = float((total_raised / total_committed) * 100)
-
-    # Target achieved rate (of project target)
-    target_achieved_rate = 0
-    if PROJECT_TARGET > 0:
-        target_achieved_rate = float((total_committed / PROJECT_TARGET) * 100)
-
-    # Payment metrics
-    verified_payments_count = Payment.objects.filter(payment_status='VERIFIED').count()
-    pending_payments_count = Payment.objects.filter(payment_status='PENDING').count()
-
-    overdue_payments_count = Payment.objects.filter(
-        payment_status='PENDING',
-        due_date__lt=timezone.now().date()
-    ).count()
-
-    return Response({
-        'project_target': str(PROJECT_TARGET),
-        'total_committed': str(total_committed),
-        'total_raised': str(total_raised),
-        'total_outstanding': str(total_outstanding),
-        'collection_rate': round(collection_rate, 2),
-        'target_achieved_rate': round(target_achieved_rate, 2),
-        'total_investors': total_investors,
-        'active_investors': active_investors,
-        'verified_payments_count': verified_payments_count,
-        'pending_payments_count': pending_payments_count,
-        'overdue_payments_count': overdue_payments_count,
-        'lp_count': lp_count,
-        'gp_count': gp_count,
-        'kyc_pending_count': kyc_pending_count,
-    })
+    return Response(format_overview(overview_kpis()))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def collections_timeline(request):
     """
     Collections timeline for chart visualization.
@@ -108,54 +82,107 @@ def collections_timeline(request):
     GET /api/dashboard/collections-timeline/?period=monthly
 
     Query Parameters:
-        - period: 'monthly' (default), 'weekly', or 'quarterly'
+        - period: 'monthly' (default), 'daily', 'weekly', or 'quarterly'
+        - start: Optional first payment date (YYYY-MM-DD)
+        - end: Optional last payment date (YYYY-MM-DD)
+        - group_by: Optional 'payment_type', 'currency' or 'investor_type'
 
     Returns:
-        - labels: List of time period labels
-        - data: List of collection amounts for each period
+        - labels: List of time period labels in chronological order
+        - data: List of collection amounts (USD) for each period, zero-filled
+        - series: Per-group amounts when group_by is given
     """
     period = request.query_params.get('period', 'monthly')
+    if period not in PERIODS:
+        period = 'monthly'
+
+    group_by = request.query_params.get('group_by') or None
+    if group_by and group_by not in GROUP_BY_FIELDS:
+        return Response(
+            {'detail': f"group_by must be one of: {', '.join(GROUP_BY_FIELDS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    dates = {}
+    for param in ('start', 'end'):
+        value = request.query_params.get(param)
+        try:
+            dates[param] = parse_date(value) if value else None
+        except ValueError:
+            dates[param] = None
+        if value and dates[param] is None:
+            return Response(
+                {'detail': f'{param} must be a valid date (YYYY-MM-DD).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    try:
+        data = collections_timeline_data(period, dates['start'], dates['end'], group_by)
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(data)
 
-    # Get verified payments ordered by date
-    payments = Payment.objects.filter(
-        payment_status='VERIFIED'
-    ).order_by('payment_date')
-
-    if not payments.exists():
-        return Response({
-            'labels': [],
-            'data': []
-        })
-
-    # Group payments by period
-    timeline_data = defaultdict(Decimal)
-
-    for payment in payments:
-        if period == 'weekly':
-            # Group by week
-            key = f"Week {payment.payment_date.isocalendar()[1]} {payment.payment_date.year}"
-        elif period == 'quarterly':
-            # Group by quarter
-            quarter = (payment.payment_date.month - 1) // 3 + 1
-            key = f"Q{quarter} {payment.payment_date.year}"
-        else:  # monthly (default)
-            # Group by month
-            key = payment.payment_date.strftime('%b %Y')
-
-        timeline_data[key] += payment.amount
-
-    # Sort by date and prepare response
-    labels = list(timeline_data.keys())
-    data = [str(timeline_data[label]) for label in labels]
 
-    return Response({
-        'labels': labels,
-        'data': data
-    })
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_dashboard_view
+def kpi_trends(request):
+    """
+    KPI history from the materialized snapshots, for trend charts.
+
+    GET /api/dashboard/trends/?period=monthly&metric=raised_in_period_usd
+
+    Query Parameters:
+        - period: 'monthly' (default) or 'daily'
+        - metric: Snapshot field to chart (default 'total_raised_usd'),
+          see snapshots.TREND_METRICS
+        - start: Optional first date (YYYY-MM-DD); default 30 days or
+          12 months back
+        - end: Optional last date (YYYY-MM-DD); default today
+
+    Returns:
+        - labels / dates: Periods with a snapshot, in chronological order
+        - data: Metric value at the end of each period
+        - previous: Value for the period before (day/month-over-month)
+        - year_ago: Value for the same period a year earlier
+
+    Snapshots are written by the snapshot_kpis command; days it hasn't
+    covered yet are missing.
+    """
+    period = request.query_params.get('period', 'monthly')
+    if period not in ('daily', 'monthly'):
+        period = 'monthly'
+
+    metric = request.query_params.get('metric', 'total_raised_usd')
+    if metric not in TREND_METRICS:
+        return Response(
+            {'detail': f"metric must be one of: {', '.join(TREND_METRICS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    start, end = default_trend_range(period, timezone.now().date())
+    dates = {'start': start, 'end': end}
+    for param in ('start', 'end'):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            dates[param] = parse_date(value)
+        except ValueError:
+            dates[param] = None
+        if dates[param] is None:
+            return Response(
+                {'detail': f'{param} must be a valid date (YYYY-MM-DD).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    return Response(trend_data(period, metric, dates['start'], dates['end']))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def payment_status_distribution(request):
     """
     Payment status distribution for pie/donut chart.
@@ -164,75 +191,63 @@ def payment_status_distribution(request):
 
     Returns count of payments by status:
         - verified: Number of verified payments
-        - pending: Number of pending payments
+        - pending: Number of pending payments not yet overdue
         - failed: Number of failed payments
         - overdue: Number of overdue payments
     """
-    verified = Payment.objects.filter(payment_status='VERIFIED').count()
-    pending = Payment.objects.filter(payment_status='PENDING', due_date__gte=timezone.now().date()).count()
-    failed = Payment.objects.filter(payment_status='FAILED').count()
-    overdue = Payment.objects.filter(
-        payment_status='PENDING',
-        due_date__lt=timezone.now().date()
-    ).count()
+    metrics = payment_metrics()
 
     return Response({
-        'verified': verified,
-        'pending': pending,
-        'failed': failed,
-        'overdue': overdue
+        'verified': metrics['verified_count'],
+        'pending': metrics['pending_not_due_count'],
+        'failed': metrics['failed_count'],
+        'overdue': metrics['overdue_count']
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def overdue_investors(request):
     """
     List of investors with overdue payments.
 
     GET /api/dashboard/overdue-investors/
 
-    Returns list of investors who have overdue payments with details.
+    Query Parameters:
+        - min_days: Only investors at least this many days overdue
+        - min_amount: Only investors owing at least this amount (USD)
+        - page_size: Rows per page (default 20, max 100)
+        - cursor: Opaque cursor from the previous/next links
+
+    Returns a cursor-paginated list of investors with overdue payments,
+    most overdue first, plus aging-bucket counts over all overdue payments.
     """
-    overdue_payments = Payment.objects.filter(
-        payment_status='PENDING',
-        due_date__lt=timezone.now().date()
-    ).select_related('investor').order_by('due_date')
-
-    # Group by investor
-    investor_overdue = {}
-    for payment in overdue_payments:
-        investor_id = payment.investor.id
-        if investor_id not in investor_overdue:
-            investor_overdue[investor_id] = {
-                'investor_id': investor_id,
-                'investor_name': payment.investor.full_name,
-                'investor_email': payment.investor.email,
-                'investor_type': payment.investor.investor_type,
-                'total_overdue_amount': Decimal('0.00'),
-                'overdue_payments_count': 0,
-                'oldest_due_date': payment.due_date,
-            }
-        investor_overdue[investor_id]['total_overdue_amount'] += payment.amount
-        investor_overdue[investor_id]['overdue_payments_count'] += 1
-
-    # Convert to list and add days overdue
-    result = []
-    for data in investor_overdue.values():
-        days_overdue = (timezone.now().date() - data['oldest_due_date']).days
-        data['days_overdue'] = days_overdue
-        data['total_overdue_amount'] = str(data['total_overdue_amount'])
-        data['oldest_due_date'] = data['oldest_due_date'].isoformat()
-        result.append(data)
-
-    # Sort by days overdue (descending)
-    result.sort(key=lambda x: x['days_overdue'], reverse=True)
-
-    return Response(result)
+    try:
+        min_days = int(request.query_params.get('min_days') or 0)
+        min_amount = request.query_params.get('min_amount')
+        min_amount = Decimal(min_amount) if min_amount else None
+    except (ValueError, ArithmeticError):
+        return Response(
+            {'detail': 'min_days must be an integer and min_amount a number.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    today = timezone.now().date()
+    rows = overdue_investor_rows(today, min_days=min_days, min_amount=min_amount)
+
+    paginator = OverdueInvestorPagination()
+    page = paginator.paginate_queryset(rows, request)
+    response = paginator.get_paginated_response(
+        [format_overdue_row(row, today) for row in page]
+    )
+    response.data['aging'] = aging_summary(today)
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def recent_activity(request):
     """
     Recent payment activity for dashboard feed.
@@ -251,29 +266,238 @@ def recent_activity(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_dashboard_view
 def top_investors(request):
     """
-    Top investors by share amount or total paid.
+    Top active investors ranked by a financial figure.
 
     GET /api/dashboard/top-investors/?by=share_amount
 
     Query Parameters:
-        - by: 'share_amount' (default) or 'total_paid'
+        - by: 'share_amount' (default), 'total_paid', 'outstanding' or 'completion'
+        - limit: Number of investors to return (default 10, max 100)
+        - investor_type: Optional 'LP' or 'GP'
 
-    Returns top 10 investors.
+    Ranking runs as a single ORDER BY ... LIMIT query over the
+    with_financials() annotations, so the order always agrees with the
+    figures returned.
     """
     sort_by = request.query_params.get('by', 'share_amount')
-
-    if sort_by == 'total_paid':
-        # Sort by total paid (computed property - we'll do this in Python)
-        investors = list(Investor.objects.filter(investor_status='ACTIVE'))
-        investors.sort(key=lambda x: x.total_paid, reverse=True)
-        investors = investors[:10]
-    else:
-        # Sort by share amount
-        investors = Investor.objects.filter(
-            investor_status='ACTIVE'
-        ).order_by('-share_amount')[:10]
+    if sort_by not in TOP_INVESTOR_ORDERINGS:
+        return Response(
+            {'detail': f"by must be one of: {', '.join(TOP_INVESTOR_ORDERINGS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+    except ValueError:
+        return Response(
+            {'detail': 'limit must be an integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    investors = Investor.objects.filter(investor_status='ACTIVE')
+
+    investor_type = request.query_params.get('investor_type')
+    if investor_type:
+        if investor_type not in dict(Investor.INVESTOR_TYPE_CHOICES):
+            return Response(
+                {'detail': 'investor_type must be LP or GP.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        investors = investors.filter(investor_type=investor_type)
+
+    investors = investors.with_financials().order_by(
+        F(TOP_INVESTOR_ORDERINGS[sort_by]).desc(nulls_last=True), 'id'
+    )[:limit]
 
     serializer = InvestorListSerializer(investors, many=True)
     return Response(serializer.data)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def cache_statistics(request):
+    """
+    Dashboard cache hit/miss counters for tuning.
+
+    GET /api/dashboard/cache-stats/ - Current counters
+    DELETE /api/dashboard/cache-stats/ - Reset counters
+
+    Returns:
+        - hits: Responses served from the cache
+        - misses: Responses computed from the database
+        - not_modified: 304 responses to conditional requests
+        - hit_ratio: (hits + not_modified) / all requests
+        - data_version: Current data version counter
+    """
+    if request.method == 'DELETE':
+        reset_cache_stats()
+    return Response(cache_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def metrics(request):
+    """
+    Request metrics of every worker in Prometheus text format.
+
+    GET /api/dashboard/metrics/
+
+    Per view: latency, database query count and time, response size,
+    serialize/render time, repeated-query (N+1) and slow request counts.
+    See apps.common.metrics.
+    """
+    return HttpResponse(
+        render_prometheus(get_registry().collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# Bundle sections: (name, view, URL name, {view parameter: bundle parameter})
+BUNDLE_SECTIONS = [
+    ('overview', overview, 'dashboard-overview', {}),
+    ('payment_status', payment_status_distribution, 'dashboard-payment-status', {}),
+    ('collections_timeline', collections_timeline, 'dashboard-collections-timeline', {'period': 'period'}),
+    ('overdue_investors', overdue_investors, 'dashboard-overdue-investors', {'page_size': 'overdue_page_size'}),
+    ('recent_activity', recent_activity, 'dashboard-recent-activity', {}),
+    ('top_investors', top_investors, 'dashboard-top-investors', {'by': 'top_by'}),
+]
+BUNDLE_DEFAULTS = {'period': 'monthly', 'overdue_page_size': '5', 'top_by': 'share_amount'}
+
+
+def _json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type='application/json',
+        headers=headers
+    )
+
+
+async def bundle(request):
+    """
+    Every dashboard section in one response.
+
+    GET /api/dashboard/bundle/
+
+    Query Parameters:
+        - period: Collections timeline period (default 'monthly')
+        - overdue_page_size: Overdue investors per page (default 5)
+        - top_by: Top investors ranking (default 'share_amount')
+
+    Returns overview, payment_status, collections_timeline,
+    overdue_investors, recent_activity and top_investors, each exactly as
+    its own endpoint returns it. The sections are computed concurrently
+    (see bundle.py), so the page loads with one round trip bounded by the
+    slowest section. Supports ETag / If-None-Match like the other
+    dashboard endpoints.
+
+    Async view: served without holding a worker thread under ASGI
+    (SERVER_MODE=asgi), and still works under WSGI.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    try:
+        user, auth = await sync_to_async(authenticate)(request)
+        if not user.is_authenticated:
+            raise NotAuthenticated()
+    except APIException as exc:
+        return _json_response({'detail': exc.detail}, exc.status_code, {'WWW-Authenticate': 'Bearer realm="api"'})
+
+    params = {name: request.GET.get(name) or default for name, default in BUNDLE_DEFAULTS.items()}
+    etag = '"{}"'.format(await sync_to_async(cache_key)('bundle', list(params.items())))
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    sections = [
+        (name, view, section_request(
+            request, reverse(url_name), {key: params[source] for key, source in mapping.items()}, user, auth
+        ))
+        for name, view, url_name, mapping in BUNDLE_SECTIONS
+    ]
+    data = {}
+    for name, status_code, section_data in await render_sections(sections):
+        if status_code != status.HTTP_200_OK:
+            return _json_response({'section': name, 'errors': section_data}, status_code)
+        data[name] = section_data
+    return _json_response(data, headers=headers)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def events_ticket(request):
+    """
+    Ticket for opening the live updates stream.
+
+    POST /api/dashboard/events/ticket/
+
+    Returns ticket, to pass as /api/dashboard/events/?ticket=..., and
+    expires_in, the seconds it can be used to connect. Unlike the access
+    token, a ticket opens nothing but the stream, so it is safe in a URL.
+    """
+    return Response({
+        'ticket': issue_ticket(request.user),
+        'expires_in': settings.DASHBOARD_EVENTS_TICKET_MAX_AGE,
+    })
+
+
+async def events(request):
+    """
+    Live dashboard updates as server-sent events.
+
+    GET /api/dashboard/events/
+
+    Query Parameters:
+        - ticket: Stream ticket from POST /api/dashboard/events/ticket/,
+          for clients that can't send an Authorization header (the
+          browser's EventSource)
+
+    Events (data is JSON):
+        - payment.created / payment.updated / payment.verified /
+          payment.failed: id, investor, investor_name, amount, currency,
+          payment_status, payment_date
+        - payment.deleted: id, investor
+        - payments.changed: investor_count and investor_ids of the
+          investors whose payments a bulk write (imports, bulk verify)
+          changed; investor_ids is null for large writes
+        - investor.changed / investor.deleted: id, name, investor_status
+        - kpis: the overview KPIs that changed, formatted as the overview
+          endpoint returns them
+        - resync: events were dropped; reload the dashboard
+
+    The stream closes after DASHBOARD_EVENTS_MAX_AGE seconds and the
+    browser reconnects. Needs the ASGI server (SERVER_MODE=asgi), where an
+    idle stream holds no worker; returns 503 under WSGI.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    ticket = request.GET.get('ticket')
+    if ticket:
+        if await sync_to_async(ticket_user)(ticket) is None:
+            return _json_response({'detail': 'Invalid or expired ticket.'}, status.HTTP_401_UNAUTHORIZED)
+    else:
+        try:
+            user, _ = await sync_to_async(authenticate)(request)
+            if not user.is_authenticated:
+                raise NotAuthenticated()
+        except APIException as exc:
+            return _json_response(
+                {'detail': exc.detail}, exc.status_code, {'WWW-Authenticate': 'Bearer realm="api"'}
+            )
+
+    if not isinstance(request, ASGIRequest):
+        return _json_response(
+            {'detail': 'Live updates need the ASGI server (SERVER_MODE=asgi).'},
+            status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    return StreamingHttpResponse(
+        stream(),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -84,6 +84,20 @@ class InvestorAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
     date_hierarchy = 'joined_date'
 
+    def get_queryset(self, request):
+        """Annotate financial figures so list rows don't query per investor"""
+        return super().get_queryset(request).with_financials()
+
+    def total_paid(self, obj):
+        return obj.total_paid
+    total_paid.short_description = 'Total paid'
+    total_paid.admin_order_field = 'total_paid_usd'
+
+    def outstanding_balance(self, obj):
+        return obj.outstanding_balance
+    outstanding_balance.short_description = 'Outstanding balance'
+    outstanding_balance.admin_order_field = 'outstanding_usd'
+
     def save_model(self, request, obj, form, change):
         """Automatically set created_by when creating new investor"""
         if not change:  # Only on creation
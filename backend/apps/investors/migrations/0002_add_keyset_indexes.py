@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investor',
+            index=models.Index(fields=['-created_at', '-id'], name='investors_i_created_2e8426_idx'),
+        ),
+    ]
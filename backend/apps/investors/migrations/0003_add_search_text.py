@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:30
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from apps.common.search import install_search_index, remove_search_index
+
+
+def populate_search_text(apps, schema_editor):
+    Investor = apps.get_model('investors', 'Investor')
+    Investor.objects.update(search_text=Concat(
+        'first_name', Value(' '), 'last_name', Value(' '), 'email', Value(' '), 'phone',
+        output_field=models.TextField()
+    ))
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor, 'investors_investor')
+
+
+def drop_search_index(apps, schema_editor):
+    remove_search_index(schema_editor, 'investors_investor')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0002_add_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investor',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,10 +1,68 @@
 from django.db import models
+from django.db.models import (
+    Case, When, F, Value, Exists, OuterRef,
+    ExpressionWrapper, DecimalField, FloatField
+)
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.utils import timezone
 from apps.authentication.models import User
 
 
+class InvestorQuerySet(models.QuerySet):
+    """
+    Custom queryset for Investor with SQL-side financial annotations.
+    """
+
+    def with_financials(self):
+        """
+        Annotate each investor with its payment figures in a single query.
+
+        Adds:
+            - total_paid_usd: Verified payments converted to USD, read from
+              the investor ledger (zero for investors without one)
+            - outstanding_usd: share_amount minus total_paid_usd
+            - completion_percentage: total_paid_usd / share_amount * 100
+            - has_overdue_payments: Any PENDING payment past its due date
+
+        The matching model properties read these annotations when present,
+        so serializers and the admin avoid per-row aggregate queries.
+        """
+        from apps.payments.models import Payment
+
+        money = DecimalField(max_digits=14, decimal_places=2)
+
+        overdue_payments = Payment.objects.filter(
+            investor=OuterRef('pk'),
+            payment_status='PENDING',
+            due_date__lt=timezone.now().date()
+        )
+
+        return self.annotate(
+            total_paid_usd=Coalesce(
+                F('ledger__total_verified_usd'),
+                Value(Decimal('0.00')),
+                output_field=money
+            ),
+        ).annotate(
+            outstanding_usd=ExpressionWrapper(
+                F('share_amount') - F('total_paid_usd'),
+                output_field=money
+            ),
+            completion_percentage=Case(
+                When(share_amount=0, then=Value(0.0)),
+                default=Cast(
+                    F('total_paid_usd') * Value(100) / F('share_amount'),
+                    output_field=FloatField()
+                ),
+                output_field=FloatField()
+            ),
+            has_overdue_payments=Exists(overdue_payments),
+        )
+
+
 class Investor(models.Model):
     """
     Investor model representing shareholders in the 7-Seas Suites investment project.
@@ -114,6 +172,12 @@ class Investor(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Searched fields in one column, indexed for substring search
+    # (apps.common.search); kept current by save()
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'phone')
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Investor'
@@ -123,11 +187,32 @@ class Investor(models.Model):
             models.Index(fields=['kyc_status']),
             models.Index(fields=['investor_status']),
             models.Index(fields=['email']),
+            # Keyset pagination of the default ordering
+            models.Index(fields=['-created_at', '-id']),
         ]
 
+    objects = InvestorQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.full_name} ({self.get_investor_type_display()})"
 
+    def save(self, *args, **kwargs):
+        """Save, keeping search_text (and the payments' search_text) current"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not set(update_fields) & set(self.SEARCH_FIELDS):
+            return super().save(*args, **kwargs)
+
+        previous = self.__dict__.get('search_text')
+        self.search_text = ' '.join(getattr(self, field) or '' for field in self.SEARCH_FIELDS)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        if not adding and self.search_text != previous:
+            from apps.payments.models import Payment, payment_search_text
+            Payment.objects.filter(investor=self).update(search_text=payment_search_text())
+
     @property
     def full_name(self):
         """Returns the investor's full name"""
@@ -136,28 +221,17 @@ class Investor(models.Model):
     @property
     def total_paid(self):
         """Calculate total amount paid (in USD) from verified payments.
-        KES payments are converted to USD using the fixed rate before summing.
+        KES payments are converted to USD at the rate on their payment date.
+        Uses the with_financials() annotation when present, otherwise the
+        investor ledger (zero for investors without one).
         """
-        from django.db.models import Case, When, F, ExpressionWrapper, DecimalField, Value
-        KES_RATE = Decimal('129')
-        total = self.payments.filter(
-            payment_status='VERIFIED'
-        ).aggregate(
-            total=models.Sum(
-                Case(
-                    When(
-                        currency='KES',
-                        then=ExpressionWrapper(
-                            F('amount') / Value(KES_RATE),
-                            output_field=DecimalField(max_digits=14, decimal_places=4)
-                        )
-                    ),
-                    default=F('amount'),
-                    output_field=DecimalField(max_digits=14, decimal_places=4)
-                )
-            )
-        )['total']
-        return (total or Decimal('0.00')).quantize(Decimal('0.01'))
+        if 'total_paid_usd' in self.__dict__:
+            return Decimal(self.total_paid_usd).quantize(Decimal('0.01'))
+
+        try:
+            return self.ledger.total_verified_usd
+        except ObjectDoesNotExist:
+            return Decimal('0.00')
 
     @property
     def outstanding_balance(self):
@@ -167,15 +241,37 @@ class Investor(models.Model):
     @property
     def payment_completion_percentage(self):
         """Calculate payment completion percentage"""
-        if self.share_amount == 0:
+        return self.percent_paid(self.total_paid, self.share_amount)
+
+    @staticmethod
+    def percent_paid(total_paid, share_amount):
+        """Share of share_amount covered by total_paid, in percent"""
+        if share_amount == 0:
             return 0
-        return float((self.total_paid / self.share_amount) * 100)
+        return float((total_paid / share_amount) * 100)
 
     @property
     def is_overdue(self):
         """Check if investor has any overdue payments"""
-        from apps.payments.models import Payment
+        if 'has_overdue_payments' in self.__dict__:
+            return self.has_overdue_payments
+
         return self.payments.filter(
             payment_status='PENDING',
             due_date__lt=timezone.now().date()
         ).exists()
+
+
+def investor_search_text():
+    """
+    Expression computing Investor.search_text in SQL, for set-based writes:
+
+        Investor.objects.filter(...).update(search_text=investor_search_text())
+    """
+    return Concat(
+        'first_name', Value(' '),
+        'last_name', Value(' '),
+        'email', Value(' '),
+        'phone',
+        output_field=models.TextField()
+    )
@@ -1,12 +1,18 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import Investor
+from apps.common.fieldsets import SparseFieldsetMixin
 from apps.authentication.models import User
 
 
-class InvestorListSerializer(serializers.ModelSerializer):
+class InvestorListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for investor list views.
-    Includes computed properties for display in tables.
+    Includes computed properties for display in tables; pass a queryset
+    from Investor.objects.with_financials() to avoid per-row queries.
+    Supports ?fields= and ?omit= and building rows from values() dicts
+    of such a queryset.
     """
     full_name = serializers.ReadOnlyField()
     total_paid = serializers.ReadOnlyField()
@@ -40,6 +46,28 @@ class InvestorListSerializer(serializers.ModelSerializer):
             'is_overdue',
             'created_at',
         ]
+        value_sources = {
+            'full_name': ['first_name', 'last_name'],
+            'total_paid': ['total_paid_usd'],
+            'outstanding_balance': ['share_amount', 'total_paid_usd'],
+            'payment_completion_percentage': ['share_amount', 'total_paid_usd'],
+            'is_overdue': ['has_overdue_payments'],
+        }
+
+    def build_full_name(self, row):
+        return f"{row['first_name']} {row['last_name']}".strip()
+
+    def build_total_paid(self, row):
+        return Decimal(row['total_paid_usd']).quantize(Decimal('0.01'))
+
+    def build_outstanding_balance(self, row):
+        return row['share_amount'] - self.build_total_paid(row)
+
+    def build_payment_completion_percentage(self, row):
+        return Investor.percent_paid(self.build_total_paid(row), row['share_amount'])
+
+    def build_is_overdue(self, row):
+        return row['has_overdue_payments']
 
 
 class InvestorDetailSerializer(serializers.ModelSerializer):
@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.investors.serializers import InvestorListSerializer
+from apps.payments.ledger import refresh_ledgers
+from apps.payments.models import Payment
+
+
+class InvestorListQueryCountTests(TestCase):
+    """The investor list costs the same number of queries at any page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', role='ADMIN')
+        today = date.today()
+        for index in range(30):
+            investor = Investor.objects.create(
+                first_name=f'Investor{index}',
+                last_name='Test',
+                email=f'investor{index}@example.com',
+                investor_type='LP' if index % 2 else 'GP',
+                share_amount=Decimal('10000.00'),
+                joined_date=today - timedelta(days=400),
+            )
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('1000.00'),
+                payment_status='VERIFIED',
+                payment_date=today - timedelta(days=30),
+            )
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('129000.00'),
+                currency='KES',
+                payment_status='PENDING',
+                payment_date=today - timedelta(days=10),
+                due_date=today - timedelta(days=5),
+            )
+        refresh_ledgers(Investor.objects.values_list('pk', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get_list(self, page_size, **params):
+        response = self.client.get('/api/investors/', {'page_size': page_size, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return response
+
+    def test_page_number_list(self):
+        # COUNT(*) and the annotated page
+        with self.assertNumQueries(2):
+            small = self.get_list(5)
+        with self.assertNumQueries(2):
+            self.get_list(25)
+
+        row = small.data['results'][0]
+        self.assertEqual(Decimal(row['total_paid']), Decimal('1000.00'))
+        self.assertTrue(row['is_overdue'])
+
+    def test_cursor_list(self):
+        with self.assertNumQueries(1):
+            self.get_list(5, pagination='cursor')
+        with self.assertNumQueries(1):
+            self.get_list(25, pagination='cursor')
+
+    def test_serializing_instances(self):
+        # Model properties read the with_financials() annotations
+        for size in (5, 25):
+            with self.assertNumQueries(1):
+                data = InvestorListSerializer(Investor.objects.with_financials()[:size], many=True).data
+            self.assertEqual(len(data), size)
+            self.assertEqual(Decimal(data[0]['total_paid']), Decimal('1000.00'))
+
+
+class TotalPaidTests(TestCase):
+    """Investor.total_paid without the with_financials() annotation"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        Payment.objects.create(
+            investor=cls.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('258000.00'),
+            currency='KES',
+            payment_status='VERIFIED',
+            payment_date=date(2024, 3, 1),
+        )
+        refresh_ledgers([cls.investor.pk])
+
+    def test_aggregates_without_fetching_the_ledger(self):
+        investor = Investor.objects.get(pk=self.investor.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(investor.total_paid, Decimal('2000.00'))
+
+    def test_uses_a_selected_ledger(self):
+        investor = Investor.objects.select_related('ledger').get(pk=self.investor.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(investor.total_paid, Decimal('2000.00'))
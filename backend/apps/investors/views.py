@@ -1,4 +1,4 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -13,6 +13,32 @@ from .serializers import (
     InvestorSummarySerializer
 )
 from apps.authentication.permissions import IsAdminUser
+from apps.common.fieldsets import SparseListMixin
+from apps.common.pagination import KeysetPagination
+from apps.common.search import IndexedSearchFilter, RankedOrderingFilter
+from apps.reports.exports import Column, choice_label, export_response, EXPORT_OUTPUTS
+
+
+EXPORT_COLUMNS = [
+    Column('ID', 'id'),
+    Column('First Name', 'first_name'),
+    Column('Last Name', 'last_name'),
+    Column('Email', 'email'),
+    Column('Phone', 'phone'),
+    Column('Type', 'investor_type', choice_label(Investor.INVESTOR_TYPE_CHOICES)),
+    Column('Share Amount', 'share_amount'),
+    Column('Shares Owned', 'shares_owned'),
+    Column('Entry Fee', 'entry_fee_amount'),
+    Column('Quarterly Payment', 'quarterly_payment_amount'),
+    Column('Total Paid (USD)', 'total_paid_usd'),
+    Column('Outstanding (USD)', 'outstanding_usd'),
+    Column('Completion %', 'completion_percentage', lambda value: round(value, 2)),
+    Column('Overdue', 'has_overdue_payments'),
+    Column('KYC Status', 'kyc_status', choice_label(Investor.KYC_STATUS_CHOICES)),
+    Column('Status', 'investor_status', choice_label(Investor.STATUS_CHOICES)),
+    Column('Joined Date', 'joined_date'),
+    Column('Created At', 'created_at'),
+]
 
 
 class InvestorFilter(FilterSet):
@@ -26,11 +52,13 @@ class InvestorFilter(FilterSet):
         fields = ['investor_type', 'kyc_status', 'investor_status']
 
 
-class InvestorViewSet(viewsets.ModelViewSet):
+class InvestorViewSet(SparseListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Investor model providing full CRUD operations.
 
     list: GET /api/investors/ - List all investors with pagination
+        (?pagination=cursor for keyset pages, ?count=estimate for a planner estimate,
+        ?fields= / ?omit= to select columns, ?search= for ranked matches)
     create: POST /api/investors/ - Create new investor
     retrieve: GET /api/investors/{id}/ - Get single investor details
     update: PUT /api/investors/{id}/ - Update investor (all fields)
@@ -40,13 +68,15 @@ class InvestorViewSet(viewsets.ModelViewSet):
     Custom actions:
     - summary: GET /api/investors/{id}/summary/ - Get financial summary
     - payments: GET /api/investors/{id}/payments/ - Get all payments for investor
+    - export: GET /api/investors/export/ - Download the filtered list as CSV or XLSX
     """
     queryset = Investor.objects.exclude(investor_status='INACTIVE')
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        IndexedSearchFilter,
+        RankedOrderingFilter
     ]
     filterset_class = InvestorFilter
     search_fields = ['first_name', 'last_name', 'email', 'phone']
@@ -55,10 +85,20 @@ class InvestorViewSet(viewsets.ModelViewSet):
         'last_name',
         'share_amount',
         'joined_date',
-        'created_at'
+        'created_at',
+        'total_paid_usd',
+        'outstanding_usd',
+        'completion_percentage',
     ]
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        """Annotate financial figures for actions that render them"""
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve', 'summary', 'export']:
+            queryset = queryset.with_financials()
+        return queryset
+
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
         if self.action == 'list':
@@ -69,6 +109,10 @@ class InvestorViewSet(viewsets.ModelViewSet):
             return InvestorSummarySerializer
         return InvestorDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        """List investors, building rows from values() for the selected fields"""
+        return self.sparse_list(self.filter_queryset(self.get_queryset()))
+
     def perform_create(self, serializer):
         """Set created_by field when creating new investor"""
         serializer.save(created_by=self.request.user)
@@ -100,17 +144,31 @@ class InvestorViewSet(viewsets.ModelViewSet):
         """
         Get all payments for a specific investor.
 
-        Returns list of payments ordered by date (newest first).
+        Returns list of payments ordered by date (newest first); supports
+        the same pagination modes and ?fields= / ?omit= as the list.
         """
         from apps.payments.serializers import PaymentListSerializer
         investor = self.get_object()
-        payments = investor.payments.all().order_by('-payment_date')
+        payments = investor.payments.all().order_by('-payment_date', '-created_at')
+        return self.sparse_list(payments, PaymentListSerializer)
 
-        # Apply pagination
-        page = self.paginate_queryset(payments)
-        if page is not None:
-            serializer = PaymentListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Download all investors matching the list filters.
 
-        serializer = PaymentListSerializer(payments, many=True)
-        return Response(serializer.data)
+        GET /api/investors/export/?output=xlsx
+
+        Query Parameters:
+            - output: 'csv' (default) or 'xlsx'
+            - Any list filter, search and ordering parameter
+
+        Rows are streamed from the database as the file is written, so
+        exports of any size use constant memory.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_OUTPUTS:
+            return Response({'error': "output must be 'csv' or 'xlsx'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, EXPORT_COLUMNS, output, 'investors')
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Payment
+from django.db import transaction
+from .bulk import bulk_verify_payments, bulk_fail_payments, summarize
+from .ledger import refresh_ledgers
+from .models import FxRate, Payment, InvestorLedger
 
 
 @admin.register(Payment)
@@ -83,17 +86,104 @@ class PaymentAdmin(admin.ModelAdmin):
     date_hierarchy = 'payment_date'
     actions = ['verify_payments', 'mark_as_failed']
 
+    def save_model(self, request, obj, form, change):
+        """Save the payment and refresh the affected investors' ledgers"""
+        investor_ids = [obj.investor_id]
+        if change and 'investor' in form.changed_data:
+            investor_ids.append(form.initial.get('investor'))
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            refresh_ledgers(investor_ids)
+
+    def delete_model(self, request, obj):
+        """Delete the payment and refresh the investor's ledger"""
+        investor_id = obj.investor_id
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            refresh_ledgers([investor_id])
+
+    def delete_queryset(self, request, queryset):
+        """Bulk delete payments and refresh the affected ledgers"""
+        with transaction.atomic():
+            investor_ids = set(queryset.values_list('investor_id', flat=True))
+            super().delete_queryset(request, queryset)
+            refresh_ledgers(investor_ids)
+
     def verify_payments(self, request, queryset):
         """Admin action to verify selected payments"""
-        count = 0
-        for payment in queryset.filter(payment_status='PENDING'):
-            payment.verify_payment(request.user)
-            count += 1
+        results = bulk_verify_payments(queryset.values_list('id', flat=True), request.user)
+        count = summarize(results).get('verified', 0)
         self.message_user(request, f'{count} payment(s) successfully verified.')
     verify_payments.short_description = 'Verify selected payments'
 
     def mark_as_failed(self, request, queryset):
         """Admin action to mark payments as failed"""
-        count = queryset.filter(payment_status='PENDING').update(payment_status='FAILED')
+        results = bulk_fail_payments(queryset.values_list('id', flat=True))
+        count = summarize(results).get('failed', 0)
         self.message_user(request, f'{count} payment(s) marked as failed.')
     mark_as_failed.short_description = 'Mark selected payments as failed'
+
+
+@admin.register(InvestorLedger)
+class InvestorLedgerAdmin(admin.ModelAdmin):
+    """
+    Read-only admin view of the denormalized investor ledger.
+    Rows are maintained automatically; use rebuild_ledger to repair drift.
+    """
+    list_display = [
+        'investor',
+        'total_verified_usd',
+        'verified_count',
+        'pending_count',
+        'overdue_count',
+        'overdue_amount_usd',
+        'last_payment_date',
+        'updated_at',
+    ]
+    list_select_related = ['investor']
+    search_fields = [
+        'investor__first_name',
+        'investor__last_name',
+        'investor__email',
+    ]
+    ordering = ['-total_verified_usd']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for exchange rates. Saving or deleting a rate
+    re-converts the ledgers of investors paying in that currency; the last
+    rate of a currency that payments use can't be deleted.
+    """
+    list_display = [
+        'quote_currency',
+        'rate',
+        'effective_date',
+        'source',
+        'updated_at',
+    ]
+    list_filter = ['quote_currency', 'source']
+    readonly_fields = ['created_at', 'updated_at']
+    ordering = ['quote_currency', '-effective_date']
+    date_hierarchy = 'effective_date'
+
+    def get_deleted_objects(self, objs, request):
+        """
+        List the last rate of a currency that payments use as protected,
+        so the delete confirmation refuses it (see FxRateQuerySet).
+        """
+        deleted_objects, model_count, perms_needed, protected = super().get_deleted_objects(objs, request)
+        rates = FxRate.objects.filter(pk__in=[obj.pk for obj in objs])
+        in_use = rates.last_rates_in_use()
+        for rate in rates.filter(quote_currency__in=in_use):
+            protected.append(
+                f'{rate}: last {rate.quote_currency} rate, used by {in_use[rate.quote_currency]} payment(s)'
+            )
+        return deleted_objects, model_count, perms_needed, protected
@@ -0,0 +1,134 @@
+"""
+Set-based payment status changes for reconciliation at scale.
+
+Both operations lock the selected rows with select_for_update, apply the
+status change with a few chunked UPDATE statements, refresh the
+affected ledgers and return a per-payment outcome, all in one
+transaction.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, When, F, Value, TextField
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .ledger import refresh_ledgers
+from .models import Payment, payment_search_text
+from .signals import payments_bulk_changed
+
+
+# Ids per UPDATE statement; keeps parameter lists well under backend limits
+CHUNK_SIZE = 500
+
+# Outcomes reported per payment id
+VERIFIED = 'verified'
+FAILED = 'failed'
+ALREADY_VERIFIED = 'already_verified'
+ALREADY_FAILED = 'already_failed'
+INVALID_STATUS = 'invalid_status'
+NOT_FOUND = 'not_found'
+
+
+def _append_note(text):
+    """Expression appending text to notes the way Payment.mark_failed does"""
+    return Case(
+        When(notes='', then=Value(text)),
+        default=Concat(F('notes'), Value(f'\n\n{text}'), output_field=TextField()),
+        output_field=TextField()
+    )
+
+
+def _apply(payment_ids, target_status, success, already, updates):
+    """
+    Lock payments, move the PENDING ones to target_status and report outcomes.
+
+    Args:
+        payment_ids: Iterable of payment ids
+        target_status: New payment_status for eligible payments
+        success: Outcome label for changed payments
+        already: Outcome label for payments already in target_status
+        updates: Extra field updates for the UPDATE statement
+
+    Returns:
+        Dict mapping payment id to its outcome.
+    """
+    payment_ids = list(dict.fromkeys(payment_ids))
+    results = {payment_id: NOT_FOUND for payment_id in payment_ids}
+
+    with transaction.atomic():
+        eligible = []
+        investor_ids = set()
+        for start in range(0, len(payment_ids), CHUNK_SIZE):
+            rows = Payment.objects.select_for_update().filter(
+                id__in=payment_ids[start:start + CHUNK_SIZE]
+            ).order_by('id').values_list('id', 'payment_status', 'investor_id')
+
+            for payment_id, payment_status, investor_id in rows:
+                if payment_status == 'PENDING':
+                    eligible.append(payment_id)
+                    investor_ids.add(investor_id)
+                    results[payment_id] = success
+                elif payment_status == target_status:
+                    results[payment_id] = already
+                else:
+                    results[payment_id] = INVALID_STATUS
+
+        now = timezone.now()
+        for start in range(0, len(eligible), CHUNK_SIZE):
+            chunk = Payment.objects.filter(id__in=eligible[start:start + CHUNK_SIZE])
+            chunk.update(payment_status=target_status, updated_at=now, **updates)
+            if 'notes' in updates:
+                # Separate statement: within one UPDATE search_text would see the old notes
+                chunk.update(search_text=payment_search_text())
+
+        if eligible:
+            refresh_ledgers(investor_ids)
+            payments_bulk_changed.send(sender=Payment, investor_ids=investor_ids)
+
+    return results
+
+
+def bulk_verify_payments(payment_ids, user, notes=''):
+    """
+    Verify many PENDING payments at once.
+
+    Args:
+        payment_ids: Iterable of payment ids
+        user: The User verifying the payments
+        notes: Optional verification notes appended to each payment
+
+    Returns:
+        Dict mapping payment id to 'verified', 'already_verified',
+        'invalid_status' or 'not_found'.
+    """
+    updates = {
+        'verification_date': timezone.now(),
+        'verified_by': user,
+    }
+    if notes:
+        updates['notes'] = _append_note(f'Verification notes: {notes}')
+    return _apply(payment_ids, 'VERIFIED', VERIFIED, ALREADY_VERIFIED, updates)
+
+
+def bulk_fail_payments(payment_ids, reason=''):
+    """
+    Mark many PENDING payments as failed at once.
+
+    Args:
+        payment_ids: Iterable of payment ids
+        reason: Optional failure reason appended to each payment's notes
+
+    Returns:
+        Dict mapping payment id to 'failed', 'already_failed',
+        'invalid_status' or 'not_found'.
+    """
+    updates = {}
+    if reason:
+        updates['notes'] = _append_note(f'Failed: {reason}')
+    return _apply(payment_ids, 'FAILED', FAILED, ALREADY_FAILED, updates)
+
+
+def summarize(results):
+    """Count outcomes of a bulk operation"""
+    return dict(Counter(results.values()))
@@ -0,0 +1,30 @@
+from django_filters import FilterSet, ChoiceFilter, DateFromToRangeFilter, NumberFilter
+
+from .models import Payment
+
+
+class PaymentFilter(FilterSet):
+    """Custom filter for Payment model"""
+    payment_status = ChoiceFilter(choices=Payment.STATUS_CHOICES)
+    payment_type = ChoiceFilter(choices=Payment.PAYMENT_TYPE_CHOICES)
+    investor = NumberFilter(field_name='investor__id')
+    payment_date = DateFromToRangeFilter()
+
+    class Meta:
+        model = Payment
+        fields = ['payment_status', 'payment_type', 'investor', 'payment_date']
+
+    @classmethod
+    def parameter_names(cls):
+        """
+        Query parameters the filter reads, e.g. payment_date_after and
+        payment_date_before for the payment_date range.
+        """
+        names = set()
+        for name, field in cls(queryset=Payment.objects.none()).form.fields.items():
+            suffixes = getattr(field.widget, 'suffixes', None)
+            if suffixes:
+                names.update(f'{name}_{suffix}' for suffix in suffixes)
+            else:
+                names.add(name)
+        return names
@@ -0,0 +1,155 @@
+"""
+Currency conversion at the exchange rate in effect on a date.
+
+Rates live in the FxRate table, quoted against USD. Python conversions
+read an in-process copy holding, per currency pair, the effective dates
+in ascending order next to their rates, so finding the rate for a date
+is a bisect. Writing a rate drops the copy in the writing process and
+bumps a version counter in the shared cache, which other processes check
+at most every FX_RATES_CHECK_INTERVAL seconds.
+
+SQL conversions use usd_amount_expression() (models.py), which reads the
+same table inside the query. Both find a rate for any date once a pair
+has one, and a pair's last rate can't be deleted while payments use its
+currency (FxRateQuerySet), so the two agree.
+"""
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .ledger import refresh_ledgers
+from .models import FxRate, Payment
+from .signals import payments_bulk_changed
+
+
+BASE_CURRENCY = 'USD'
+VERSION_KEY = 'fx:rates-version'
+
+# Investors per ledger refresh statement after a rate change
+CHUNK_SIZE = 500
+
+
+class MissingRateError(LookupError):
+    """No rate is recorded for a currency"""
+
+
+class RateTable:
+    """Rates per (base, quote) pair as parallel sorted lists"""
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: (base, quote, effective_date, rate) tuples ordered by
+                pair and effective date
+        """
+        self.pairs = {}
+        for base, quote, effective_date, rate in rows:
+            dates, rates = self.pairs.setdefault((base, quote), ([], []))
+            dates.append(effective_date)
+            rates.append(rate)
+
+    @classmethod
+    def load(cls):
+        return cls(
+            FxRate.objects.order_by('base_currency', 'quote_currency', 'effective_date')
+            .values_list('base_currency', 'quote_currency', 'effective_date', 'rate')
+        )
+
+    def rate(self, currency, on=None):
+        """
+        Units of currency per USD in effect on a date: the latest rate
+        effective on or before it, the pair's first rate for earlier dates
+        and its latest rate without a date.
+        """
+        try:
+            dates, rates = self.pairs[(BASE_CURRENCY, currency)]
+        except KeyError:
+            raise MissingRateError(f'No {BASE_CURRENCY}/{currency} exchange rate recorded.')
+        if on is None:
+            return rates[-1]
+        return rates[max(bisect_right(dates, on) - 1, 0)]
+
+
+_table = None
+_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _shared_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_rate_table():
+    """This process's copy of the rate table, reloaded when rates changed"""
+    global _table, _version, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _table is None or now - _checked_at >= settings.FX_RATES_CHECK_INTERVAL:
+            version = _shared_version()
+            _checked_at = now
+            if _table is None or version != _version:
+                _table, _version = RateTable.load(), version
+        return _table
+
+
+def set_rate_table(table):
+    """Use a given RateTable until rates change (e.g. benchmarks without a database)"""
+    global _table, _version, _checked_at
+    with _lock:
+        _table, _version, _checked_at = table, _shared_version(), time.monotonic()
+
+
+def invalidate():
+    """Drop cached rates here and, via the shared version, in other processes"""
+    global _table
+    with _lock:
+        _table = None
+    # A new value rather than incr(): not every cache backend increments
+    # atomically across processes, and two writers must not agree on old + 1
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def convert(amount, from_currency, to_currency, on=None):
+    """
+    Convert an amount between currencies (through USD) at the rates in
+    effect on a date; rounded to cents unless the currencies match.
+
+    Raises:
+        MissingRateError: If a currency other than USD has no rate
+    """
+    if from_currency == to_currency:
+        return amount
+    table = get_rate_table()
+    usd = amount if from_currency == BASE_CURRENCY else amount / table.rate(from_currency, on)
+    result = usd if to_currency == BASE_CURRENCY else usd * table.rate(to_currency, on)
+    return result.quantize(Decimal('0.01'))
+
+
+@receiver(post_save, sender=FxRate)
+@receiver(post_delete, sender=FxRate)
+def rates_changed(sender, instance, **kwargs):
+    """
+    Re-convert the ledgers of investors paying in the rate's currency
+    within the writing transaction, and drop cached rates once it commits.
+    """
+    transaction.on_commit(invalidate)
+    investor_ids = sorted(
+        Payment.objects.filter(currency=instance.quote_currency)
+        .order_by().values_list('investor_id', flat=True).distinct()
+    )
+    for start in range(0, len(investor_ids), CHUNK_SIZE):
+        refresh_ledgers(investor_ids[start:start + CHUNK_SIZE])
+    if investor_ids:
+        payments_bulk_changed.send(sender=Payment, investor_ids=investor_ids)
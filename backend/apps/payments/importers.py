@@ -0,0 +1,400 @@
+"""
+Streaming import of payments from CSV and XLSX bank statements.
+
+Rows are read one at a time (csv module, openpyxl read-only mode), mapped
+onto Payment fields, validated against an in-memory investor index and
+inserted with bulk_create in fixed-size batches, so memory stays bounded
+by the batch size rather than the file size.
+"""
+import codecs
+import csv
+import io
+import os
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from apps.investors.models import Investor
+from .ledger import refresh_ledgers
+from .models import Payment, payment_search_text
+from .signals import payments_bulk_changed
+
+
+# Accepted header spellings per target column (normalized: lower case, underscores)
+COLUMN_ALIASES = {
+    'investor_email': ['investor_email', 'email', 'payer_email'],
+    'investor_id': ['investor_id', 'investor'],
+    'amount': ['amount', 'credit', 'amount_paid', 'paid_in'],
+    'currency': ['currency', 'ccy'],
+    'payment_date': ['payment_date', 'date', 'value_date', 'transaction_date'],
+    'due_date': ['due_date'],
+    'reference_number': ['reference_number', 'reference', 'ref', 'transaction_reference', 'bank_reference'],
+    'payment_type': ['payment_type', 'type'],
+    'payment_method': ['payment_method', 'method', 'channel'],
+    'quarter': ['quarter'],
+    'notes': ['notes', 'description', 'narration', 'details'],
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d %b %Y', '%d %B %Y', '%Y/%m/%d']
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Largest amount Payment.amount can store
+_amount_field = Payment._meta.get_field('amount')
+MAX_AMOUNT = Decimal(10) ** (_amount_field.max_digits - _amount_field.decimal_places) - Decimal('0.01')
+
+# Maximum number of per-row issues kept in a report
+MAX_REPORTED_ROWS = 1000
+
+
+class StatementImportError(Exception):
+    """Raised when a file cannot be read as a payment statement"""
+
+
+class ImportReport:
+    """
+    Outcome of an import: counters plus per-row issues.
+
+    Created rows are only counted; rows that were skipped as duplicates or
+    rejected are listed individually (up to MAX_REPORTED_ROWS).
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.total_rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.rows = []
+        self.truncated = False
+
+    def add_issue(self, row_number, status, message):
+        if status == 'duplicate':
+            self.duplicates += 1
+        else:
+            self.errors += 1
+        if len(self.rows) < MAX_REPORTED_ROWS:
+            self.rows.append({'row': row_number, 'status': status, 'message': message})
+        else:
+            self.truncated = True
+
+    def as_dict(self):
+        return {
+            'dry_run': self.dry_run,
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'errors': self.errors,
+            'rows': self.rows,
+            'truncated': self.truncated,
+        }
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _map_headers(headers, require_investor=True):
+    """Map column positions to target field names"""
+    lookup = {
+        alias: field
+        for field, aliases in COLUMN_ALIASES.items()
+        for alias in aliases
+    }
+    mapping = {}
+    for position, header in enumerate(headers):
+        field = lookup.get(_normalize_header(header))
+        if field and field not in mapping.values():
+            mapping[position] = field
+
+    fields = set(mapping.values())
+    missing = [field for field in ('amount', 'payment_date') if field not in fields]
+    if require_investor and not fields & {'investor_email', 'investor_id'}:
+        missing.append('investor_email or investor_id')
+    if missing:
+        raise StatementImportError(f"Missing required column(s): {', '.join(missing)}")
+    return mapping
+
+
+def _check_csv_encoding(file):
+    """Reject a CSV that isn't UTF-8 before any of its rows is imported"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    position = file.tell()
+    try:
+        for chunk in iter(lambda: file.read(64 * 1024), b''):
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise StatementImportError('The CSV file is not UTF-8 encoded; save it as UTF-8 and upload it again.')
+    finally:
+        file.seek(position)
+
+
+def _check_xlsx_archive(file):
+    """Reject a damaged XLSX (zip) file before any of its rows is imported"""
+    position = file.tell()
+    try:
+        with zipfile.ZipFile(file) as archive:
+            damaged = archive.testzip()
+    except (zipfile.BadZipFile, EOFError):
+        raise StatementImportError('The file is not a valid XLSX workbook.')
+    finally:
+        file.seek(position)
+    if damaged:
+        raise StatementImportError(f'The XLSX file is damaged ({damaged}).')
+
+
+def _iter_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(file):
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (KeyError, ValueError, zipfile.BadZipFile) as exc:
+        raise StatementImportError(f'The file is not a valid XLSX workbook: {exc}')
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_statement_rows(file, filename, require_investor=True):
+    """
+    Stream (row_number, {field: value}) pairs from a CSV or XLSX file.
+
+    Args:
+        file: Binary file object
+        filename: Original file name, used to pick the reader
+        require_investor: Whether an investor email/id column is mandatory
+
+    Raises:
+        StatementImportError: If the format is unsupported, the file can't
+            be decoded or required columns are missing. Encoding and
+            archive errors are detected before the first row is yielded.
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        _check_csv_encoding(file)
+        rows = _iter_csv(file)
+    elif extension in ('.xlsx', '.xlsm'):
+        _check_xlsx_archive(file)
+        rows = _iter_xlsx(file)
+    else:
+        raise StatementImportError('Unsupported file type; upload a .csv or .xlsx file.')
+
+    mapping = None
+    for row_number, values in enumerate(rows, start=1):
+        if mapping is None:
+            mapping = _map_headers(values, require_investor)
+            continue
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield row_number, {
+            field: values[position]
+            for position, field in mapping.items()
+            if position < len(values)
+        }
+
+    if mapping is None:
+        raise StatementImportError('The file is empty.')
+
+
+def parse_amount(value):
+    """Parse an amount cell such as 1,250.00 or 'KES 5000'"""
+    if isinstance(value, (int, float, Decimal)):
+        amount = Decimal(str(value))
+    else:
+        cleaned = ''.join(ch for ch in str(value or '') if ch.isdigit() or ch in '.-')
+        try:
+            amount = Decimal(cleaned)
+        except InvalidOperation:
+            raise ValueError(f'Invalid amount: {value!r}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid amount: {value!r}')
+    return amount
+
+
+def parse_date(value):
+    """Parse a date cell (native date/datetime or one of DATE_FORMATS)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid date: {value!r}')
+
+
+def parse_choice(value, choices, default, label):
+    """Resolve a choice by code or display name, case-insensitively"""
+    text = str(value or '').strip()
+    if not text:
+        return default
+    for code, display in choices:
+        if text.upper() == code or text.lower() == display.lower():
+            return code
+    raise ValueError(f'Invalid {label}: {value!r}')
+
+
+class InvestorIndex:
+    """
+    In-memory lookup of investors by email and id, built with one query.
+    """
+
+    def __init__(self):
+        self.by_email = {}
+        self.by_id = {}
+        for investor_id, email, investor_status in Investor.objects.values_list(
+            'id', 'email', 'investor_status'
+        ).iterator():
+            self.by_email[email.lower()] = investor_id
+            self.by_id[investor_id] = investor_status
+
+    def resolve(self, fields):
+        """Return the investor id for a row or raise ValueError"""
+        email = str(fields.get('investor_email') or '').strip().lower()
+        raw_id = str(fields.get('investor_id') or '').strip()
+
+        if email:
+            investor_id = self.by_email.get(email)
+            if investor_id is None:
+                raise ValueError(f'Unknown investor email: {email}')
+        elif raw_id:
+            # Spreadsheet cells may hold ids as floats ('12.0')
+            try:
+                number = Decimal(raw_id)
+            except InvalidOperation:
+                number = None
+            if number is None or not number.is_finite() or number != number.to_integral_value():
+                raise ValueError(f'Invalid investor id: {raw_id!r}')
+            investor_id = int(number)
+            if investor_id not in self.by_id:
+                raise ValueError(f'Unknown investor id: {investor_id}')
+        else:
+            raise ValueError('Missing investor email or id')
+
+        if self.by_id[investor_id] != 'ACTIVE':
+            raise ValueError('Cannot create payment for inactive investor.')
+        return investor_id
+
+
+def build_payment(fields, investors, defaults):
+    """
+    Validate one mapped row and build an unsaved Payment.
+
+    Raises:
+        ValueError: With a message describing the first invalid field
+    """
+    amount = parse_amount(fields.get('amount'))
+    if amount <= 0:
+        raise ValueError('Payment amount must be greater than zero.')
+    if amount > MAX_AMOUNT:
+        raise ValueError(f'Payment amount must not exceed {MAX_AMOUNT}.')
+
+    due_date = fields.get('due_date')
+    return Payment(
+        investor_id=investors.resolve(fields),
+        amount=amount.quantize(Decimal('0.01')),
+        currency=parse_choice(fields.get('currency'), Payment.CURRENCY_CHOICES, defaults['currency'], 'currency'),
+        payment_type=parse_choice(fields.get('payment_type'), Payment.PAYMENT_TYPE_CHOICES, defaults['payment_type'], 'payment type'),
+        payment_method=parse_choice(fields.get('payment_method'), Payment.METHOD_CHOICES, defaults['payment_method'], 'payment method'),
+        payment_status='PENDING',
+        payment_date=parse_date(fields.get('payment_date')),
+        due_date=parse_date(due_date) if due_date not in (None, '') else None,
+        reference_number=str(fields.get('reference_number') or '').strip()[:100],
+        quarter=str(fields.get('quarter') or '').strip()[:10],
+        notes=str(fields.get('notes') or '').strip(),
+    )
+
+
+def import_payments(file, filename, dry_run=False, batch_size=DEFAULT_BATCH_SIZE,
+                    currency='USD', payment_type='OTHER', payment_method='BANK_TRANSFER'):
+    """
+    Import PENDING payments from a CSV or XLSX bank statement.
+
+    Rows whose (investor, reference number) already exists, in the
+    database or earlier in the file, are skipped as duplicates. Each batch
+    is inserted in its own transaction together with its ledger refresh.
+
+    Args:
+        file: Binary file object
+        filename: Original file name (.csv or .xlsx)
+        dry_run: Validate and report without inserting
+        batch_size: Rows per validation/insert batch
+        currency, payment_type, payment_method: Defaults for missing columns
+
+    Returns:
+        ImportReport
+
+    Raises:
+        StatementImportError: If the file cannot be read as a statement
+    """
+    defaults = {
+        'currency': currency,
+        'payment_type': payment_type,
+        'payment_method': payment_method,
+    }
+    investors = InvestorIndex()
+    report = ImportReport(dry_run=dry_run)
+    seen_references = set()
+    touched_investors = set()
+    batch = []
+
+    def flush():
+        existing = set()
+        references = {payment.reference_number for _, payment in batch if payment.reference_number}
+        if references:
+            existing = set(Payment.objects.filter(
+                reference_number__in=references,
+                investor_id__in={payment.investor_id for _, payment in batch},
+            ).values_list('investor_id', 'reference_number'))
+
+        to_create = []
+        for row_number, payment in batch:
+            key = (payment.investor_id, payment.reference_number)
+            if payment.reference_number and (key in existing or key in seen_references):
+                report.add_issue(row_number, 'duplicate', f'Reference {payment.reference_number} already recorded')
+                continue
+            if payment.reference_number:
+                seen_references.add(key)
+            to_create.append(payment)
+
+        if to_create and not dry_run:
+            investor_ids = {payment.investor_id for payment in to_create}
+            with transaction.atomic():
+                Payment.objects.bulk_create(to_create)
+                Payment.objects.filter(
+                    investor_id__in=investor_ids, search_text=''
+                ).update(search_text=payment_search_text())
+                refresh_ledgers(investor_ids)
+            touched_investors.update(investor_ids)
+        report.created += len(to_create)
+        batch.clear()
+
+    for row_number, fields in iter_statement_rows(file, filename):
+        report.total_rows += 1
+        try:
+            batch.append((row_number, build_payment(fields, investors, defaults)))
+        except ValueError as exc:
+            report.add_issue(row_number, 'error', str(exc))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if touched_investors:
+        payments_bulk_changed.send(sender=Payment, investor_ids=touched_investors)
+    return report
@@ -0,0 +1,177 @@
+"""
+Maintenance of the denormalized InvestorLedger rollup.
+
+Every code path that changes a payment calls refresh_ledgers() inside
+the same transaction, so the ledger never disagrees with committed
+payment data. rebuild_ledgers() recomputes everything in bulk and
+reports rows that had drifted.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum, Count, Max, Min, Q
+from django.utils import timezone
+
+from apps.investors.models import Investor
+from .models import Payment, InvestorLedger, usd_amount_expression
+
+
+MONEY_FIELDS = [
+    'total_verified_usd',
+    'verified_usd_amount',
+    'verified_kes_amount',
+    'pending_amount_usd',
+    'overdue_amount_usd',
+]
+
+COUNT_FIELDS = [
+    'verified_count',
+    'pending_count',
+    'overdue_count',
+]
+
+DATE_FIELDS = [
+    'last_payment_date',
+    'oldest_overdue_due_date',
+]
+
+LEDGER_FIELDS = MONEY_FIELDS + COUNT_FIELDS + DATE_FIELDS
+
+
+def empty_totals():
+    """Ledger values for an investor without payments"""
+    totals = {field: Decimal('0.00') for field in MONEY_FIELDS}
+    totals.update({field: 0 for field in COUNT_FIELDS})
+    totals.update({field: None for field in DATE_FIELDS})
+    return totals
+
+
+def compute_ledger_totals(investor_ids=None):
+    """
+    Aggregate ledger figures from the Payment table in one grouped query.
+
+    Args:
+        investor_ids: Optional iterable restricting the investors computed
+
+    Returns:
+        Dict mapping investor id to a dict of ledger field values.
+        Investors without payments are absent.
+    """
+    today = timezone.now().date()
+    verified = Q(payment_status='VERIFIED')
+    pending = Q(payment_status='PENDING')
+    overdue = pending & Q(due_date__lt=today)
+
+    payments = Payment.objects.order_by()
+    if investor_ids is not None:
+        payments = payments.filter(investor_id__in=investor_ids)
+
+    rows = payments.values('investor').annotate(
+        total_verified_usd=Sum(usd_amount_expression(), filter=verified),
+        verified_usd_amount=Sum('amount', filter=verified & Q(currency='USD')),
+        verified_kes_amount=Sum('amount', filter=verified & Q(currency='KES')),
+        verified_count=Count('id', filter=verified),
+        pending_amount_usd=Sum(usd_amount_expression(), filter=pending),
+        pending_count=Count('id', filter=pending),
+        overdue_amount_usd=Sum(usd_amount_expression(), filter=overdue),
+        overdue_count=Count('id', filter=overdue),
+        last_payment_date=Max('payment_date', filter=verified),
+        oldest_overdue_due_date=Min('due_date', filter=overdue),
+    )
+
+    totals = {}
+    for row in rows:
+        investor_id = row.pop('investor')
+        for field in MONEY_FIELDS:
+            row[field] = Decimal(row[field] or 0).quantize(Decimal('0.01'))
+        totals[investor_id] = row
+    return totals
+
+
+def refresh_ledgers(investor_ids):
+    """
+    Recompute the ledger rows of the given investors.
+
+    Locks the investor rows so concurrent refreshes for the same investor
+    serialize, then writes the fresh totals. Call this inside the
+    transaction that changed the payments.
+
+    Args:
+        investor_ids: Iterable of investor ids whose payments changed
+    """
+    investor_ids = sorted({pk for pk in investor_ids if pk is not None})
+    if not investor_ids:
+        return
+
+    with transaction.atomic():
+        list(
+            Investor.objects.select_for_update()
+            .filter(id__in=investor_ids)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        totals = compute_ledger_totals(investor_ids)
+        existing = {
+            ledger.investor_id: ledger
+            for ledger in InvestorLedger.objects.filter(investor_id__in=investor_ids)
+        }
+        _write_ledgers(investor_ids, totals, existing)
+
+
+def rebuild_ledgers(dry_run=False):
+    """
+    Recompute every investor's ledger and report drift.
+
+    Args:
+        dry_run: If True, only report drift without writing
+
+    Returns:
+        List of (investor_id, {field: (stored, actual)}) for rows that were
+        missing or differed from the Payment table. Missing rows report
+        None as the stored value.
+    """
+    with transaction.atomic():
+        investor_ids = list(Investor.objects.order_by('pk').values_list('pk', flat=True))
+        totals = compute_ledger_totals()
+        existing = {ledger.investor_id: ledger for ledger in InvestorLedger.objects.all()}
+
+        drift = []
+        for investor_id in investor_ids:
+            actual = totals.get(investor_id) or empty_totals()
+            ledger = existing.get(investor_id)
+            changes = {}
+            for field in LEDGER_FIELDS:
+                stored = getattr(ledger, field) if ledger else None
+                if ledger is None or stored != actual[field]:
+                    changes[field] = (stored, actual[field])
+            if changes:
+                drift.append((investor_id, changes))
+
+        if not dry_run:
+            _write_ledgers([investor_id for investor_id, _ in drift], totals, existing)
+
+    return drift
+
+
+def _write_ledgers(investor_ids, totals, existing):
+    """Create or update ledger rows for investor_ids from computed totals"""
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for investor_id in investor_ids:
+        values = totals.get(investor_id) or empty_totals()
+        ledger = existing.get(investor_id)
+        if ledger is None:
+            to_create.append(InvestorLedger(investor_id=investor_id, **values))
+            continue
+        for field, value in values.items():
+            setattr(ledger, field, value)
+        ledger.updated_at = now
+        to_update.append(ledger)
+
+    if to_create:
+        InvestorLedger.objects.bulk_create(to_create, batch_size=500)
+    if to_update:
+        InvestorLedger.objects.bulk_update(
+            to_update, LEDGER_FIELDS + ['updated_at'], batch_size=500
+        )
@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.schedule import generate_schedule
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD.')
+
+
+class Command(BaseCommand):
+    """
+    Create the PENDING entry fee and quarterly payments that active
+    investors' schedules expect but that haven't been recorded yet.
+
+    Usage:
+        python manage.py generate_schedule
+        python manage.py generate_schedule --dry-run -v 2
+        python manage.py generate_schedule --through 2025-12-31 --investor 12
+
+    Idempotent: installments already covered by a payment (of any status
+    but FAILED) are skipped. Run daily, or at least at the start of each
+    quarter, so the new quarter's installments exist before they fall due.
+    """
+    help = 'Create missing PENDING payments from the investors\' payment schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the missing installments without creating payments',
+        )
+        parser.add_argument(
+            '--through',
+            type=_date,
+            help='Include quarters starting by this date (default: today)',
+        )
+        parser.add_argument(
+            '--investor',
+            type=int,
+            action='append',
+            dest='investor_ids',
+            metavar='ID',
+            help='Only this investor (repeatable)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per insert batch (default 1000)')
+
+    def handle(self, *args, **options):
+        result = generate_schedule(
+            through=options['through'],
+            investor_ids=options['investor_ids'],
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+
+        if options['verbosity'] >= 2:
+            for payment in result['payments']:
+                label = payment.quarter or payment.get_payment_type_display()
+                self.stdout.write(
+                    f'Investor {payment.investor_id}: {label} ${payment.amount} due {payment.due_date}'
+                )
+
+        by_type = ', '.join(f'{count} {payment_type}' for payment_type, count in sorted(result['by_type'].items()))
+        verb = 'would be created' if result['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['investors']} active investor(s), {result['expected']} installment(s) expected, "
+            f"{result['existing']} already recorded: {result['created']} payment(s) {verb}"
+            + (f' ({by_type}; {result["overdue"]} already overdue).' if result['created'] else '.')
+        ))
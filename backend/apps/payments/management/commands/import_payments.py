@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.importers import import_payments, StatementImportError, DEFAULT_BATCH_SIZE
+from apps.payments.models import Payment
+
+
+class Command(BaseCommand):
+    """
+    Import PENDING payments from a CSV or XLSX bank statement.
+
+    Usage:
+        python manage.py import_payments statement.xlsx
+        python manage.py import_payments statement.csv --dry-run --currency KES
+    """
+    help = 'Import payments from a CSV or XLSX bank statement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .xlsx statement')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report without creating payments',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows per insert batch (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--currency',
+            default='USD',
+            choices=[code for code, _ in Payment.CURRENCY_CHOICES],
+            help='Currency for rows without one',
+        )
+        parser.add_argument(
+            '--payment-type',
+            default='OTHER',
+            choices=[code for code, _ in Payment.PAYMENT_TYPE_CHOICES],
+            help='Payment type for rows without one',
+        )
+        parser.add_argument(
+            '--payment-method',
+            default='BANK_TRANSFER',
+            choices=[code for code, _ in Payment.METHOD_CHOICES],
+            help='Payment method for rows without one',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as statement:
+                report = import_payments(
+                    statement,
+                    options['path'],
+                    dry_run=options['dry_run'],
+                    batch_size=options['batch_size'],
+                    currency=options['currency'],
+                    payment_type=options['payment_type'],
+                    payment_method=options['payment_method'],
+                )
+        except (OSError, StatementImportError) as exc:
+            raise CommandError(str(exc))
+
+        for row in report.rows:
+            self.stdout.write(f"Row {row['row']}: {row['status']} - {row['message']}")
+        if report.truncated:
+            self.stdout.write('... further issues omitted')
+
+        verb = 'would be created' if report.dry_run else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.total_rows} row(s) read: {report.created} payment(s) {verb}, '
+            f'{report.duplicates} duplicate(s), {report.errors} error(s).'
+        ))
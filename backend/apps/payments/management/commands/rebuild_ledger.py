@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.payments.ledger import rebuild_ledgers
+
+
+class Command(BaseCommand):
+    """
+    Recompute every InvestorLedger row from the Payment table.
+
+    Usage:
+        python manage.py rebuild_ledger
+        python manage.py rebuild_ledger --dry-run
+
+    Run daily so overdue figures roll forward as due dates pass.
+    """
+    help = 'Recompute the investor ledger rollup and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing changes',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        drift = rebuild_ledgers(dry_run=dry_run)
+
+        for investor_id, changes in drift:
+            details = ', '.join(
+                f'{field}: {stored} -> {actual}'
+                for field, (stored, actual) in changes.items()
+            )
+            self.stdout.write(f'Investor {investor_id}: {details}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Ledger is up to date.'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} ledger row(s) drifted (dry run, nothing written).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} ledger row(s) rebuilt.'))
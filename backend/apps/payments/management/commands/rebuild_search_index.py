@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.common.search import install_search_index
+from apps.investors.models import Investor, investor_search_text
+from apps.payments.models import Payment, payment_search_text
+
+
+class Command(BaseCommand):
+    """
+    Recompute search_text for every investor and payment and rebuild the
+    search indexes (apps.common.search).
+
+    Usage:
+        python manage.py rebuild_search_index
+
+    Run after writes that bypassed save() and the bulk writers, or after a
+    migration that recreated the investors or payments table (SQLite drops
+    the FTS triggers with it).
+    """
+    help = 'Recompute search_text and rebuild the investor and payment search indexes'
+
+    def handle(self, *args, **options):
+        # The schema editor runs everything in one transaction
+        with connection.schema_editor() as schema_editor:
+            investors = Investor.objects.update(search_text=investor_search_text())
+            payments = Payment.objects.update(search_text=payment_search_text())
+            for model in (Investor, Payment):
+                install_search_index(schema_editor, model._meta.db_table)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Search index rebuilt for {investors} investor(s) and {payments} payment(s).'
+        ))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.importers import StatementImportError
+from apps.payments.models import Payment
+from apps.payments.reconciliation import (
+    PendingPaymentIndex,
+    iter_bank_transactions,
+    reconcile,
+    DEFAULT_DATE_WINDOW,
+)
+
+
+class Command(BaseCommand):
+    """
+    Match a bank statement against PENDING payments.
+
+    Usage:
+        python manage.py reconcile_payments statement.csv
+        python manage.py reconcile_payments statement.xlsx --auto-verify 0.9
+    """
+    help = 'Propose (and optionally verify) matches between a bank statement and pending payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .xlsx statement')
+        parser.add_argument(
+            '--currency',
+            default='USD',
+            choices=[code for code, _ in Payment.CURRENCY_CHOICES],
+            help='Currency for lines without one',
+        )
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=DEFAULT_DATE_WINDOW,
+            help=f'Days of tolerance for amount-based matches (default {DEFAULT_DATE_WINDOW})',
+        )
+        parser.add_argument(
+            '--auto-verify',
+            type=float,
+            metavar='THRESHOLD',
+            help='Verify matches with at least this confidence (0-1)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as statement:
+                result = reconcile(
+                    iter_bank_transactions(statement, options['path'], options['currency']),
+                    index=PendingPaymentIndex.load(options['window']),
+                    auto_verify_threshold=options['auto_verify'],
+                )
+        except (OSError, StatementImportError) as exc:
+            raise CommandError(str(exc))
+
+        for match in result['matches']:
+            self.stdout.write(
+                f"Row {match['row']}: payment {match['payment_id']} "
+                f"({match['method']}, confidence {match['confidence']:.2f})"
+            )
+        for line in result['invalid']:
+            self.stdout.write(f"Row {line['row']}: invalid - {line['message']}")
+
+        summary = (
+            f"{len(result['matches'])} matched, {len(result['unmatched'])} unmatched, "
+            f"{len(result['invalid'])} invalid"
+        )
+        if 'verified' in result:
+            verified = sum(1 for item in result['verified'] if item['result'] == 'verified')
+            summary += f', {verified} verified'
+        self.stdout.write(self.style.SUCCESS(summary + '.'))
@@ -0,0 +1,203 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.ledger import refresh_ledgers
+from apps.payments.models import Payment, payment_search_text
+from apps.payments.signals import payments_bulk_changed
+
+
+# Synthetic investors are recognisable by their email domain (reserved
+# by RFC 2606), so --clear never touches real data
+SYNTHETIC_DOMAIN = 'synthetic.example'
+
+FIRST_NAMES = [
+    'Amina', 'Brian', 'Catherine', 'David', 'Esther', 'Faith', 'George', 'Hassan',
+    'Irene', 'James', 'Joy', 'Kevin', 'Lucy', 'Mercy', 'Nelson', 'Omar',
+    'Peter', 'Grace', 'Samuel', 'Tabitha', 'Victor', 'Wanjiru', 'Yusuf', 'Zawadi',
+]
+LAST_NAMES = [
+    'Achieng', 'Baraka', 'Chege', 'Fischer', 'Hussein', 'Kamau', 'Kariuki', 'Kiptoo',
+    'Macharia', 'Mohamed', 'Mutua', 'Njoroge', 'Odhiambo', 'Otieno', 'Patel', 'Shah',
+    'Wafula', 'Wambui', 'Wanjala', 'Williams',
+]
+
+# (value, weight) distributions
+INVESTOR_TYPES = [('LP', 85), ('GP', 15)]
+INVESTOR_STATUSES = [('ACTIVE', 90), ('SUSPENDED', 6), ('INACTIVE', 4)]
+KYC_STATUSES = [('VERIFIED', 75), ('PENDING', 20), ('REJECTED', 5)]
+SHARE_AMOUNTS = [(Decimal('25000'), 35), (Decimal('50000'), 30), (Decimal('100000'), 20),
+                 (Decimal('250000'), 10), (Decimal('1000000'), 5)]
+CURRENCIES = [('USD', 70), ('KES', 30)]
+PAYMENT_STATUSES = [('VERIFIED', 72), ('PENDING', 18), ('FAILED', 7), ('REFUNDED', 3)]
+PAYMENT_TYPES = [('QUARTERLY', 80), ('SHARE_PURCHASE', 12), ('OTHER', 8)]
+PAYMENT_METHODS = [('BANK_TRANSFER', 70), ('WIRE', 15), ('CHECK', 8), ('CASH', 5), ('OTHER', 2)]
+
+HISTORY_DAYS = 3 * 365
+
+
+def _pick(rng, distribution):
+    values, weights = zip(*distribution)
+    return rng.choices(values, weights)[0]
+
+
+def _quarter(day):
+    return f'Q{(day.month - 1) // 3 + 1} {day.year}'
+
+
+def _quarter_end(day):
+    month = ((day.month - 1) // 3 + 1) * 3
+    return (date(day.year + month // 12, month % 12 + 1, 1)) - timedelta(days=1)
+
+
+def synthetic_investors(rng, count, start, today):
+    investors = []
+    for index in range(start, start + count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        share_amount = _pick(rng, SHARE_AMOUNTS)
+        investor = Investor(
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{first_name}.{last_name}.{index}@{SYNTHETIC_DOMAIN}'.lower(),
+            phone=f'+2547{rng.randint(0, 99999999):08d}',
+            investor_type=_pick(rng, INVESTOR_TYPES),
+            share_amount=share_amount,
+            shares_owned=int(share_amount // 1000),
+            entry_fee_amount=(share_amount * Decimal('0.02')).quantize(Decimal('0.01')),
+            quarterly_payment_amount=(share_amount / 20).quantize(Decimal('0.01')),
+            kyc_status=_pick(rng, KYC_STATUSES),
+            investor_status=_pick(rng, INVESTOR_STATUSES),
+            joined_date=today - timedelta(days=rng.randint(30, HISTORY_DAYS)),
+        )
+        investor.search_text = ' '.join(getattr(investor, field) or '' for field in Investor.SEARCH_FIELDS)
+        investors.append(investor)
+    return investors
+
+
+def synthetic_payment(rng, investor, today, verified_by):
+    """One payment for an investor, dated between their joining and today"""
+    currency = _pick(rng, CURRENCIES)
+    status = _pick(rng, PAYMENT_STATUSES)
+    payment_type = _pick(rng, PAYMENT_TYPES)
+    payment_date = investor.joined_date + timedelta(days=rng.randint(0, (today - investor.joined_date).days))
+
+    if payment_type == 'QUARTERLY':
+        amount = investor.quarterly_payment_amount
+    else:
+        amount = (investor.share_amount * Decimal(rng.uniform(0.01, 0.2))).quantize(Decimal('0.01'))
+    if currency == 'KES':
+        amount = Payment.convert_to_kes(amount, 'USD', payment_date)
+
+    # Pending payments are mostly awaiting verification of recent
+    # transfers, with a tail of overdue instalments
+    due_date = _quarter_end(payment_date)
+    if status == 'PENDING' and rng.random() < 0.4:
+        due_date = today - timedelta(days=rng.randint(1, 180))
+
+    payment = Payment(
+        investor=investor,
+        payment_type=payment_type,
+        amount=amount,
+        currency=currency,
+        payment_status=status,
+        payment_method=_pick(rng, PAYMENT_METHODS),
+        payment_date=payment_date,
+        due_date=due_date,
+        reference_number=f'SYN{rng.randint(0, 10 ** 10):010d}',
+        quarter=_quarter(payment_date) if payment_type == 'QUARTERLY' else '',
+    )
+    if status == 'VERIFIED':
+        payment.verified_by = verified_by
+        payment.verification_date = timezone.make_aware(
+            datetime.combine(payment_date + timedelta(days=rng.randint(0, 5)), time(12))
+        )
+    return payment
+
+
+class Command(BaseCommand):
+    """
+    Bulk-generate synthetic investors and payments for benchmarks.
+
+    Usage:
+        python manage.py seed_synthetic --investors 1000 --payments 50000
+        python manage.py seed_synthetic --clear --investors 200 --payments 5000 --seed 7
+
+    Data is reproducible for a given --seed. Currencies, statuses, payment
+    types and due dates follow fixed weights (see the module constants);
+    every investor gets an entry fee payment. Writes go through
+    bulk_create, then search text, ledgers and dashboard caches are
+    refreshed as the CSV importer does.
+    """
+    help = 'Generate synthetic investors and payments for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--investors', type=int, default=200, help='Investors to create (default 200)')
+        parser.add_argument('--payments', type=int, default=5000, help='Payments to create (default 5000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per insert batch')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated synthetic investors and their payments first',
+        )
+
+    def handle(self, *args, **options):
+        investors_count, payments_count = options['investors'], options['payments']
+        if investors_count < 1 or payments_count < investors_count:
+            raise CommandError('Need at least one investor and one payment (the entry fee) per investor.')
+
+        if options['clear']:
+            deleted, _ = Investor.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}').delete()
+            self.stdout.write(f'Deleted {deleted} synthetic row(s).')
+
+        rng = random.Random(options['seed'])
+        today = timezone.now().date()
+        batch_size = options['batch_size']
+        start = Investor.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}').count()
+        verified_by = User.objects.filter(role='ADMIN').order_by('pk').first()
+
+        with transaction.atomic():
+            investors = Investor.objects.bulk_create(
+                synthetic_investors(rng, investors_count, start, today), batch_size=batch_size
+            )
+
+            # Long-tailed payment counts: a few investors pay far more often
+            weights = [rng.paretovariate(1.5) for _ in investors]
+            batch = [
+                Payment(
+                    investor=investor,
+                    payment_type='ENTRY_FEE',
+                    amount=investor.entry_fee_amount,
+                    currency='USD',
+                    payment_status='VERIFIED',
+                    payment_method='BANK_TRANSFER',
+                    payment_date=investor.joined_date,
+                    due_date=investor.joined_date,
+                    verified_by=verified_by,
+                    reference_number=f'SYN-FEE-{investor.pk}',
+                )
+                for investor in investors
+            ]
+            for investor in rng.choices(investors, weights, k=payments_count - investors_count):
+                batch.append(synthetic_payment(rng, investor, today, verified_by))
+                if len(batch) >= batch_size:
+                    Payment.objects.bulk_create(batch, batch_size=batch_size)
+                    batch = []
+            Payment.objects.bulk_create(batch, batch_size=batch_size)
+
+            investor_ids = [investor.pk for investor in investors]
+            for index in range(0, len(investor_ids), 500):
+                chunk = investor_ids[index:index + 500]
+                Payment.objects.filter(investor_id__in=chunk).update(search_text=payment_search_text())
+                refresh_ledgers(chunk)
+
+        payments_bulk_changed.send(sender=Payment, investor_ids=investor_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {investors_count} investor(s) and {payments_count} payment(s).'
+        ))
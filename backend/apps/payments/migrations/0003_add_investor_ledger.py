@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:54
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0001_initial'),
+        ('payments', '0002_add_currency_to_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvestorLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_verified_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Verified payments converted to USD', max_digits=14)),
+                ('verified_usd_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Verified payments made in USD', max_digits=14)),
+                ('verified_kes_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Verified payments made in KES', max_digits=16)),
+                ('verified_count', models.IntegerField(default=0, help_text='Number of verified payments')),
+                ('pending_amount_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Pending payments converted to USD', max_digits=14)),
+                ('pending_count', models.IntegerField(default=0, help_text='Number of pending payments')),
+                ('overdue_amount_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Overdue payments converted to USD', max_digits=14)),
+                ('overdue_count', models.IntegerField(default=0, help_text='Number of overdue payments')),
+                ('last_payment_date', models.DateField(blank=True, help_text='Date of the most recent verified payment', null=True)),
+                ('oldest_overdue_due_date', models.DateField(blank=True, help_text='Earliest due date among overdue payments', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('investor', models.OneToOneField(help_text='Investor this rollup belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='investors.investor')),
+            ],
+            options={
+                'verbose_name': 'Investor Ledger',
+                'verbose_name_plural': 'Investor Ledgers',
+            },
+        ),
+    ]
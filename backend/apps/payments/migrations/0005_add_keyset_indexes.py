@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_add_investor_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-payment_date', '-created_at', '-id'], name='payments_pa_payment_84ec1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['investor', '-payment_date', '-created_at', '-id'], name='payments_pa_investo_80d99b_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:30
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+from apps.common.search import install_search_index, remove_search_index
+
+
+def populate_search_text(apps, schema_editor):
+    Investor = apps.get_model('investors', 'Investor')
+    Payment = apps.get_model('payments', 'Payment')
+    investor = Investor.objects.filter(pk=OuterRef('investor_id'))
+    Payment.objects.update(search_text=Concat(
+        Subquery(investor.values('first_name')), Value(' '),
+        Subquery(investor.values('last_name')), Value(' '),
+        Subquery(investor.values('email')), Value(' '),
+        'reference_number', Value(' '),
+        'notes',
+        output_field=models.TextField()
+    ))
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor, 'payments_payment')
+
+
+def drop_search_index(apps, schema_editor):
+    remove_search_index(schema_editor, 'payments_payment')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_add_keyset_indexes'),
+        ('investors', '0003_add_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
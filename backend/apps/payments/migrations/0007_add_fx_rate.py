@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:53
+
+from datetime import date
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+
+
+def seed_kes_rate(apps, schema_editor):
+    """The fixed rate used before the rate table, for all past payments"""
+    FxRate = apps.get_model('payments', 'FxRate')
+    FxRate.objects.get_or_create(
+        base_currency='USD',
+        quote_currency='KES',
+        effective_date=date(2000, 1, 1),
+        defaults={'rate': Decimal('129'), 'source': 'Fixed rate used before FX rates were recorded'},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_add_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_currency', models.CharField(default='USD', help_text='Currency the rate is quoted against (USD)', max_length=3)),
+                ('quote_currency', models.CharField(help_text='ISO 4217 code of the converted currency, e.g. KES', max_length=3)),
+                ('rate', models.DecimalField(decimal_places=6, help_text='Units of the quote currency per unit of the base currency', max_digits=18, validators=[django.core.validators.MinValueValidator(Decimal('0.000001'))])),
+                ('effective_date', models.DateField(help_text='First payment date the rate applies to')),
+                ('source', models.CharField(blank=True, default='', help_text='Where the rate came from (e.g. CBK mean rate)', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'FX Rate',
+                'verbose_name_plural': 'FX Rates',
+                'ordering': ['base_currency', 'quote_currency', '-effective_date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fxrate',
+            constraint=models.UniqueConstraint(fields=('base_currency', 'quote_currency', 'effective_date'), name='unique_fx_rate_pair_date'),
+        ),
+        migrations.RunPython(seed_kes_rate, migrations.RunPython.noop),
+    ]
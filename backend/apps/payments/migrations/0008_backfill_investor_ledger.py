@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def backfill_ledgers(apps, schema_editor):
+    """
+    Fill the ledger of every existing investor from their payments.
+
+    Uses the live rebuild logic rather than historical models: the
+    conversion needs usd_amount_expression() and the FX rates of 0007,
+    and the ledger must match what refresh_ledgers() writes afterwards.
+    """
+    from apps.payments.ledger import rebuild_ledgers
+
+    rebuild_ledgers()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_add_fx_rate'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ledgers, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, When, F, ExpressionWrapper, DecimalField, Value, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Concat
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.utils import timezone
@@ -39,8 +42,6 @@ class Payment(models.Model):
         ('KES', 'Kenyan Shilling (KES)'),
     ]
 
-    KES_TO_USD_RATE = Decimal('129')
-
     # Relationships
     investor = models.ForeignKey(
         Investor,
@@ -133,6 +134,13 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Investor name and email, reference and notes in one column, indexed
+    # for substring search (apps.common.search). Kept current by save(),
+    # Investor.save() and the set-based writers via payment_search_text()
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    SEARCH_FIELDS = ('investor', 'reference_number', 'notes')
+
     class Meta:
         ordering = ['-payment_date', '-created_at']
         verbose_name = 'Payment'
@@ -143,39 +151,65 @@ class Payment(models.Model):
             models.Index(fields=['payment_date']),
             models.Index(fields=['investor', 'payment_status']),
             models.Index(fields=['due_date']),
+            # Keyset pagination of the default ordering, overall and per investor
+            models.Index(fields=['-payment_date', '-created_at', '-id']),
+            models.Index(fields=['investor', '-payment_date', '-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"{self.investor.full_name} - {self.get_payment_type_display()} - ${self.amount}"
 
+    def save(self, *args, **kwargs):
+        """Save, keeping search_text current"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.SEARCH_FIELDS):
+            investor = self.investor
+            self.search_text = ' '.join([
+                investor.first_name, investor.last_name, investor.email,
+                self.reference_number or '', self.notes or '',
+            ])
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def overdue_days(payment_status, due_date, today):
+        """Days a payment with this status and due date is overdue on a given day (0 if not)"""
+        if payment_status != 'PENDING' or not due_date or due_date >= today:
+            return 0
+        return (today - due_date).days
+
+    @staticmethod
+    def convert_to_usd(amount, currency, on=None):
+        """Convert an amount in a payment currency to USD at the rate in effect on a date"""
+        from . import fx
+        return fx.convert(amount, currency, 'USD', on)
+
+    @staticmethod
+    def convert_to_kes(amount, currency, on=None):
+        """Convert an amount in a payment currency to KES at the rate in effect on a date"""
+        from . import fx
+        return fx.convert(amount, currency, 'KES', on)
+
     @property
     def is_overdue(self):
         """Check if payment is overdue"""
-        if self.payment_status != 'PENDING' or not self.due_date:
-            return False
-        return self.due_date < timezone.now().date()
+        return self.days_overdue > 0
 
     @property
     def days_overdue(self):
         """Calculate number of days overdue"""
-        if not self.is_overdue:
-            return 0
-        delta = timezone.now().date() - self.due_date
-        return delta.days
+        return self.overdue_days(self.payment_status, self.due_date, timezone.now().date())
 
     @property
     def amount_usd(self):
         """Return the amount converted to USD (for reporting)"""
-        if self.currency == 'KES':
-            return (self.amount / self.KES_TO_USD_RATE).quantize(Decimal('0.01'))
-        return self.amount
+        return self.convert_to_usd(self.amount, self.currency, self.payment_date)
 
     @property
     def amount_kes(self):
         """Return the amount converted to KES (for display)"""
-        if self.currency == 'KES':
-            return self.amount
-        return (self.amount * self.KES_TO_USD_RATE).quantize(Decimal('0.01'))
+        return self.convert_to_kes(self.amount, self.currency, self.payment_date)
 
     def verify_payment(self, user):
         """
@@ -184,10 +218,14 @@ class Payment(models.Model):
         Args:
             user: The User object who is verifying the payment
         """
+        from .ledger import refresh_ledgers
+
         self.payment_status = 'VERIFIED'
         self.verification_date = timezone.now()
         self.verified_by = user
-        self.save(update_fields=['payment_status', 'verification_date', 'verified_by', 'updated_at'])
+        with transaction.atomic():
+            self.save(update_fields=['payment_status', 'verification_date', 'verified_by', 'updated_at'])
+            refresh_ledgers([self.investor_id])
 
     def mark_failed(self, reason=''):
         """
@@ -196,7 +234,263 @@ class Payment(models.Model):
         Args:
             reason: Optional reason for failure
         """
+        from .ledger import refresh_ledgers
+
         self.payment_status = 'FAILED'
         if reason:
             self.notes = f"{self.notes}\n\nFailed: {reason}".strip()
-        self.save(update_fields=['payment_status', 'notes', 'updated_at'])
+        with transaction.atomic():
+            self.save(update_fields=['payment_status', 'notes', 'updated_at'])
+            refresh_ledgers([self.investor_id])
+
+
+class InvestorLedger(models.Model):
+    """
+    Denormalized payment rollup with one row per investor.
+
+    Maintained by apps.payments.ledger whenever a payment is written, so
+    totals can be read with a single indexed lookup instead of aggregating
+    the Payment table. Investor.with_financials(), Investor.total_paid and
+    the dashboard's total raised read total_verified_usd from here.
+    Overdue figures are relative to the last refresh; run the
+    rebuild_ledger command daily to roll them forward.
+    """
+
+    investor = models.OneToOneField(
+        Investor,
+        on_delete=models.CASCADE,
+        related_name='ledger',
+        help_text='Investor this rollup belongs to'
+    )
+
+    # Verified totals
+    total_verified_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Verified payments converted to USD'
+    )
+    verified_usd_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Verified payments made in USD'
+    )
+    verified_kes_amount = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Verified payments made in KES'
+    )
+    verified_count = models.IntegerField(
+        default=0,
+        help_text='Number of verified payments'
+    )
+
+    # Pending and overdue
+    pending_amount_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Pending payments converted to USD'
+    )
+    pending_count = models.IntegerField(
+        default=0,
+        help_text='Number of pending payments'
+    )
+    overdue_amount_usd = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Overdue payments converted to USD'
+    )
+    overdue_count = models.IntegerField(
+        default=0,
+        help_text='Number of overdue payments'
+    )
+
+    # Dates
+    last_payment_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text='Date of the most recent verified payment'
+    )
+    oldest_overdue_due_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text='Earliest due date among overdue payments'
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Investor Ledger'
+        verbose_name_plural = 'Investor Ledgers'
+
+    def __str__(self):
+        return f"Ledger for {self.investor.full_name}"
+
+
+class FxRateQuerySet(models.QuerySet):
+    """
+    Rates queryset refusing to delete the last rate of a pair in use.
+
+    Payments in a currency without any rate would drop out of the SQL
+    conversion (usd_amount_expression() yields NULL) while Python
+    conversions raise MissingRateError, so sums and single figures would
+    disagree.
+    """
+
+    def last_rates_in_use(self):
+        """
+        Currencies whose every rate is in this queryset and that payments
+        use, mapped to their payment count.
+        """
+        in_use = {}
+        for currency in set(self.values_list('quote_currency', flat=True)):
+            pair = FxRate.objects.filter(base_currency='USD', quote_currency=currency)
+            if pair.exclude(pk__in=self.values('pk')).exists():
+                continue
+            count = Payment.objects.filter(currency=currency).count()
+            if count:
+                in_use[currency] = count
+        return in_use
+
+    def delete(self):
+        in_use = self.last_rates_in_use()
+        if in_use:
+            raise models.ProtectedError(
+                'Cannot delete the last exchange rate of a currency that payments use: '
+                + ', '.join(f'{currency} ({count} payments)' for currency, count in sorted(in_use.items())),
+                set(self.filter(quote_currency__in=in_use))
+            )
+        return super().delete()
+
+
+class FxRate(models.Model):
+    """
+    Exchange rate of a currency against USD from an effective date on.
+
+    One unit of base_currency (USD, the reporting currency) buys `rate`
+    units of quote_currency. A rate applies to payments dated from its
+    effective_date until the pair's next rate; payments dated before the
+    pair's first rate use that first rate. Conversions go through
+    apps.payments.fx (Python) and usd_amount_expression() (SQL).
+
+    Saving or deleting a rate refreshes the affected investor ledgers and
+    the dashboard. KPI snapshots of past days keep their figures until
+    snapshot_kpis --backfill is run. The last rate of a currency that
+    payments use can't be deleted (see FxRateQuerySet); record a new rate
+    instead.
+    """
+
+    base_currency = models.CharField(
+        max_length=3,
+        default='USD',
+        help_text='Currency the rate is quoted against (USD)'
+    )
+    quote_currency = models.CharField(
+        max_length=3,
+        help_text='ISO 4217 code of the converted currency, e.g. KES'
+    )
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=6,
+        validators=[MinValueValidator(Decimal('0.000001'))],
+        help_text='Units of the quote currency per unit of the base currency'
+    )
+    effective_date = models.DateField(
+        help_text='First payment date the rate applies to'
+    )
+    source = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text='Where the rate came from (e.g. CBK mean rate)'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FxRateQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['base_currency', 'quote_currency', '-effective_date']
+        verbose_name = 'FX Rate'
+        verbose_name_plural = 'FX Rates'
+        constraints = [
+            # Also the index behind the point-in-time lookups
+            models.UniqueConstraint(
+                fields=['base_currency', 'quote_currency', 'effective_date'],
+                name='unique_fx_rate_pair_date'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.base_currency}/{self.quote_currency} {self.rate} from {self.effective_date}"
+
+    def clean(self):
+        self.base_currency = (self.base_currency or '').upper()
+        self.quote_currency = (self.quote_currency or '').upper()
+        if self.base_currency != 'USD':
+            raise ValidationError({'base_currency': 'Rates are quoted against USD.'})
+        if self.quote_currency == self.base_currency:
+            raise ValidationError({'quote_currency': 'Quote and base currency must differ.'})
+
+    def delete(self, *args, **kwargs):
+        if self.pk is not None:
+            in_use = FxRate.objects.filter(pk=self.pk).last_rates_in_use()
+            if in_use:
+                raise models.ProtectedError(
+                    f'Cannot delete the last {self.quote_currency} exchange rate: '
+                    f'{in_use[self.quote_currency]} payments are in {self.quote_currency}.',
+                    {self}
+                )
+        return super().delete(*args, **kwargs)
+
+
+def usd_amount_expression(prefix=''):
+    """
+    Build an ORM expression converting a payment amount to USD.
+
+    Amounts in other currencies are divided by the FxRate in effect on the
+    payment date, looked up per row with a correlated subquery on the
+    rate table's (pair, effective_date) index. Pass a lookup prefix (e.g.
+    'payments__') to use the expression from a related model.
+
+    Args:
+        prefix: Optional relation path to the Payment fields
+    """
+    money = DecimalField(max_digits=14, decimal_places=4)
+    rates = FxRate.objects.filter(base_currency='USD', quote_currency=OuterRef(f'{prefix}currency'))
+    rate = Coalesce(
+        Subquery(
+            rates.filter(effective_date__lte=OuterRef(f'{prefix}payment_date'))
+            .order_by('-effective_date').values('rate')[:1]
+        ),
+        # Payments dated before the pair's first rate
+        Subquery(rates.order_by('effective_date').values('rate')[:1]),
+        output_field=DecimalField(max_digits=18, decimal_places=6)
+    )
+    return Case(
+        When(**{f'{prefix}currency': 'USD'}, then=F(f'{prefix}amount')),
+        default=ExpressionWrapper(F(f'{prefix}amount') / rate, output_field=money),
+        output_field=money
+    )
+
+
+def payment_search_text():
+    """
+    Expression computing Payment.search_text in SQL, for set-based writes:
+
+        Payment.objects.filter(...).update(search_text=payment_search_text())
+    """
+    investor = Investor.objects.filter(pk=OuterRef('investor_id'))
+    return Concat(
+        Subquery(investor.values('first_name')), Value(' '),
+        Subquery(investor.values('last_name')), Value(' '),
+        Subquery(investor.values('email')), Value(' '),
+        'reference_number', Value(' '),
+        'notes',
+        output_field=models.TextField()
+    )
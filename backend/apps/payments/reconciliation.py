@@ -0,0 +1,363 @@
+"""
+Automatic matching of bank statement lines to PENDING payments.
+
+PENDING payments are loaded once into in-memory indexes:
+    - by exact reference number (hash lookup)
+    - by normalized reference token (hash lookup)
+    - by (currency, amount), each holding payments sorted by date so a
+      date window is found with bisect
+
+Candidates for every bank line are found in O(1)/O(log n) by exact
+reference, fuzzy reference (normalized tokens of the bank reference and
+narration) and amount plus date proximity. Payments are then assigned
+across the whole statement, strongest evidence first: reference and
+amount, then reference alone, then amount and date. Each payment is
+claimed by at most one line, so a weak match on an early line can't take
+a payment from a later line that matches it exactly. Matches at or above
+a threshold can be verified through the regular bulk verification path.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from heapq import nsmallest
+
+from .bulk import bulk_verify_payments
+from .importers import iter_statement_rows, parse_amount, parse_date, parse_choice
+from .models import Payment
+
+
+DEFAULT_DATE_WINDOW = 7
+
+# Confidence per matching strategy
+EXACT_REFERENCE_AND_AMOUNT = Decimal('1.00')
+FUZZY_REFERENCE_AND_AMOUNT = Decimal('0.90')
+EXACT_REFERENCE_ONLY = Decimal('0.75')
+FUZZY_REFERENCE_ONLY = Decimal('0.65')
+AMOUNT_AND_DATE_MAX = Decimal('0.80')
+AMOUNT_AND_DATE_AMBIGUOUS = Decimal('0.40')
+
+# Taken off a reference-only match in proportion to the relative amount
+# difference; a currency mismatch takes all of it
+REFERENCE_AMOUNT_PENALTY = Decimal('0.30')
+
+# Claim order across a statement; lower tiers are assigned first
+TIER_REFERENCE_AND_AMOUNT = 0
+TIER_FUZZY_REFERENCE_AND_AMOUNT = 1
+TIER_REFERENCE_ONLY = 2
+TIER_AMOUNT_AND_DATE = 3
+
+# Nearest amount/date candidates kept per line; bounds the assignment
+# when many pending payments share an amount and due date
+MAX_AMOUNT_CANDIDATES = 20
+
+# Shortest normalized token treated as a possible reference
+MIN_REFERENCE_LENGTH = 4
+
+_NON_ALNUM = re.compile(r'[^0-9A-Z]+')
+
+
+def normalize_reference(value):
+    """Upper-case a reference and drop separators and leading zeros of numbers"""
+    token = _NON_ALNUM.sub('', str(value or '').upper())
+    return token.lstrip('0') if token.isdigit() else token
+
+
+def reference_tokens(*values):
+    """Normalized candidate reference tokens found in free text"""
+    tokens = set()
+    for value in values:
+        text = str(value or '').upper()
+        whole = normalize_reference(text)
+        if len(whole) >= MIN_REFERENCE_LENGTH:
+            tokens.add(whole)
+        for part in re.split(r'[\s,;:/|]+', text):
+            token = normalize_reference(part)
+            if len(token) >= MIN_REFERENCE_LENGTH:
+                tokens.add(token)
+    return tokens
+
+
+class BankTransaction:
+    """One credit line of a bank statement"""
+    __slots__ = ('row', 'amount', 'currency', 'date', 'reference', 'description')
+
+    def __init__(self, row, amount, currency, date, reference='', description=''):
+        self.row = row
+        self.amount = amount.quantize(Decimal('0.01'))
+        self.currency = currency
+        self.date = date
+        self.reference = str(reference or '').strip()
+        self.description = str(description or '').strip()
+
+
+class Match:
+    """A proposed pairing of a bank line with a pending payment"""
+    __slots__ = ('transaction', 'payment_id', 'investor_id', 'confidence', 'method')
+
+    def __init__(self, transaction, payment_id, investor_id, confidence, method):
+        self.transaction = transaction
+        self.payment_id = payment_id
+        self.investor_id = investor_id
+        self.confidence = confidence
+        self.method = method
+
+    def as_dict(self):
+        return {
+            'row': self.transaction.row,
+            'payment_id': self.payment_id,
+            'investor_id': self.investor_id,
+            'confidence': float(self.confidence),
+            'method': self.method,
+            'amount': str(self.transaction.amount),
+            'currency': self.transaction.currency,
+            'reference': self.transaction.reference,
+        }
+
+
+class PendingPaymentIndex:
+    """
+    In-memory indexes over PENDING payments for constant/logarithmic matching.
+    """
+
+    def __init__(self, payments, date_window=DEFAULT_DATE_WINDOW):
+        """
+        Args:
+            payments: Iterable of (id, reference_number, amount, currency,
+                payment_date, investor_id) tuples
+            date_window: Max days between bank date and payment date for
+                amount-based matches
+        """
+        self.date_window = date_window
+        self.payments = {}
+        self.by_reference = {}
+        self.by_token = {}
+        self.by_amount = {}
+        self.claimed = set()
+
+        for payment_id, reference, amount, currency, payment_date, investor_id in payments:
+            amount = Decimal(amount).quantize(Decimal('0.01'))
+            self.payments[payment_id] = (amount, currency, investor_id)
+            reference = (reference or '').strip()
+            if reference:
+                self.by_reference.setdefault(reference, []).append(payment_id)
+                token = normalize_reference(reference)
+                if len(token) >= MIN_REFERENCE_LENGTH:
+                    self.by_token.setdefault(token, []).append(payment_id)
+            self.by_amount.setdefault((currency, amount), []).append(
+                (payment_date.toordinal(), payment_id)
+            )
+
+        for entries in self.by_amount.values():
+            entries.sort()
+
+    @classmethod
+    def load(cls, date_window=DEFAULT_DATE_WINDOW):
+        """Build the index from all PENDING payments with one streamed query"""
+        rows = Payment.objects.filter(payment_status='PENDING').values_list(
+            'id', 'reference_number', 'amount', 'currency', 'payment_date', 'investor_id'
+        ).iterator(chunk_size=5000)
+        return cls(rows, date_window=date_window)
+
+    def _available(self, payment_ids):
+        return [payment_id for payment_id in payment_ids if payment_id not in self.claimed]
+
+    def _same_amount(self, payment_id, transaction):
+        amount, currency, _ = self.payments[payment_id]
+        return amount == transaction.amount and currency == transaction.currency
+
+    def _reference_only_confidence(self, base, payment_id, transaction):
+        """Reference match confidence, lowered by how far the amounts differ"""
+        amount, currency, _ = self.payments[payment_id]
+        if currency != transaction.currency:
+            return base - REFERENCE_AMOUNT_PENALTY
+        difference = min(abs(amount - transaction.amount) / max(amount, transaction.amount), 1)
+        return (base - REFERENCE_AMOUNT_PENALTY * difference).quantize(Decimal('0.01'))
+
+    def _by_reference(self, transaction):
+        """
+        Exact and fuzzy reference candidates. A lone candidate with another
+        amount or currency is kept at a reduced confidence.
+        """
+        exact = self._available(self.by_reference.get(transaction.reference, []))
+        fuzzy = []
+        for token in reference_tokens(transaction.reference, transaction.description):
+            fuzzy.extend(self.by_token.get(token, []))
+        fuzzy = [payment_id for payment_id in self._available(dict.fromkeys(fuzzy)) if payment_id not in exact]
+
+        found = []
+        for candidates, with_amount, without_amount, tier, method in (
+            (exact, EXACT_REFERENCE_AND_AMOUNT, EXACT_REFERENCE_ONLY,
+             TIER_REFERENCE_AND_AMOUNT, 'exact_reference'),
+            (fuzzy, FUZZY_REFERENCE_AND_AMOUNT, FUZZY_REFERENCE_ONLY,
+             TIER_FUZZY_REFERENCE_AND_AMOUNT, 'fuzzy_reference'),
+        ):
+            same_amount = [payment_id for payment_id in candidates if self._same_amount(payment_id, transaction)]
+            found.extend((tier, with_amount, payment_id, method) for payment_id in same_amount)
+            if not same_amount and len(candidates) == 1:
+                confidence = self._reference_only_confidence(without_amount, candidates[0], transaction)
+                found.append((TIER_REFERENCE_ONLY, confidence, candidates[0], method))
+        return found
+
+    def _by_amount_and_date(self, transaction):
+        """Unclaimed payments with the same amount and currency, closest date first"""
+        entries = self.by_amount.get((transaction.currency, transaction.amount))
+        if not entries:
+            return []
+
+        day = transaction.date.toordinal()
+        low = bisect_left(entries, (day - self.date_window,))
+        high = bisect_right(entries, (day + self.date_window, float('inf')))
+        candidates = nsmallest(MAX_AMOUNT_CANDIDATES, (
+            (abs(ordinal - day), payment_id)
+            for ordinal, payment_id in entries[low:high]
+            if payment_id not in self.claimed
+        ))
+        if not candidates:
+            return []
+
+        # Two payments equally close to the bank date: any pick is a guess
+        ambiguous = len(candidates) > 1 and candidates[1][0] == candidates[0][0]
+        found = []
+        for distance, payment_id in candidates:
+            if ambiguous:
+                confidence = AMOUNT_AND_DATE_AMBIGUOUS
+            else:
+                closeness = Decimal(self.date_window - distance) / Decimal(self.date_window + 1)
+                confidence = min(
+                    (Decimal('0.50') + Decimal('0.30') * closeness).quantize(Decimal('0.01')),
+                    AMOUNT_AND_DATE_MAX,
+                )
+            found.append((TIER_AMOUNT_AND_DATE, confidence, payment_id, 'amount_date'))
+        return found
+
+    def candidates(self, transaction):
+        """
+        Unclaimed payments a bank line could match.
+
+        Returns:
+            List of (tier, confidence, payment_id, method) tuples
+        """
+        return self._by_reference(transaction) + self._by_amount_and_date(transaction)
+
+    def _claim(self, transaction, payment_id, confidence, method):
+        self.claimed.add(payment_id)
+        return Match(transaction, payment_id, self.payments[payment_id][2], confidence, method)
+
+    def match(self, transaction):
+        """
+        Propose a payment for a single bank line and claim it.
+
+        Returns:
+            Match or None
+        """
+        found = self.candidates(transaction)
+        if not found:
+            return None
+        _, confidence, payment_id, method = min(found, key=lambda candidate: (candidate[0], -candidate[1]))
+        return self._claim(transaction, payment_id, confidence, method)
+
+    def assign(self, transactions):
+        """
+        Match a whole statement, claiming payments strongest evidence first.
+
+        Reference candidates of every line are ranked by tier, then
+        confidence, then statement order, and claimed. Lines left over are
+        then matched by amount and date against the payments still free.
+        Each line and each payment is used at most once.
+
+        Returns:
+            List with a Match or None per transaction, in input order
+        """
+        matches = [None] * len(transactions)
+        for strategy in (self._by_reference, self._by_amount_and_date):
+            ranked = []
+            for position, transaction in enumerate(transactions):
+                if matches[position] is None:
+                    for order, (tier, confidence, payment_id, method) in enumerate(strategy(transaction)):
+                        ranked.append((tier, -confidence, position, order, payment_id, method))
+            ranked.sort()
+
+            for _, confidence, position, _, payment_id, method in ranked:
+                if matches[position] is None and payment_id not in self.claimed:
+                    matches[position] = self._claim(transactions[position], payment_id, -confidence, method)
+        return matches
+
+
+def iter_bank_transactions(file, filename, default_currency='USD'):
+    """
+    Stream BankTransaction objects from a CSV or XLSX bank statement.
+
+    Yields (row_number, BankTransaction or error message) pairs.
+    """
+    for row_number, fields in iter_statement_rows(file, filename, require_investor=False):
+        try:
+            amount = parse_amount(fields.get('amount'))
+            if amount <= 0:
+                raise ValueError('Only credit lines (positive amounts) can be matched.')
+            transaction = BankTransaction(
+                row_number,
+                amount,
+                parse_choice(fields.get('currency'), Payment.CURRENCY_CHOICES, default_currency, 'currency'),
+                parse_date(fields.get('payment_date')),
+                fields.get('reference_number'),
+                fields.get('notes'),
+            )
+        except ValueError as exc:
+            yield row_number, str(exc)
+            continue
+        yield row_number, transaction
+
+
+def reconcile(transactions, index=None, auto_verify_threshold=None, user=None):
+    """
+    Match bank lines to pending payments and optionally verify the best ones.
+
+    Args:
+        transactions: Iterable of (row_number, BankTransaction or error) pairs
+        index: PendingPaymentIndex (loaded from the database by default)
+        auto_verify_threshold: Verify matches with confidence >= this value
+        user: User recorded as verifier for auto-verified payments
+
+    Returns:
+        Dict with matches, unmatched rows, invalid rows and, when
+        auto-verifying, the verification outcome per payment id.
+    """
+    index = index or PendingPaymentIndex.load()
+    lines = []
+    invalid = []
+    for row_number, transaction in transactions:
+        if isinstance(transaction, str):
+            invalid.append({'row': row_number, 'message': transaction})
+        else:
+            lines.append(transaction)
+
+    matches = []
+    unmatched = []
+    for transaction, match in zip(lines, index.assign(lines)):
+        if match is None:
+            unmatched.append({
+                'row': transaction.row,
+                'amount': str(transaction.amount),
+                'currency': transaction.currency,
+                'reference': transaction.reference,
+            })
+        else:
+            matches.append(match)
+
+    result = {
+        'matches': [match.as_dict() for match in matches],
+        'unmatched': unmatched,
+        'invalid': invalid,
+    }
+
+    if auto_verify_threshold is not None:
+        threshold = Decimal(str(auto_verify_threshold))
+        payment_ids = [match.payment_id for match in matches if match.confidence >= threshold]
+        verified = bulk_verify_payments(
+            payment_ids, user, notes='Auto-reconciled with bank statement'
+        ) if payment_ids else {}
+        result['verified'] = [
+            {'id': payment_id, 'result': outcome}
+            for payment_id, outcome in verified.items()
+        ]
+    return result
@@ -0,0 +1,196 @@
+"""
+Payment schedule: expected installments materialized as PENDING payments.
+
+Every active investor owes an entry fee, due on their joined_date, and a
+quarterly installment of quarterly_payment_amount, due on the last day of
+each quarter that starts on or after joined_date, until the installments
+add up to share_amount. generate_schedule() computes the installments of
+all investors in memory, diffs them against existing payments by payment
+type and quarter with one query, and inserts the missing ones with
+bulk_create, so running it again creates nothing new.
+
+Failed payments don't cover an installment: after a failed attempt the
+installment is expected (and overdue) again.
+"""
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.investors.models import Investor
+from .ledger import refresh_ledgers
+from .models import Payment, payment_search_text
+from .signals import payments_bulk_changed
+
+
+SCHEDULE_NOTE = 'Scheduled installment'
+
+# Investors per ledger and search text refresh statement
+CHUNK_SIZE = 500
+
+# 'Q1 2024', 'q1-2024', '2024 Q1', '2024-Q1', ...
+QUARTER_PATTERN = re.compile(r'^\s*(?:q([1-4])[\s/-]*(\d{4})|(\d{4})[\s/-]*q([1-4]))\s*$', re.IGNORECASE)
+
+
+def quarter_of(day):
+    """(year, quarter number) containing day"""
+    return day.year, (day.month - 1) // 3 + 1
+
+
+def quarter_start(year, number):
+    return date(year, (number - 1) * 3 + 1, 1)
+
+
+def quarter_end(year, number):
+    year, number = next_quarter(year, number)
+    return quarter_start(year, number) - timedelta(days=1)
+
+
+def next_quarter(year, number):
+    return (year + 1, 1) if number == 4 else (year, number + 1)
+
+
+def quarter_label(year, number):
+    """Label stored in Payment.quarter, e.g. 'Q1 2024'"""
+    return f'Q{number} {year}'
+
+
+def parse_quarter(label):
+    """(year, quarter number) from a quarter label, or None if it isn't one"""
+    match = QUARTER_PATTERN.match(label or '')
+    if not match:
+        return None
+    number, year = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+    return int(year), int(number)
+
+
+def expected_installments(investor, through):
+    """
+    Installments an investor owes for periods that have started by through.
+
+    Returns:
+        List of (payment_type, quarter as (year, number) or None, amount,
+        due date)
+    """
+    installments = []
+    if investor.entry_fee_amount > 0 and investor.joined_date <= through:
+        installments.append(('ENTRY_FEE', None, investor.entry_fee_amount, investor.joined_date))
+
+    amount = investor.quarterly_payment_amount
+    if amount <= 0:
+        return installments
+
+    quarter = quarter_of(investor.joined_date)
+    if quarter_start(*quarter) < investor.joined_date:
+        quarter = next_quarter(*quarter)
+    scheduled = 0
+    while quarter_start(*quarter) <= through:
+        if investor.share_amount > 0:
+            if scheduled >= investor.share_amount:
+                break
+            amount = min(investor.quarterly_payment_amount, investor.share_amount - scheduled)
+        installments.append(('QUARTERLY', quarter, amount, quarter_end(*quarter)))
+        scheduled += amount
+        quarter = next_quarter(*quarter)
+    return installments
+
+
+def existing_installments(investors):
+    """
+    Installments of the investors (a queryset) already covered by a
+    payment that hasn't failed.
+
+    Quarterly payments without a recognisable quarter label count for the
+    quarter of their due date (or payment date).
+
+    Returns:
+        Set of (investor id, payment_type, quarter or None)
+    """
+    payments = Payment.objects.filter(
+        investor__in=investors,
+        payment_type__in=['ENTRY_FEE', 'QUARTERLY'],
+    ).exclude(payment_status='FAILED').values_list(
+        'investor_id', 'payment_type', 'quarter', 'due_date', 'payment_date'
+    )
+
+    covered = set()
+    for investor_id, payment_type, label, due_date, payment_date in payments.iterator(chunk_size=5000):
+        quarter = None
+        if payment_type == 'QUARTERLY':
+            quarter = parse_quarter(label) or quarter_of(due_date or payment_date)
+        covered.add((investor_id, payment_type, quarter))
+    return covered
+
+
+def generate_schedule(through=None, investor_ids=None, dry_run=False, batch_size=1000):
+    """
+    Create the PENDING payments missing from active investors' schedules.
+
+    Args:
+        through: Include installments of periods started by this date
+            (defaults to today, i.e. up to the current quarter)
+        investor_ids: Optional iterable restricting the investors
+        dry_run: Compute and report without creating payments
+        batch_size: Rows per INSERT
+
+    Returns:
+        Dict with dry_run, investors, expected, existing, created,
+        by_type ({payment_type: count}), overdue (created payments already
+        past due) and payments (the unsaved or created Payment objects)
+    """
+    today = timezone.now().date()
+    through = through or today
+
+    investors = Investor.objects.filter(investor_status='ACTIVE')
+    if investor_ids is not None:
+        investors = investors.filter(id__in=investor_ids)
+    covered = existing_installments(investors)
+    investors = list(investors.only(
+        'id', 'joined_date', 'share_amount', 'entry_fee_amount', 'quarterly_payment_amount'
+    ))
+
+    expected = 0
+    missing = []
+    for investor in investors:
+        for payment_type, quarter, amount, due_date in expected_installments(investor, through):
+            expected += 1
+            if (investor.id, payment_type, quarter) in covered:
+                continue
+            missing.append(Payment(
+                investor_id=investor.id,
+                payment_type=payment_type,
+                amount=amount,
+                currency='USD',
+                payment_status='PENDING',
+                payment_method='BANK_TRANSFER',
+                # Expected payments are dated when they fall due
+                payment_date=due_date,
+                due_date=due_date,
+                quarter=quarter_label(*quarter) if quarter else '',
+                notes=SCHEDULE_NOTE,
+            ))
+
+    investor_ids = sorted({payment.investor_id for payment in missing})
+    if missing and not dry_run:
+        with transaction.atomic():
+            Payment.objects.bulk_create(missing, batch_size=batch_size)
+            for start in range(0, len(investor_ids), CHUNK_SIZE):
+                chunk = investor_ids[start:start + CHUNK_SIZE]
+                Payment.objects.filter(
+                    investor_id__in=chunk, search_text=''
+                ).update(search_text=payment_search_text())
+                refresh_ledgers(chunk)
+        payments_bulk_changed.send(sender=Payment, investor_ids=investor_ids)
+
+    return {
+        'dry_run': dry_run,
+        'investors': len(investors),
+        'expected': expected,
+        'existing': expected - len(missing),
+        'created': len(missing),
+        'by_type': dict(Counter(payment.payment_type for payment in missing)),
+        'overdue': sum(1 for payment in missing if payment.due_date < today),
+        'payments': missing,
+    }
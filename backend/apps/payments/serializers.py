@@ -1,12 +1,17 @@
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from .filters import PaymentFilter
 from .models import Payment
+from apps.common.fieldsets import SparseFieldsetMixin
 from apps.investors.models import Investor
 
 
-class PaymentListSerializer(serializers.ModelSerializer):
+class PaymentListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for payment list views.
-    Includes investor name and computed properties.
+    Includes investor name and computed properties; supports ?fields= and
+    ?omit= and building rows from values() dicts.
     """
     investor_name = serializers.CharField(source='investor.full_name', read_only=True)
     investor_email = serializers.EmailField(source='investor.email', read_only=True)
@@ -48,6 +53,32 @@ class PaymentListSerializer(serializers.ModelSerializer):
             'verified_by_username',
             'created_at',
         ]
+        value_sources = {
+            'investor_name': ['investor__first_name', 'investor__last_name'],
+            'amount_usd': ['amount', 'currency', 'payment_date'],
+            'amount_kes': ['amount', 'currency', 'payment_date'],
+            'is_overdue': ['payment_status', 'due_date'],
+            'days_overdue': ['payment_status', 'due_date'],
+        }
+
+    @cached_property
+    def today(self):
+        return timezone.now().date()
+
+    def build_investor_name(self, row):
+        return f"{row['investor__first_name']} {row['investor__last_name']}".strip()
+
+    def build_amount_usd(self, row):
+        return Payment.convert_to_usd(row['amount'], row['currency'], row['payment_date'])
+
+    def build_amount_kes(self, row):
+        return Payment.convert_to_kes(row['amount'], row['currency'], row['payment_date'])
+
+    def build_is_overdue(self, row):
+        return Payment.overdue_days(row['payment_status'], row['due_date'], self.today) > 0
+
+    def build_days_overdue(self, row):
+        return Payment.overdue_days(row['payment_status'], row['due_date'], self.today)
 
 
 class PaymentDetailSerializer(serializers.ModelSerializer):
@@ -157,3 +188,94 @@ class PaymentVerifySerializer(serializers.Serializer):
 
         # The view will call verify_payment method
         return instance
+
+
+class PaymentBulkActionSerializer(serializers.Serializer):
+    """
+    Serializer for bulk verify/fail actions.
+    Selects payments either by explicit ids or by PaymentFilter parameters.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        help_text='Payment ids to process'
+    )
+    filter = serializers.DictField(
+        required=False,
+        allow_empty=False,
+        help_text='PaymentFilter parameters selecting the payments to process'
+    )
+    notes = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default='',
+        help_text='Optional notes (verification notes or failure reason)'
+    )
+
+    def validate(self, data):
+        """Require exactly one of ids or filter"""
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError('Provide either ids or filter, but not both.')
+        return data
+
+    def validate_filter(self, value):
+        """
+        Only accept PaymentFilter parameters, at least one of them set.
+        PaymentFilter ignores unknown keys, so a misspelled one would
+        otherwise select every PENDING payment.
+        """
+        known = PaymentFilter.parameter_names()
+        unknown = sorted(set(value) - known)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filter parameter(s): {', '.join(unknown)}. "
+                f"Use {', '.join(sorted(known))}."
+            )
+        if not any(value[key] not in (None, '') for key in value):
+            raise serializers.ValidationError('Set at least one filter parameter.')
+        return value
+
+
+class PaymentImportSerializer(serializers.Serializer):
+    """
+    Serializer for bank statement uploads.
+    Column defaults apply to rows whose file has no such column or value.
+    """
+    file = serializers.FileField(help_text='CSV or XLSX bank statement')
+    dry_run = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Validate and report without creating payments'
+    )
+    currency = serializers.ChoiceField(choices=Payment.CURRENCY_CHOICES, default='USD')
+    payment_type = serializers.ChoiceField(choices=Payment.PAYMENT_TYPE_CHOICES, default='OTHER')
+    payment_method = serializers.ChoiceField(choices=Payment.METHOD_CHOICES, default='BANK_TRANSFER')
+
+
+class PaymentReconcileSerializer(serializers.Serializer):
+    """
+    Serializer for bank statement reconciliation.
+    Matches are only proposed unless auto_verify_threshold is given.
+    """
+    file = serializers.FileField(help_text='CSV or XLSX bank statement')
+    currency = serializers.ChoiceField(
+        choices=Payment.CURRENCY_CHOICES,
+        default='USD',
+        help_text='Currency for lines without one'
+    )
+    date_window = serializers.IntegerField(
+        min_value=0,
+        max_value=90,
+        default=7,
+        help_text='Max days between bank date and payment date for amount matches'
+    )
+    auto_verify_threshold = serializers.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        min_value=0,
+        max_value=1,
+        required=False,
+        allow_null=True,
+        help_text='Verify matches with at least this confidence (0-1)'
+    )
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Sent after set-based payment writes (queryset.update(), bulk_create) that
+# bypass the post_save/post_delete signals.
+# Provides: investor_ids - ids of the investors whose payments changed
+payments_bulk_changed = Signal()
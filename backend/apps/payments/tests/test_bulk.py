@@ -0,0 +1,123 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import InvestorLedger, Payment
+
+
+class BulkActionTests(TestCase):
+    """POST /api/payments/bulk-verify/ and /api/payments/bulk-fail/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        cls.march, cls.april, cls.may = [
+            cls.pay(payment_date) for payment_date in (date(2024, 3, 10), date(2024, 4, 10), date(2024, 5, 10))
+        ]
+
+    @classmethod
+    def pay(cls, payment_date, payment_status='PENDING'):
+        return Payment.objects.create(
+            investor=cls.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('500.00'),
+            currency='USD',
+            payment_status=payment_status,
+            payment_date=payment_date,
+            due_date=payment_date,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, action, body):
+        return self.client.post(f'/api/payments/{action}/', body, format='json')
+
+    def statuses(self):
+        return dict(Payment.objects.values_list('id', 'payment_status'))
+
+    def test_verify_by_ids(self):
+        response = self.post('bulk-verify', {'ids': [self.march.pk, self.april.pk], 'notes': 'March run'})
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['summary'], {'verified': 2})
+        self.assertEqual(self.statuses(), {
+            self.march.pk: 'VERIFIED', self.april.pk: 'VERIFIED', self.may.pk: 'PENDING',
+        })
+        self.march.refresh_from_db()
+        self.assertEqual(self.march.verified_by, self.user)
+        self.assertEqual(self.march.notes, 'Verification notes: March run')
+        ledger = InvestorLedger.objects.get(investor=self.investor)
+        self.assertEqual((ledger.verified_count, ledger.pending_count), (2, 1))
+
+    def test_fail_by_filter(self):
+        response = self.post('bulk-fail', {
+            'filter': {'payment_date_after': '2024-04-01', 'payment_date_before': '2024-04-30'},
+            'notes': 'Bounced',
+        })
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['results'], [{'id': self.april.pk, 'result': 'failed'}])
+        self.april.refresh_from_db()
+        self.assertEqual((self.april.payment_status, self.april.notes), ('FAILED', 'Failed: Bounced'))
+
+    def test_filter_only_selects_pending_payments(self):
+        verified = self.pay(date(2024, 4, 20), payment_status='VERIFIED')
+
+        response = self.post('bulk-verify', {'filter': {'investor': self.investor.pk}})
+
+        self.assertEqual(response.data['summary'], {'verified': 3})
+        self.assertNotIn(verified.pk, [row['id'] for row in response.data['results']])
+
+    def test_unknown_or_empty_filters_are_rejected(self):
+        for body in (
+            {'filter': {'statuss': 'X'}},
+            {'filter': {'payment_status': 'PENDING', 'search': 'jane'}},
+            {'filter': {'payment_status': ''}},
+            {'filter': {}},
+            {'ids': [self.march.pk], 'filter': {'payment_status': 'PENDING'}},
+            {'notes': 'nothing selected'},
+        ):
+            for action in ('bulk-verify', 'bulk-fail'):
+                with self.subTest(action=action, body=body):
+                    response = self.post(action, body)
+                    self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(set(self.statuses().values()), {'PENDING'})
+
+    def test_invalid_filter_value_is_rejected(self):
+        response = self.post('bulk-verify', {'filter': {'payment_status': 'NOT_A_STATUS'}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', response.data)
+
+    def test_already_processed_payments_are_reported(self):
+        self.post('bulk-verify', {'ids': [self.march.pk]})
+        self.post('bulk-fail', {'ids': [self.april.pk]})
+
+        verify = self.post('bulk-verify', {'ids': [self.march.pk, self.april.pk, self.may.pk, 999999]})
+        fail = self.post('bulk-fail', {'ids': [self.march.pk, self.april.pk]})
+
+        self.assertEqual({row['id']: row['result'] for row in verify.data['results']}, {
+            self.march.pk: 'already_verified',
+            self.april.pk: 'invalid_status',
+            self.may.pk: 'verified',
+            999999: 'not_found',
+        })
+        self.assertEqual({row['id']: row['result'] for row in fail.data['results']}, {
+            self.march.pk: 'invalid_status',
+            self.april.pk: 'already_failed',
+        })
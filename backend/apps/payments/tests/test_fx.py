@@ -0,0 +1,201 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import ProtectedError
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.fx import MissingRateError, RateTable, convert, invalidate
+from apps.payments.ledger import refresh_ledgers
+from apps.payments.models import FxRate, InvestorLedger, Payment, usd_amount_expression
+
+
+class FxRateDeletionTests(TestCase):
+    """The last rate of a currency in use can't be deleted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Replace the rate seeded by the migration; no payments use it yet
+        FxRate.objects.filter(quote_currency='KES').delete()
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        cls.january = FxRate.objects.create(quote_currency='KES', rate=Decimal('129.5'), effective_date=date(2024, 1, 1))
+        cls.march = FxRate.objects.create(quote_currency='KES', rate=Decimal('125.25'), effective_date=date(2024, 3, 1))
+        cls.payment = Payment.objects.create(
+            investor=investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('25000.50'),
+            currency='KES',
+            payment_status='VERIFIED',
+            payment_date=date(2024, 3, 15),
+            due_date=date(2024, 3, 15),
+        )
+
+    def setUp(self):
+        invalidate()
+
+    def sql_usd(self):
+        return Payment.objects.filter(pk=self.payment.pk).annotate(usd=usd_amount_expression()).get().usd
+
+    def test_deleting_one_of_several_rates_keeps_sql_and_python_in_step(self):
+        self.march.delete()
+        invalidate()
+
+        self.assertEqual(convert(self.payment.amount, 'KES', 'USD', self.payment.payment_date), Decimal('193.05'))
+        self.assertEqual(self.sql_usd().quantize(Decimal('0.01')), Decimal('193.05'))
+
+    def test_last_rate_in_use_is_protected(self):
+        self.march.delete()
+
+        with self.assertRaises(ProtectedError):
+            self.january.delete()
+        with self.assertRaises(ProtectedError):
+            FxRate.objects.filter(quote_currency='KES').delete()
+        self.assertTrue(FxRate.objects.filter(pk=self.january.pk).exists())
+
+    def test_deleting_every_rate_of_a_pair_at_once_is_protected(self):
+        with self.assertRaises(ProtectedError):
+            FxRate.objects.filter(quote_currency='KES').delete()
+        self.assertEqual(FxRate.objects.filter(quote_currency='KES').count(), 2)
+
+    def test_last_rate_of_an_unused_currency_can_be_deleted(self):
+        rate = FxRate.objects.create(quote_currency='UGX', rate=Decimal('3800'), effective_date=date(2024, 1, 1))
+        rate.delete()
+        self.assertFalse(FxRate.objects.filter(quote_currency='UGX').exists())
+
+    def test_admin_refuses_to_delete_the_last_rate(self):
+        admin = User.objects.create_superuser(username='root', password='pass', email='root@example.com')
+        self.client.force_login(admin)
+        self.march.delete()
+
+        url = f'/admin/payments/fxrate/{self.january.pk}/delete/'
+        response = self.client.post(url, {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'last KES rate, used by 1 payment(s)')
+        self.assertTrue(FxRate.objects.filter(pk=self.january.pk).exists())
+
+    def test_admin_bulk_delete_refuses_the_last_rates(self):
+        admin = User.objects.create_superuser(username='root', password='pass', email='root@example.com')
+        self.client.force_login(admin)
+
+        response = self.client.post('/admin/payments/fxrate/', {
+            'action': 'delete_selected',
+            '_selected_action': [self.january.pk, self.march.pk],
+            'post': 'yes',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'last KES rate')
+        self.assertEqual(FxRate.objects.filter(quote_currency='KES').count(), 2)
+
+
+class RateTableTests(SimpleTestCase):
+
+    def setUp(self):
+        self.table = RateTable([
+            ('USD', 'KES', date(2024, 1, 1), Decimal('130')),
+            ('USD', 'KES', date(2024, 3, 1), Decimal('125')),
+            ('USD', 'KES', date(2024, 6, 1), Decimal('128')),
+        ])
+
+    def test_rate_in_effect_on_a_date(self):
+        self.assertEqual(self.table.rate('KES', date(2024, 2, 29)), Decimal('130'))
+        self.assertEqual(self.table.rate('KES', date(2024, 3, 1)), Decimal('125'))
+        self.assertEqual(self.table.rate('KES', date(2024, 5, 31)), Decimal('125'))
+        self.assertEqual(self.table.rate('KES', date(2025, 1, 1)), Decimal('128'))
+
+    def test_dates_before_the_first_rate_use_it(self):
+        self.assertEqual(self.table.rate('KES', date(2020, 1, 1)), Decimal('130'))
+
+    def test_latest_rate_without_a_date(self):
+        self.assertEqual(self.table.rate('KES'), Decimal('128'))
+
+    def test_unknown_currency(self):
+        with self.assertRaises(MissingRateError):
+            self.table.rate('UGX', date(2024, 1, 1))
+
+
+class PointInTimeConversionTests(TestCase):
+    """Python and SQL conversions use the rate in effect on the payment date"""
+
+    RATES = [
+        (date(2024, 1, 1), Decimal('130.50')),
+        (date(2024, 3, 1), Decimal('125.25')),
+        (date(2024, 6, 1), Decimal('128.75')),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        FxRate.objects.filter(quote_currency='KES').delete()
+        for effective_date, rate in cls.RATES:
+            FxRate.objects.create(quote_currency='KES', rate=rate, effective_date=effective_date)
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2023, 1, 1),
+        )
+
+    def setUp(self):
+        invalidate()
+
+    def pay(self, amount, payment_date, currency='KES'):
+        return Payment.objects.create(
+            investor=self.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal(amount),
+            currency=currency,
+            payment_status='VERIFIED',
+            payment_date=payment_date,
+            due_date=payment_date,
+        )
+
+    def test_python_and_sql_agree_on_every_date(self):
+        cases = [
+            (date(2023, 12, 31), Decimal('130.50')),  # before the first rate
+            (date(2024, 1, 1), Decimal('130.50')),
+            (date(2024, 2, 29), Decimal('130.50')),
+            (date(2024, 3, 1), Decimal('125.25')),
+            (date(2024, 7, 15), Decimal('128.75')),
+        ]
+        payments = {self.pay('100000.50', day).pk: rate for day, rate in cases}
+
+        rows = Payment.objects.filter(pk__in=payments).annotate(usd=usd_amount_expression())
+        for payment in rows:
+            expected = (payment.amount / payments[payment.pk]).quantize(Decimal('0.01'))
+            self.assertEqual(payment.amount_usd, expected, payment.payment_date)
+            self.assertEqual(payment.usd.quantize(Decimal('0.01')), expected, payment.payment_date)
+
+    def test_usd_amounts_are_not_converted(self):
+        payment = self.pay('2500.00', date(2024, 3, 1), currency='USD')
+        self.assertEqual(payment.amount_usd, Decimal('2500.00'))
+        self.assertEqual(Payment.objects.annotate(usd=usd_amount_expression()).get(pk=payment.pk).usd, Decimal('2500.00'))
+
+    def test_convert_between_currencies(self):
+        self.assertEqual(convert(Decimal('1000'), 'USD', 'KES', date(2024, 4, 1)), Decimal('125250.00'))
+        self.assertEqual(convert(Decimal('125250'), 'KES', 'USD', date(2024, 4, 1)), Decimal('1000.00'))
+        self.assertEqual(convert(Decimal('1000'), 'USD', 'KES'), Decimal('128750.00'))
+
+    def test_new_rate_reconverts_ledgers(self):
+        self.pay('129000.00', date(2024, 7, 1))
+        refresh_ledgers([self.investor.pk])
+        self.assertEqual(self.investor_total(), Decimal('1001.94'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FxRate.objects.create(quote_currency='KES', rate=Decimal('129'), effective_date=date(2024, 7, 1))
+
+        self.assertEqual(self.investor_total(), Decimal('1000.00'))
+        self.assertEqual(convert(Decimal('129000'), 'KES', 'USD', date(2024, 7, 1)), Decimal('1000.00'))
+
+    def investor_total(self):
+        return InvestorLedger.objects.get(investor=self.investor).total_verified_usd
@@ -0,0 +1,168 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.importers import StatementImportError, import_payments, parse_amount
+from apps.payments.models import InvestorLedger, Payment
+
+
+def csv_file(*lines, encoding='utf-8'):
+    return io.BytesIO('\n'.join(lines).encode(encoding))
+
+
+def xlsx_file(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+class ImportPaymentsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('100000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        cls.inactive = Investor.objects.create(
+            first_name='John',
+            last_name='Roe',
+            email='john@example.com',
+            investor_type='LP',
+            share_amount=Decimal('100000.00'),
+            joined_date=date(2024, 1, 1),
+            investor_status='INACTIVE',
+        )
+
+    def issues(self, report):
+        return {row['row']: (row['status'], row['message']) for row in report.rows}
+
+    def test_creates_pending_payments_and_refreshes_the_ledger(self):
+        report = import_payments(csv_file(
+            'email,amount,date,reference,currency',
+            'jane@example.com,"1,250.00",2024-03-01,REF1,USD',
+            'JANE@example.com,KES 129000,01/04/2024,REF2,kes',
+        ), 'statement.csv')
+
+        self.assertEqual((report.total_rows, report.created, report.errors), (2, 2, 0))
+        payments = Payment.objects.filter(investor=self.investor).order_by('payment_date')
+        self.assertEqual(
+            [(payment.amount, payment.currency, payment.payment_status) for payment in payments],
+            [(Decimal('1250.00'), 'USD', 'PENDING'), (Decimal('129000.00'), 'KES', 'PENDING')]
+        )
+        self.assertIn('jane@example.com', payments[0].search_text)
+        ledger = InvestorLedger.objects.get(investor=self.investor)
+        self.assertEqual((ledger.pending_count, ledger.pending_amount_usd), (2, Decimal('2250.00')))
+
+    def test_reports_invalid_rows(self):
+        report = import_payments(csv_file(
+            'investor_id,amount,date,reference',
+            f'{self.investor.pk},100,2024-03-01,OK1',
+            f'{self.investor.pk},-5,2024-03-01,NEG',
+            f'{self.investor.pk},abc,2024-03-01,TEXT',
+            f'{self.investor.pk},100,31/31/2024,DATE',
+            f'{self.inactive.pk},100,2024-03-01,INACTIVE',
+            '999999,100,2024-03-01,UNKNOWN',
+            'inf,100,2024-03-01,INF',
+            'nan,100,2024-03-01,NAN',
+            '1.5,100,2024-03-01,FRACTION',
+            f'{self.investor.pk},12345678901,2024-03-01,TOO_BIG',
+            f'{self.investor.pk}.0,100,2024-03-01,FLOAT_ID',
+        ), 'statement.csv')
+
+        self.assertEqual((report.total_rows, report.created, report.errors), (11, 2, 9))
+        issues = self.issues(report)
+        self.assertEqual(issues[3], ('error', 'Payment amount must be greater than zero.'))
+        self.assertEqual(issues[4], ('error', "Invalid amount: 'abc'"))
+        self.assertEqual(issues[5], ('error', "Invalid date: '31/31/2024'"))
+        self.assertEqual(issues[6], ('error', 'Cannot create payment for inactive investor.'))
+        self.assertEqual(issues[7], ('error', 'Unknown investor id: 999999'))
+        self.assertEqual(issues[8], ('error', "Invalid investor id: 'inf'"))
+        self.assertEqual(issues[9], ('error', "Invalid investor id: 'nan'"))
+        self.assertEqual(issues[10], ('error', "Invalid investor id: '1.5'"))
+        self.assertEqual(issues[11], ('error', 'Payment amount must not exceed 9999999999.99.'))
+        self.assertNotIn(12, issues)
+
+    def test_non_finite_amounts_are_invalid(self):
+        # Numeric spreadsheet cells reach parse_amount() as floats
+        for value in (float('inf'), float('nan'), Decimal('-Infinity')):
+            with self.assertRaisesMessage(ValueError, 'Invalid amount'):
+                parse_amount(value)
+        self.assertEqual(parse_amount(1250.5), Decimal('1250.5'))
+
+    def test_skips_duplicate_references(self):
+        lines = ['email,amount,date,reference', 'jane@example.com,100,2024-03-01,DUP']
+        import_payments(csv_file(*lines), 'statement.csv')
+        report = import_payments(csv_file(*lines, 'jane@example.com,100,2024-03-02,DUP'), 'statement.csv')
+
+        self.assertEqual((report.created, report.duplicates), (0, 2))
+        self.assertEqual(Payment.objects.filter(reference_number='DUP').count(), 1)
+
+    def test_dry_run_creates_nothing(self):
+        report = import_payments(csv_file('email,amount,date', 'jane@example.com,100,2024-03-01'),
+                                 'statement.csv', dry_run=True)
+        self.assertEqual(report.created, 1)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_rejects_a_non_utf8_csv_before_importing_any_row(self):
+        lines = ['email,amount,date,notes'] + ['jane@example.com,100,2024-03-01,ok'] * 5
+        lines.append('jane@example.com,100,2024-03-01,café')
+        with self.assertRaisesMessage(StatementImportError, 'not UTF-8 encoded'):
+            import_payments(csv_file(*lines, encoding='latin-1'), 'statement.csv', batch_size=2)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_imports_an_xlsx(self):
+        report = import_payments(xlsx_file([
+            ['Payer Email', 'Credit', 'Value Date', 'Bank Reference'],
+            ['jane@example.com', 500, date(2024, 3, 1), 'X1'],
+            [None, None, None, None],
+            ['jane@example.com', '1,000.50', '02/03/2024', 'X2'],
+        ]), 'statement.xlsx')
+        self.assertEqual((report.total_rows, report.created, report.errors), (2, 2, 0))
+        self.assertEqual(
+            sorted(Payment.objects.values_list('amount', flat=True)), [Decimal('500.00'), Decimal('1000.50')]
+        )
+
+    def test_rejects_a_corrupt_xlsx(self):
+        data = xlsx_file([['email', 'amount', 'date'], ['jane@example.com', 100, date(2024, 3, 1)]]).getvalue()
+        for content in (b'not a zip file', data[:len(data) // 2]):
+            with self.assertRaises(StatementImportError):
+                import_payments(io.BytesIO(content), 'statement.xlsx')
+        self.assertFalse(Payment.objects.exists())
+
+    def test_rejects_missing_columns(self):
+        with self.assertRaisesMessage(StatementImportError, 'Missing required column(s): payment_date'):
+            import_payments(csv_file('email,amount', 'jane@example.com,100'), 'statement.csv')
+
+
+class ImportStatementViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass', role='ADMIN'))
+
+    def test_undecodable_csv_is_a_bad_request(self):
+        upload = SimpleUploadedFile('statement.csv', 'email,amount,date\né,1,2024-01-01\n'.encode('latin-1'))
+        response = self.client.post('/api/payments/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['detail'])
+
+    def test_corrupt_xlsx_is_a_bad_request(self):
+        upload = SimpleUploadedFile('statement.xlsx', b'PK\x03\x04 truncated')
+        response = self.client.post('/api/payments/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,174 @@
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.dashboard.kpis import payment_metrics
+from apps.investors.models import Investor
+from apps.payments.ledger import rebuild_ledgers, refresh_ledgers
+from apps.payments.models import FxRate, InvestorLedger, Payment
+
+
+class LedgerRefreshTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        FxRate.objects.filter(quote_currency='KES').update(rate=Decimal('129'))
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=timezone.now().date() - timedelta(days=400),
+        )
+        cls.other = Investor.objects.create(
+            first_name='John',
+            last_name='Roe',
+            email='john@example.com',
+            investor_type='GP',
+            share_amount=Decimal('5000.00'),
+            joined_date=timezone.now().date() - timedelta(days=400),
+        )
+
+    def pay(self, amount, currency='USD', status='VERIFIED', days_ago=30, investor=None):
+        day = timezone.now().date() - timedelta(days=days_ago)
+        return Payment.objects.create(
+            investor=investor or self.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal(amount),
+            currency=currency,
+            payment_status=status,
+            payment_date=day,
+            due_date=day,
+        )
+
+    def ledger(self, investor=None):
+        return InvestorLedger.objects.get(investor=investor or self.investor)
+
+    def test_refresh_rolls_up_payments(self):
+        today = timezone.now().date()
+        self.pay('1000.00', days_ago=60)
+        self.pay('129000.00', currency='KES', days_ago=20)
+        self.pay('250.50', status='PENDING', days_ago=10)
+        self.pay('99.50', status='PENDING', days_ago=-5)
+        self.pay('400.00', status='FAILED', days_ago=15)
+
+        refresh_ledgers([self.investor.pk])
+
+        ledger = self.ledger()
+        self.assertEqual(ledger.total_verified_usd, Decimal('2000.00'))
+        self.assertEqual(ledger.verified_usd_amount, Decimal('1000.00'))
+        self.assertEqual(ledger.verified_kes_amount, Decimal('129000.00'))
+        self.assertEqual(ledger.verified_count, 2)
+        self.assertEqual(ledger.pending_count, 2)
+        self.assertEqual(ledger.pending_amount_usd, Decimal('350.00'))
+        self.assertEqual(ledger.overdue_count, 1)
+        self.assertEqual(ledger.overdue_amount_usd, Decimal('250.50'))
+        self.assertEqual(ledger.last_payment_date, today - timedelta(days=20))
+        self.assertEqual(ledger.oldest_overdue_due_date, today - timedelta(days=10))
+
+    def test_refresh_only_touches_the_given_investors(self):
+        self.pay('1000.00')
+        self.pay('500.00', investor=self.other)
+
+        refresh_ledgers([self.investor.pk])
+
+        self.assertEqual(self.ledger().total_verified_usd, Decimal('1000.00'))
+        self.assertFalse(InvestorLedger.objects.filter(investor=self.other).exists())
+
+    def test_verify_and_fail_refresh_the_ledger(self):
+        pending = self.pay('300.00', status='PENDING', days_ago=5)
+        doomed = self.pay('200.00', status='PENDING', days_ago=5)
+        refresh_ledgers([self.investor.pk])
+        self.assertEqual(self.ledger().overdue_count, 2)
+
+        pending.verify_payment(self.user)
+        ledger = self.ledger()
+        self.assertEqual(ledger.total_verified_usd, Decimal('300.00'))
+        self.assertEqual(ledger.overdue_count, 1)
+
+        doomed.mark_failed('Bounced')
+        ledger = self.ledger()
+        self.assertEqual(ledger.pending_count, 0)
+        self.assertEqual(ledger.overdue_amount_usd, Decimal('0.00'))
+        self.assertIsNone(ledger.oldest_overdue_due_date)
+
+    def test_refresh_resets_an_investor_without_payments(self):
+        payment = self.pay('1000.00')
+        refresh_ledgers([self.investor.pk])
+        Payment.objects.filter(pk=payment.pk).delete()
+
+        refresh_ledgers([self.investor.pk])
+
+        ledger = self.ledger()
+        self.assertEqual(ledger.total_verified_usd, Decimal('0.00'))
+        self.assertEqual(ledger.verified_count, 0)
+        self.assertIsNone(ledger.last_payment_date)
+
+    def test_rebuild_reports_and_repairs_drift(self):
+        self.pay('1000.00')
+        self.pay('500.00', investor=self.other)
+        refresh_ledgers([self.investor.pk, self.other.pk])
+        InvestorLedger.objects.filter(investor=self.investor).update(total_verified_usd=Decimal('1.00'))
+
+        drift = rebuild_ledgers(dry_run=True)
+        self.assertEqual(drift, [(self.investor.pk, {'total_verified_usd': (Decimal('1.00'), Decimal('1000.00'))})])
+        self.assertEqual(self.ledger().total_verified_usd, Decimal('1.00'))
+
+        rebuild_ledgers()
+        self.assertEqual(self.ledger().total_verified_usd, Decimal('1000.00'))
+        self.assertEqual(rebuild_ledgers(dry_run=True), [])
+
+    def test_investor_totals_and_total_raised_read_the_ledger(self):
+        self.pay('1000.00')
+        self.pay('500.00', investor=self.other)
+        refresh_ledgers([self.investor.pk, self.other.pk])
+        # A ledger out of step with the payments shows it is the source
+        InvestorLedger.objects.filter(investor=self.investor).update(total_verified_usd=Decimal('750.00'))
+
+        self.assertEqual(Investor.objects.get(pk=self.investor.pk).total_paid, Decimal('750.00'))
+        annotated = Investor.objects.with_financials().get(pk=self.investor.pk)
+        self.assertEqual(annotated.total_paid_usd, Decimal('750.00'))
+        self.assertEqual(annotated.outstanding_usd, Decimal('9250.00'))
+        self.assertEqual(payment_metrics()['total_raised'], Decimal('1250.00'))
+
+    def test_investor_without_a_ledger_has_paid_nothing(self):
+        self.assertEqual(Investor.objects.get(pk=self.investor.pk).total_paid, Decimal('0.00'))
+        self.assertEqual(Investor.objects.with_financials().get(pk=self.investor.pk).total_paid_usd, Decimal('0.00'))
+
+
+class LedgerBackfillMigrationTests(TestCase):
+
+    def test_backfill_fills_every_investor(self):
+        investors = [
+            Investor.objects.create(
+                first_name='Jane',
+                last_name=name,
+                email=f'{name.lower()}@example.com',
+                investor_type='LP',
+                share_amount=Decimal('10000.00'),
+                joined_date=timezone.now().date(),
+            )
+            for name in ('Doe', 'Roe')
+        ]
+        Payment.objects.create(
+            investor=investors[0],
+            payment_type='QUARTERLY',
+            amount=Decimal('1000.00'),
+            payment_status='VERIFIED',
+            payment_date=timezone.now().date(),
+        )
+        backfill = import_module('apps.payments.migrations.0008_backfill_investor_ledger')
+
+        backfill.backfill_ledgers(apps, None)
+
+        self.assertEqual(
+            dict(InvestorLedger.objects.values_list('investor_id', 'total_verified_usd')),
+            {investors[0].pk: Decimal('1000.00'), investors[1].pk: Decimal('0.00')},
+        )
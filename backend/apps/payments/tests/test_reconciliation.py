@@ -0,0 +1,225 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from apps.payments.reconciliation import (
+    BankTransaction,
+    PendingPaymentIndex,
+    normalize_reference,
+    reconcile,
+    reference_tokens,
+)
+
+
+DAY = date(2024, 3, 15)
+
+
+def line(amount, reference='', description='', day=DAY, currency='USD', row=2):
+    return BankTransaction(row, Decimal(amount), currency, day, reference, description)
+
+
+class ReferenceNormalizationTests(SimpleTestCase):
+
+    def test_normalize_reference(self):
+        self.assertEqual(normalize_reference(' inv-00123 '), 'INV00123')
+        self.assertEqual(normalize_reference('000123'), '123')
+        self.assertEqual(normalize_reference(None), '')
+
+    def test_reference_tokens_skip_short_words(self):
+        self.assertEqual(
+            reference_tokens('MPESA: QK12-34AB', 'for 7 seas'),
+            {'MPESAQK1234AB', 'MPESA', 'QK1234AB', 'FOR7SEAS', 'SEAS'},
+        )
+
+
+class MatchScoringTests(SimpleTestCase):
+    """Confidence per matching strategy"""
+
+    def index(self, *payments, date_window=7):
+        # (id, reference, amount, currency, payment_date, investor_id)
+        return PendingPaymentIndex(payments, date_window=date_window)
+
+    def test_exact_reference_and_amount(self):
+        index = self.index((1, 'INV-001', Decimal('500.00'), 'USD', DAY, 10))
+        match = index.match(line('500', reference='INV-001'))
+        self.assertEqual((match.payment_id, match.investor_id), (1, 10))
+        self.assertEqual((match.confidence, match.method), (Decimal('1.00'), 'exact_reference'))
+
+    def test_exact_reference_with_another_amount(self):
+        index = self.index((1, 'INV-001', Decimal('500.00'), 'USD', DAY, 10))
+        match = index.match(line('450', reference='INV-001'))
+        self.assertEqual((match.confidence, match.method), (Decimal('0.72'), 'exact_reference'))
+
+    def test_reference_only_confidence_falls_with_the_amount_difference(self):
+        def confidence(amount, currency='USD'):
+            index = self.index((1, 'INV-001', Decimal('500.00'), 'USD', DAY, 10))
+            return index.match(line(amount, reference='INV-001', currency=currency)).confidence
+
+        self.assertEqual(confidence('499'), Decimal('0.75'))
+        self.assertEqual(confidence('250'), Decimal('0.60'))
+        self.assertEqual(confidence('5000'), Decimal('0.48'))
+        # Amounts in different currencies can't be compared
+        self.assertEqual(confidence('500', currency='KES'), Decimal('0.45'))
+
+    def test_exact_reference_prefers_the_candidate_with_equal_amount(self):
+        index = self.index(
+            (1, 'INV-001', Decimal('400.00'), 'USD', DAY, 10),
+            (2, 'INV-001', Decimal('500.00'), 'USD', DAY, 11),
+        )
+        match = index.match(line('500', reference='INV-001'))
+        self.assertEqual((match.payment_id, match.confidence), (2, Decimal('1.00')))
+
+    def test_fuzzy_reference_in_the_narration(self):
+        index = self.index((1, 'INV-00123', Decimal('500.00'), 'USD', DAY - timedelta(days=30), 10))
+        match = index.match(line('500', description='Transfer ref inv-00123, Jane Doe'))
+        self.assertEqual((match.confidence, match.method), (Decimal('0.90'), 'fuzzy_reference'))
+
+        index = self.index((1, 'INV-00123', Decimal('500.00'), 'USD', DAY, 10))
+        match = index.match(line('75', reference='inv00123'))
+        self.assertEqual((match.confidence, match.method), (Decimal('0.40'), 'fuzzy_reference'))
+
+    def test_amount_and_date_confidence_falls_with_distance(self):
+        def confidence(days):
+            index = self.index((1, '', Decimal('500.00'), 'USD', DAY + timedelta(days=days), 10))
+            match = index.match(line('500'))
+            return match and (match.confidence, match.method)
+
+        self.assertEqual(confidence(0), (Decimal('0.76'), 'amount_date'))
+        self.assertEqual(confidence(-3), (Decimal('0.65'), 'amount_date'))
+        self.assertEqual(confidence(7), (Decimal('0.50'), 'amount_date'))
+        self.assertIsNone(confidence(8))
+
+    def test_amount_must_match_in_the_same_currency(self):
+        index = self.index((1, '', Decimal('500.00'), 'KES', DAY, 10))
+        self.assertIsNone(index.match(line('500')))
+        self.assertEqual(index.match(line('500', currency='KES')).payment_id, 1)
+
+    def test_equally_close_candidates_are_ambiguous(self):
+        index = self.index(
+            (1, '', Decimal('500.00'), 'USD', DAY - timedelta(days=2), 10),
+            (2, '', Decimal('500.00'), 'USD', DAY + timedelta(days=2), 11),
+        )
+        match = index.match(line('500'))
+        self.assertEqual((match.confidence, match.method), (Decimal('0.40'), 'amount_date'))
+
+    def test_closest_candidate_wins(self):
+        index = self.index(
+            (1, '', Decimal('500.00'), 'USD', DAY - timedelta(days=5), 10),
+            (2, '', Decimal('500.00'), 'USD', DAY + timedelta(days=1), 11),
+        )
+        self.assertEqual(index.match(line('500')).payment_id, 2)
+
+    def test_each_payment_is_claimed_once(self):
+        index = self.index(
+            (1, 'INV-001', Decimal('500.00'), 'USD', DAY, 10),
+            (2, '', Decimal('500.00'), 'USD', DAY + timedelta(days=3), 11),
+        )
+        first = index.match(line('500', reference='INV-001'))
+        second = index.match(line('500', reference='INV-001', row=3))
+        third = index.match(line('500', row=4))
+
+        self.assertEqual(first.payment_id, 1)
+        self.assertEqual((second.payment_id, second.method), (2, 'amount_date'))
+        self.assertIsNone(third)
+
+    def test_assignment_prefers_the_stronger_match_of_a_later_line(self):
+        index = self.index((1, 'INV-2024-0001', Decimal('500.00'), 'USD', DAY, 10))
+        fuzzy, exact = index.assign([
+            line('900', description='INV20240001'),
+            line('500', reference='INV-2024-0001', row=3),
+        ])
+
+        self.assertIsNone(fuzzy)
+        self.assertEqual((exact.payment_id, exact.confidence, exact.method), (1, Decimal('1.00'), 'exact_reference'))
+
+    def test_assignment_falls_back_to_the_next_candidate(self):
+        index = self.index(
+            (1, 'INV-001', Decimal('500.00'), 'USD', DAY, 10),
+            (2, '', Decimal('500.00'), 'USD', DAY + timedelta(days=3), 11),
+        )
+        by_amount, by_reference = index.assign([line('500'), line('500', reference='INV-001', row=3)])
+
+        self.assertEqual((by_reference.payment_id, by_reference.method), (1, 'exact_reference'))
+        # Payment 1 was equally likely by amount; it went to the exact reference
+        self.assertEqual((by_amount.payment_id, by_amount.confidence), (2, Decimal('0.65')))
+
+
+class ReconcileTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        cls.exact, cls.by_amount = [
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('500.00'),
+                currency='USD',
+                payment_status='PENDING',
+                payment_date=DAY,
+                due_date=DAY,
+                reference_number=reference,
+            )
+            for reference in ('INV-001', '')
+        ]
+
+    def test_auto_verifies_matches_above_the_threshold(self):
+        transactions = [
+            (2, line('500', reference='INV-001')),
+            (3, line('500', day=DAY + timedelta(days=4), row=3)),
+            (4, line('999', row=4)),
+            (5, 'Invalid amount'),
+        ]
+
+        result = reconcile(transactions, auto_verify_threshold='0.9', user=self.user)
+
+        self.assertEqual(
+            [(match['row'], match['payment_id'], match['confidence']) for match in result['matches']],
+            [(2, self.exact.pk, 1.0), (3, self.by_amount.pk, 0.61)],
+        )
+        self.assertEqual([row['row'] for row in result['unmatched']], [4])
+        self.assertEqual(result['invalid'], [{'row': 5, 'message': 'Invalid amount'}])
+        self.assertEqual([entry['id'] for entry in result['verified']], [self.exact.pk])
+
+        self.exact.refresh_from_db()
+        self.by_amount.refresh_from_db()
+        self.assertEqual(self.exact.payment_status, 'VERIFIED')
+        self.assertEqual(self.exact.verified_by, self.user)
+        self.assertEqual(self.by_amount.payment_status, 'PENDING')
+
+    def test_weak_match_on_an_earlier_line_does_not_take_the_payment(self):
+        payment = Payment.objects.create(
+            investor=self.exact.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('500.00'),
+            currency='USD',
+            payment_status='PENDING',
+            payment_date=DAY - timedelta(days=60),
+            due_date=DAY - timedelta(days=60),
+            reference_number='INV-2024-0001',
+        )
+        transactions = [
+            (2, line('900', description='INV20240001')),
+            (3, line('500', reference='INV-2024-0001', row=3)),
+        ]
+
+        result = reconcile(transactions, auto_verify_threshold='0.65', user=self.user)
+
+        self.assertEqual(
+            [(match['row'], match['payment_id'], match['method']) for match in result['matches']],
+            [(3, payment.pk, 'exact_reference')],
+        )
+        self.assertEqual([row['row'] for row in result['unmatched']], [2])
+        self.assertEqual(result['verified'], [{'id': payment.pk, 'result': 'verified'}])
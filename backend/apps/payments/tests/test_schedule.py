@@ -0,0 +1,107 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.investors.models import Investor
+from apps.payments.models import InvestorLedger, Payment
+from apps.payments.schedule import SCHEDULE_NOTE, generate_schedule, parse_quarter
+
+
+THROUGH = date(2024, 12, 15)
+
+
+class ScheduleGenerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Joined mid-quarter: entry fee, then Q3 and Q4 2024 installments
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            entry_fee_amount=Decimal('100.00'),
+            quarterly_payment_amount=Decimal('2500.00'),
+            joined_date=date(2024, 5, 10),
+        )
+
+    def scheduled(self):
+        return list(
+            Payment.objects.filter(investor=self.investor, notes=SCHEDULE_NOTE)
+            .order_by('due_date').values_list('payment_type', 'quarter', 'amount', 'due_date')
+        )
+
+    def test_creates_the_missing_installments(self):
+        result = generate_schedule(through=THROUGH)
+
+        self.assertEqual((result['expected'], result['created']), (3, 3))
+        self.assertEqual(self.scheduled(), [
+            ('ENTRY_FEE', '', Decimal('100.00'), date(2024, 5, 10)),
+            ('QUARTERLY', 'Q3 2024', Decimal('2500.00'), date(2024, 9, 30)),
+            ('QUARTERLY', 'Q4 2024', Decimal('2500.00'), date(2024, 12, 31)),
+        ])
+        self.assertEqual(InvestorLedger.objects.get(investor=self.investor).pending_count, 3)
+        self.assertFalse(Payment.objects.filter(investor=self.investor, search_text='').exists())
+
+    def test_running_again_creates_nothing(self):
+        generate_schedule(through=THROUGH)
+        again = generate_schedule(through=THROUGH)
+
+        self.assertEqual((again['expected'], again['existing'], again['created']), (3, 3, 0))
+        self.assertEqual(Payment.objects.filter(investor=self.investor).count(), 3)
+
+    def test_existing_payments_cover_their_installment(self):
+        # Recorded by hand, with a loosely written quarter label
+        Payment.objects.create(
+            investor=self.investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('2500.00'),
+            currency='USD',
+            payment_status='VERIFIED',
+            payment_date=date(2024, 9, 1),
+            due_date=date(2024, 9, 30),
+            quarter='2024-q3',
+        )
+
+        result = generate_schedule(through=THROUGH)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([row[1] for row in self.scheduled()], ['', 'Q4 2024'])
+
+    def test_failed_payment_is_expected_again(self):
+        generate_schedule(through=THROUGH)
+        Payment.objects.filter(investor=self.investor, quarter='Q3 2024').update(payment_status='FAILED')
+
+        result = generate_schedule(through=THROUGH)
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(
+            Payment.objects.filter(investor=self.investor, quarter='Q3 2024', payment_status='PENDING').count(), 1
+        )
+
+    def test_stops_when_the_share_amount_is_scheduled(self):
+        Investor.objects.filter(pk=self.investor.pk).update(share_amount=Decimal('3000.00'))
+
+        result = generate_schedule(through=date(2025, 12, 31))
+
+        quarterly = [row for row in self.scheduled() if row[0] == 'QUARTERLY']
+        self.assertEqual([amount for _, _, amount, _ in quarterly], [Decimal('2500.00'), Decimal('500.00')])
+        self.assertEqual(result['created'], 3)
+
+    def test_dry_run_writes_nothing(self):
+        result = generate_schedule(through=THROUGH, dry_run=True)
+
+        self.assertEqual(result['created'], 3)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_inactive_investors_are_skipped(self):
+        Investor.objects.filter(pk=self.investor.pk).update(investor_status='INACTIVE')
+        self.assertEqual(generate_schedule(through=THROUGH)['created'], 0)
+
+    def test_parse_quarter(self):
+        for label in ('Q1 2024', 'q1-2024', '2024 Q1', '2024-q1', ' Q1/2024 '):
+            self.assertEqual(parse_quarter(label), (2024, 1))
+        for label in ('', 'Q5 2024', 'first quarter', None):
+            self.assertIsNone(parse_quarter(label))
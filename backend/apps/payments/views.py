@@ -1,38 +1,68 @@
-from rest_framework import viewsets, filters, status
+from decimal import Decimal
+
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django_filters import FilterSet, ChoiceFilter, DateFromToRangeFilter, NumberFilter
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.utils import timezone
 
-from .models import Payment
+from .filters import PaymentFilter
+from .ledger import refresh_ledgers
+from .models import Payment, usd_amount_expression
 from .serializers import (
     PaymentListSerializer,
     PaymentDetailSerializer,
     PaymentCreateSerializer,
-    PaymentVerifySerializer
+    PaymentVerifySerializer,
+    PaymentBulkActionSerializer,
+    PaymentImportSerializer,
+    PaymentReconcileSerializer
 )
+from .importers import import_payments, StatementImportError
+from .reconciliation import PendingPaymentIndex, iter_bank_transactions, reconcile
+from .bulk import bulk_verify_payments, bulk_fail_payments, summarize
 from apps.authentication.permissions import IsAdminUser
+from apps.common.fieldsets import SparseListMixin
+from apps.common.pagination import KeysetPagination
+from apps.common.search import IndexedSearchFilter, RankedOrderingFilter
+from apps.reports.exports import Column, choice_label, export_response, EXPORT_OUTPUTS
 
 
-class PaymentFilter(FilterSet):
-    """Custom filter for Payment model"""
-    payment_status = ChoiceFilter(choices=Payment.STATUS_CHOICES)
-    payment_type = ChoiceFilter(choices=Payment.PAYMENT_TYPE_CHOICES)
-    investor = NumberFilter(field_name='investor__id')
-    payment_date = DateFromToRangeFilter()
-
-    class Meta:
-        model = Payment
-        fields = ['payment_status', 'payment_type', 'investor', 'payment_date']
+EXPORT_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Investor ID', 'investor_id'),
+    Column('Investor', 'investor_name'),
+    Column('Investor Email', 'investor__email'),
+    Column('Type', 'payment_type', choice_label(Payment.PAYMENT_TYPE_CHOICES)),
+    Column('Amount', 'amount'),
+    Column('Currency', 'currency'),
+    Column('Amount (USD)', 'amount_usd_value', lambda value: value.quantize(Decimal('0.01'))),
+    Column('Status', 'payment_status', choice_label(Payment.STATUS_CHOICES)),
+    Column('Method', 'payment_method', choice_label(Payment.METHOD_CHOICES)),
+    Column('Payment Date', 'payment_date'),
+    Column('Due Date', 'due_date'),
+    Column('Quarter', 'quarter'),
+    Column('Reference', 'reference_number'),
+    Column('Verified At', 'verification_date'),
+    Column('Verified By', 'verified_by__username'),
+    Column('Notes', 'notes'),
+    Column('Created At', 'created_at'),
+]
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(SparseListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Payment model providing full CRUD operations and payment verification.
 
     list: GET /api/payments/ - List all payments with pagination
+        (?pagination=cursor for keyset pages, ?count=estimate for a planner estimate,
+        ?fields= / ?omit= to select columns, ?search= for ranked matches)
     create: POST /api/payments/ - Create new payment
     retrieve: GET /api/payments/{id}/ - Get single payment details
     update: PUT /api/payments/{id}/ - Update payment (all fields)
@@ -43,13 +73,19 @@ class PaymentViewSet(viewsets.ModelViewSet):
     - verify: POST /api/payments/{id}/verify/ - Verify a payment
     - fail: POST /api/payments/{id}/fail/ - Mark payment as failed
     - overdue: GET /api/payments/overdue/ - List all overdue payments
+    - bulk_verify: POST /api/payments/bulk-verify/ - Verify many payments
+    - bulk_fail: POST /api/payments/bulk-fail/ - Mark many payments as failed
+    - import_statement: POST /api/payments/import/ - Import a bank statement
+    - reconcile: POST /api/payments/reconcile/ - Match a bank statement to pending payments
+    - export: GET /api/payments/export/ - Download the filtered list as CSV or XLSX
     """
     queryset = Payment.objects.select_related('investor', 'verified_by').all()
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        IndexedSearchFilter,
+        RankedOrderingFilter
     ]
     filterset_class = PaymentFilter
     search_fields = [
@@ -75,8 +111,38 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return PaymentCreateSerializer
         elif self.action == 'verify':
             return PaymentVerifySerializer
+        elif self.action in ['bulk_verify', 'bulk_fail']:
+            return PaymentBulkActionSerializer
+        elif self.action == 'import_statement':
+            return PaymentImportSerializer
+        elif self.action == 'reconcile':
+            return PaymentReconcileSerializer
         return PaymentDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        """List payments, building rows from values() for the selected fields"""
+        return self.sparse_list(self.filter_queryset(self.get_queryset()))
+
+    def perform_create(self, serializer):
+        """Save the payment and refresh the investor's ledger"""
+        with transaction.atomic():
+            payment = serializer.save()
+            refresh_ledgers([payment.investor_id])
+
+    def perform_update(self, serializer):
+        """Save the payment and refresh old and new investors' ledgers"""
+        previous_investor_id = serializer.instance.investor_id
+        with transaction.atomic():
+            payment = serializer.save()
+            refresh_ledgers([previous_investor_id, payment.investor_id])
+
+    def perform_destroy(self, instance):
+        """Delete the payment and refresh the investor's ledger"""
+        investor_id = instance.investor_id
+        with transaction.atomic():
+            instance.delete()
+            refresh_ledgers([investor_id])
+
     @action(detail=True, methods=['post'])
     def verify(self, request, pk=None):
         """
@@ -153,13 +219,158 @@ class PaymentViewSet(viewsets.ModelViewSet):
         overdue_payments = Payment.objects.filter(
             payment_status='PENDING',
             due_date__lt=timezone.now().date()
-        ).select_related('investor', 'verified_by').order_by('due_date')
+        ).order_by('due_date')
 
-        # Apply pagination
-        page = self.paginate_queryset(overdue_payments)
-        if page is not None:
-            serializer = PaymentListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self.sparse_list(overdue_payments, PaymentListSerializer)
 
-        serializer = PaymentListSerializer(overdue_payments, many=True)
-        return Response(serializer.data)
+    def _bulk_payment_ids(self, validated_data):
+        """Resolve the payment ids selected by a bulk action request"""
+        if 'ids' in validated_data:
+            return validated_data['ids']
+
+        filterset = PaymentFilter(data=validated_data['filter'], queryset=Payment.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError({'filter': filterset.errors})
+        return list(filterset.qs.filter(payment_status='PENDING').values_list('id', flat=True))
+
+    def _bulk_response(self, results):
+        return Response({
+            'summary': summarize(results),
+            'results': [
+                {'id': payment_id, 'result': result}
+                for payment_id, result in results.items()
+            ],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-verify')
+    def bulk_verify(self, request):
+        """
+        Verify many PENDING payments in one transaction.
+
+        POST /api/payments/bulk-verify/
+
+        Body:
+        {
+            "ids": [1, 2, 3],            // or
+            "filter": {"payment_date_after": "2024-03-01", "payment_date_before": "2024-03-31"},
+            "notes": "March reconciliation"
+        }
+
+        Returns an outcome per payment id: verified, already_verified,
+        invalid_status or not_found.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        payment_ids = self._bulk_payment_ids(serializer.validated_data)
+        results = bulk_verify_payments(payment_ids, request.user, serializer.validated_data['notes'])
+        return self._bulk_response(results)
+
+    @action(detail=False, methods=['post'], url_path='bulk-fail')
+    def bulk_fail(self, request):
+        """
+        Mark many PENDING payments as failed in one transaction.
+
+        POST /api/payments/bulk-fail/
+
+        Body: same as bulk-verify; "notes" is recorded as the failure reason.
+
+        Returns an outcome per payment id: failed, already_failed,
+        invalid_status or not_found.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        payment_ids = self._bulk_payment_ids(serializer.validated_data)
+        results = bulk_fail_payments(payment_ids, serializer.validated_data['notes'])
+        return self._bulk_response(results)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_statement(self, request):
+        """
+        Import PENDING payments from a CSV or XLSX bank statement.
+
+        POST /api/payments/import/ (multipart/form-data)
+
+        Fields:
+            - file: The statement (.csv or .xlsx)
+            - dry_run: Validate only (optional)
+            - currency, payment_type, payment_method: Defaults for missing columns
+
+        Returns counts of created, duplicate and rejected rows plus the
+        rejected/duplicate rows with their row numbers and messages.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            report = import_payments(
+                data['file'],
+                data['file'].name,
+                dry_run=data['dry_run'],
+                currency=data['currency'],
+                payment_type=data['payment_type'],
+                payment_method=data['payment_method'],
+            )
+        except StatementImportError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report.as_dict())
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def reconcile(self, request):
+        """
+        Match bank statement lines to PENDING payments.
+
+        POST /api/payments/reconcile/ (multipart/form-data)
+
+        Fields:
+            - file: The statement (.csv or .xlsx); needs amount and date columns
+            - currency: Currency for lines without one (default USD)
+            - date_window: Days of tolerance for amount-based matches (default 7)
+            - auto_verify_threshold: Verify matches at or above this confidence
+
+        Returns proposed matches with confidence scores and matching method,
+        unmatched and invalid lines, and verification outcomes when
+        auto_verify_threshold is given.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            result = reconcile(
+                iter_bank_transactions(data['file'], data['file'].name, data['currency']),
+                index=PendingPaymentIndex.load(data['date_window']),
+                auto_verify_threshold=data.get('auto_verify_threshold'),
+                user=request.user,
+            )
+        except StatementImportError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Download all payments matching the list filters.
+
+        GET /api/payments/export/?output=xlsx&payment_status=VERIFIED
+
+        Query Parameters:
+            - output: 'csv' (default) or 'xlsx'
+            - Any list filter, search and ordering parameter
+
+        Rows are streamed from the database as the file is written, so
+        exports of any size use constant memory.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_OUTPUTS:
+            return Response({'error': "output must be 'csv' or 'xlsx'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset()).annotate(
+            investor_name=Concat('investor__first_name', Value(' '), 'investor__last_name'),
+            amount_usd_value=usd_amount_expression(),
+        )
+        return export_response(queryset, EXPORT_COLUMNS, output, 'payments')
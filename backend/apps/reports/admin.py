@@ -0,0 +1,47 @@
+from django.contrib import admin
+from django.db.models import Exists, OuterRef
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    """
+    Django admin configuration for background report jobs.
+    """
+    list_display = [
+        'id',
+        'report_type',
+        'params',
+        'status',
+        'attempts',
+        'requested_by',
+        'created_at',
+        'completed_at',
+    ]
+    list_filter = ['status', 'report_type', 'created_at']
+    list_select_related = ['requested_by']
+    readonly_fields = [
+        'params_key',
+        'file',
+        'filename',
+        'error',
+        'attempts',
+        'worker',
+        'created_at',
+        'started_at',
+        'completed_at',
+    ]
+    actions = ['requeue_jobs']
+
+    def requeue_jobs(self, request, queryset):
+        """Put failed jobs back in the queue"""
+        active = ReportJob.objects.filter(
+            status__in=ReportJob.ACTIVE_STATUSES,
+            params_key=OuterRef('params_key'),
+            requested_by=OuterRef('requested_by'),
+        )
+        updated = queryset.filter(status='FAILED').exclude(Exists(active)).update(
+            status='PENDING', error='', worker='', attempts=0
+        )
+        self.message_user(request, f'{updated} job(s) requeued.')
+    requeue_jobs.short_description = 'Requeue failed jobs'
@@ -0,0 +1,220 @@
+"""
+Content-addressed cache of rendered report PDFs.
+
+Each document is keyed by a hash of the fields printed on it, read with
+one small values() query (payment and investor fields for receipts,
+investor fields and the ledger version for statements). Any change to
+those inputs yields a new key, so stale artifacts are never served and
+need no explicit invalidation; they simply age out.
+
+Artifacts live on disk under REPORT_CACHE_DIR as <key[:2]>/<key>.pdf and
+are served with FileResponse. A hit refreshes the file's mtime; once the
+directory grows past REPORT_CACHE_MAX_BYTES the least recently used
+files are deleted.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from .renderers import (
+    REPORTS,
+    PAYMENT_RECEIPT,
+    INVESTOR_STATEMENT,
+    receipt_filename,
+    statement_filename,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of any document changes to orphan old artifacts
+RENDER_VERSION = 1
+
+# Eviction trims the cache to this share of REPORT_CACHE_MAX_BYTES
+EVICT_TO_RATIO = 0.9
+
+RECEIPT_INPUTS = [
+    'id', 'amount', 'payment_type', 'payment_method', 'payment_status',
+    'payment_date', 'reference_number', 'quarter', 'notes',
+    'verification_date', 'verified_by__username', 'updated_at',
+    'investor__first_name', 'investor__last_name', 'investor__email',
+    'investor__phone', 'investor__investor_type', 'investor__share_amount',
+    'investor__updated_at', 'investor__ledger__total_verified_usd',
+    'investor__ledger__updated_at',
+]
+
+STATEMENT_INPUTS = [
+    'id', 'first_name', 'last_name', 'email', 'investor_type', 'joined_date',
+    'share_amount', 'updated_at', 'ledger__total_verified_usd',
+    'ledger__updated_at',
+]
+
+# Input fields whose latest value becomes the document's issue date
+VERSION_FIELDS = {
+    PAYMENT_RECEIPT: ['updated_at', 'investor__updated_at', 'investor__ledger__updated_at'],
+    INVESTOR_STATEMENT: ['updated_at', 'ledger__updated_at'],
+}
+
+# Approximate bytes stored, tracked per process between directory scans
+_usage = None
+
+
+class ReportArtifact:
+    """Identity of a rendered document: cache key, file name and issue date"""
+    __slots__ = ('report_type', 'object_id', 'key', 'filename', 'issued_on')
+
+    def __init__(self, report_type, object_id, key, filename, issued_on):
+        self.report_type = report_type
+        self.object_id = object_id
+        self.key = key
+        self.filename = filename
+        self.issued_on = issued_on
+
+    @property
+    def path(self):
+        return os.path.join(settings.REPORT_CACHE_DIR, self.key[:2], f'{self.key}.pdf')
+
+    @property
+    def etag(self):
+        return f'"{self.key}"'
+
+
+def resolve_artifact(report_type, object_id):
+    """
+    Fingerprint a document's inputs with one query.
+
+    Raises:
+        Payment.DoesNotExist / Investor.DoesNotExist: If the subject is missing
+    """
+    if report_type == PAYMENT_RECEIPT:
+        inputs = Payment.objects.filter(id=object_id).values(*RECEIPT_INPUTS).first()
+        if inputs is None:
+            raise Payment.DoesNotExist
+        filename = receipt_filename(inputs['id'], inputs['investor__last_name'])
+    else:
+        inputs = Investor.objects.filter(id=object_id).values(*STATEMENT_INPUTS).first()
+        if inputs is None:
+            raise Investor.DoesNotExist
+        filename = statement_filename(inputs['id'], inputs['last_name'])
+
+    payload = json.dumps([RENDER_VERSION, report_type, inputs], sort_keys=True, default=str)
+    versions = [inputs[field] for field in VERSION_FIELDS[report_type] if inputs[field]]
+    return ReportArtifact(
+        report_type,
+        object_id,
+        hashlib.sha256(payload.encode()).hexdigest(),
+        filename,
+        timezone.localdate(max(versions)),
+    )
+
+
+def open_artifact(artifact):
+    """
+    Open the cached PDF for an artifact, rendering it on a miss.
+
+    Returns:
+        Binary file object positioned at the start of the PDF
+    """
+    try:
+        file = open(artifact.path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        _touch(artifact.path)
+        return file
+
+    build_context, render, _ = REPORTS[artifact.report_type]
+    pdf = render(build_context(artifact.object_id, issued_on=artifact.issued_on))
+    _store(artifact.path, pdf)
+    # Open before enforcing the cap so eviction can never race this response
+    file = open(artifact.path, 'rb')
+    _account(len(pdf))
+    return file
+
+
+def get_report_pdf(report_type, object_id):
+    """Return (pdf bytes, filename) for a document, using the cache"""
+    artifact = resolve_artifact(report_type, object_id)
+    with open_artifact(artifact) as file:
+        return file.read(), artifact.filename
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _store(path, data):
+    """Write an artifact atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+def _account(size):
+    """Track bytes written and evict once the cache exceeds its cap"""
+    global _usage
+
+    if _usage is None:
+        _usage = cache_usage()[1]
+    else:
+        _usage += size
+    if _usage > settings.REPORT_CACHE_MAX_BYTES:
+        _usage = evict(int(settings.REPORT_CACHE_MAX_BYTES * EVICT_TO_RATIO))
+
+
+def _artifact_files():
+    """Yield (mtime, size, path) for every cached artifact"""
+    root = settings.REPORT_CACHE_DIR
+    if not os.path.isdir(root):
+        return
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith('.pdf'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+
+def cache_usage():
+    """Return (file count, total bytes) of the artifact cache"""
+    count = total = 0
+    for _, size, _ in _artifact_files():
+        count += 1
+        total += size
+    return count, total
+
+
+def evict(target_bytes):
+    """
+    Delete least recently used artifacts until the cache fits target_bytes.
+
+    Returns:
+        Bytes remaining in the cache
+    """
+    files = sorted(_artifact_files())
+    total = sum(size for _, size, _ in files)
+    for _, size, path in files:
+        if total <= target_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    logger.debug('Report cache trimmed to %s bytes', total)
+    return total
@@ -0,0 +1,192 @@
+"""
+Batch generation of investor statements (e.g. at quarter end).
+
+Investors (with their financial annotations) and all of their payments
+are read with two queries; payments are streamed in investor order and
+merged with the investor list, so statement contexts are produced one at
+a time. Statements are rendered in a pool of worker processes with a
+bounded number in flight and written to a ZIP archive chunk by chunk,
+so neither the archive nor the full set of PDFs is ever held in memory.
+
+The process pool is used by `python manage.py generate_statements`.
+Batches requested over HTTP are queued as STATEMENT_BATCH report jobs
+and rendered by the report worker with render_statement_batch().
+
+A single merged PDF is the exception: reportlab lays the whole document
+out in memory, so merged batches are capped at
+REPORT_MERGED_PDF_MAX_STATEMENTS statements (see check_merged_batch_size).
+"""
+import os
+import zipfile
+from collections import deque
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from .exports import ChunkWriter
+from .renderers import STATEMENT_PAYMENT_FIELDS, statement_context, render_statement, render_statements_merged
+
+
+# Rendered statements queued per worker process before results are consumed
+IN_FLIGHT_PER_WORKER = 4
+
+# Payments fetched per database round trip while streaming
+PAYMENT_CHUNK_SIZE = 2000
+
+
+class MergedBatchTooLarge(Exception):
+    """A merged PDF batch selects more statements than it may hold"""
+
+
+def default_workers():
+    return settings.REPORT_BATCH_WORKERS or os.cpu_count() or 1
+
+
+def check_merged_batch_size(investors):
+    """
+    Refuse a merged PDF for more than REPORT_MERGED_PDF_MAX_STATEMENTS
+    investors. ZIP output streams and has no limit.
+
+    Raises:
+        MergedBatchTooLarge
+    """
+    limit = settings.REPORT_MERGED_PDF_MAX_STATEMENTS
+    selected = investors.count()
+    if selected > limit:
+        raise MergedBatchTooLarge(
+            f'A merged PDF holds at most {limit} statements ({selected} selected); use ZIP output instead.'
+        )
+
+
+def statement_investors(investor_ids=None, investor_type=None, investor_status='ACTIVE'):
+    """Queryset of investors to include in a statement batch"""
+    investors = Investor.objects.all()
+    if investor_ids:
+        investors = investors.filter(id__in=investor_ids)
+    if investor_type:
+        investors = investors.filter(investor_type=investor_type)
+    if investor_status:
+        investors = investors.filter(investor_status=investor_status)
+    return investors
+
+
+def iter_statement_contexts(investors, issued_on=None):
+    """
+    Yield statement contexts for a queryset of investors.
+
+    Runs exactly two queries: one for the investors (with_financials()),
+    one streamed query for all of their payments.
+    """
+    investor_list = list(investors.with_financials().order_by('id'))
+    if not investor_list:
+        return
+
+    payments = Payment.objects.filter(
+        investor__in=investors.values('id')
+    ).order_by(
+        'investor_id', '-payment_date', '-created_at'
+    ).values_list('investor_id', *STATEMENT_PAYMENT_FIELDS).iterator(chunk_size=PAYMENT_CHUNK_SIZE)
+
+    pending = next(payments, None)
+    for investor in investor_list:
+        rows = []
+        while pending is not None and pending[0] <= investor.id:
+            if pending[0] == investor.id:
+                rows.append(pending[1:])
+            pending = next(payments, None)
+        yield statement_context(investor, rows, issued_on)
+
+
+def render_statements(contexts, workers=None):
+    """
+    Render statement contexts in a process pool.
+
+    Yields (context, pdf bytes) in input order. At most
+    workers * IN_FLIGHT_PER_WORKER statements are pending at a time.
+    """
+    workers = workers or default_workers()
+    if workers == 1:
+        for context in contexts:
+            yield context, render_statement(context)
+        return
+
+    # Fresh interpreters: forked children would share the parent's DB connection
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context('spawn'),
+        initializer=django.setup,
+    ) as pool:
+        window = deque()
+        for context in contexts:
+            window.append((context, pool.submit(render_statement, context)))
+            if len(window) >= workers * IN_FLIGHT_PER_WORKER:
+                context, future = window.popleft()
+                yield context, future.result()
+        while window:
+            context, future = window.popleft()
+            yield context, future.result()
+
+
+def stream_statements_zip(contexts, workers=None):
+    """
+    Yield a ZIP archive of rendered statements as byte chunks.
+
+    Suitable for StreamingHttpResponse or writing to a file.
+    """
+    writer = ChunkWriter()
+    with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for context, pdf in render_statements(contexts, workers):
+            archive.writestr(context['filename'], pdf)
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+    yield writer.drain()
+
+
+def render_statement_batch(params, file, heartbeat=None):
+    """
+    Render a queued statement batch into a binary file.
+
+    Statements are rendered in the calling process: report workers are
+    daemonic processes, which can't start a process pool of their own.
+
+    Args:
+        params: STATEMENT_BATCH job parameters: output ('zip' or 'pdf'),
+            ids, investor_type, status (None for every status) and date
+        file: Binary file object to write to
+        heartbeat: Optional callable invoked before each statement
+
+    Returns:
+        The download file name
+
+    Raises:
+        MergedBatchTooLarge: A 'pdf' batch over the merged PDF limit
+    """
+    investors = statement_investors(
+        investor_ids=params.get('ids'),
+        investor_type=params.get('investor_type'),
+        investor_status=params.get('status'),
+    )
+    if params['output'] == 'pdf':
+        check_merged_batch_size(investors)
+    contexts = iter_statement_contexts(investors, issued_on=date.fromisoformat(params['date']))
+    if heartbeat is not None:
+        contexts = _beating(contexts, heartbeat)
+
+    if params['output'] == 'pdf':
+        render_statements_merged(contexts, file)
+    else:
+        for chunk in stream_statements_zip(contexts, workers=1):
+            file.write(chunk)
+    return f"statements_{params['date']}.{params['output']}"
+
+
+def _beating(items, heartbeat):
+    for item in items:
+        heartbeat()
+        yield item
@@ -0,0 +1,183 @@
+"""
+Database-backed queue for background PDF rendering.
+
+The API enqueues ReportJob rows; `run_report_worker` processes claim them
+with a conditional UPDATE (PENDING -> RUNNING), so several worker
+processes can share the table without a message broker and without
+rendering the same job twice. Jobs whose worker hasn't shown a sign of
+life for REPORT_JOB_TIMEOUT seconds (a crashed worker) are requeued;
+long statement batches refresh their heartbeat while rendering.
+"""
+import logging
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .artifacts import get_report_pdf
+from .batch import render_statement_batch
+from .models import ReportJob
+from .renderers import REPORTS, STATEMENT_BATCH
+
+
+logger = logging.getLogger(__name__)
+
+# Candidate PENDING jobs read per claim attempt
+CLAIM_CANDIDATES = 10
+
+
+def enqueue_report(report_type, params, user=None):
+    """
+    Queue a report, reusing the user's active job with identical parameters.
+
+    Each requester gets their own job, since users only see their own
+    jobs; the PDF itself is rendered once through the artifact cache.
+
+    Returns:
+        Tuple of (ReportJob, created)
+    """
+    params_key = ReportJob.make_params_key(report_type, params)
+    active = ReportJob.objects.filter(
+        params_key=params_key,
+        requested_by=user,
+        status__in=ReportJob.ACTIVE_STATUSES,
+    )
+
+    for _ in range(3):
+        job = active.first()
+        if job is not None:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    report_type=report_type,
+                    params=params,
+                    requested_by=user,
+                )
+            return job, True
+        except IntegrityError:
+            # Another request created the same job concurrently
+            continue
+    raise RuntimeError('Could not enqueue report job.')
+
+
+def claim_next_job(worker_name):
+    """
+    Atomically claim the oldest PENDING job.
+
+    Returns:
+        The claimed ReportJob, or None when the queue is empty
+    """
+    candidates = ReportJob.objects.filter(status='PENDING').order_by(
+        'created_at', 'id'
+    ).values_list('id', flat=True)[:CLAIM_CANDIDATES]
+
+    for job_id in candidates:
+        now = timezone.now()
+        claimed = ReportJob.objects.filter(id=job_id, status='PENDING').update(
+            status='RUNNING',
+            started_at=now,
+            heartbeat_at=now,
+            worker=worker_name[:100],
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ReportJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs():
+    """
+    Return jobs stuck in RUNNING (crashed worker) to the queue.
+
+    Jobs that already used REPORT_JOB_MAX_ATTEMPTS are failed instead.
+
+    Returns:
+        Tuple of (requeued, failed) counts
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+    stale = ReportJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='RUNNING',
+    )
+
+    failed = stale.filter(attempts__gte=settings.REPORT_JOB_MAX_ATTEMPTS).update(
+        status='FAILED',
+        error='Worker timed out.',
+        completed_at=timezone.now(),
+    )
+    requeued = stale.update(status='PENDING', worker='')
+    return requeued, failed
+
+
+def run_job(job):
+    """
+    Render a claimed job (through the artifact cache) and store the PDF
+    under MEDIA_ROOT.
+
+    Errors are recorded on the job rather than raised.
+    """
+    if job.report_type == STATEMENT_BATCH:
+        return _run_batch_job(job)
+
+    missing = REPORTS[job.report_type][2]
+    try:
+        pdf, filename = get_report_pdf(job.report_type, job.params['object_id'])
+    except missing:
+        _finish(job, 'FAILED', error='Report subject not found.')
+        return job
+    except Exception as exc:
+        logger.exception('Report job %s failed', job.pk)
+        _finish(job, 'FAILED', error=str(exc) or exc.__class__.__name__)
+        return job
+
+    job.file.save(filename, ContentFile(pdf), save=False)
+    _finish(job, 'COMPLETED', filename=filename)
+    return job
+
+
+class Heartbeat:
+    """
+    Callable refreshing a running job's heartbeat_at, at most every
+    `interval` seconds, so a long job isn't requeued as stale.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = settings.REPORT_JOB_TIMEOUT / 4 if interval is None else interval
+        self.last = time.monotonic()
+
+    def __call__(self):
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            ReportJob.objects.filter(id=self.job.pk, status='RUNNING').update(heartbeat_at=timezone.now())
+            self.last = now
+
+
+def _run_batch_job(job):
+    """Render a STATEMENT_BATCH job through a temporary file into MEDIA_ROOT"""
+    try:
+        with tempfile.TemporaryFile() as output:
+            filename = render_statement_batch(job.params, output, heartbeat=Heartbeat(job))
+            output.seek(0)
+            job.file.save(filename, File(output, name=filename), save=False)
+    except Exception as exc:
+        logger.exception('Report job %s failed', job.pk)
+        _finish(job, 'FAILED', error=str(exc) or exc.__class__.__name__)
+        return job
+
+    _finish(job, 'COMPLETED', filename=filename)
+    return job
+
+
+def _finish(job, status, **fields):
+    job.status = status
+    job.completed_at = timezone.now()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=['status', 'completed_at', 'file', *fields])
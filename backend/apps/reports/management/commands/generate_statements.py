@@ -0,0 +1,101 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.investors.models import Investor
+from apps.reports.batch import (
+    MergedBatchTooLarge,
+    check_merged_batch_size,
+    default_workers,
+    iter_statement_contexts,
+    statement_investors,
+    stream_statements_zip,
+)
+from apps.reports.renderers import render_statements_merged
+
+
+class Command(BaseCommand):
+    """
+    Generate statements for many investors at once (e.g. at quarter end).
+
+    Usage:
+        python manage.py generate_statements statements.zip
+        python manage.py generate_statements q3.pdf --date 2024-09-30
+        python manage.py generate_statements lp.zip --investor-type LP --workers 8
+
+    A .zip output holds one PDF per investor, rendered in parallel; a .pdf
+    output is a single merged document, built in memory and limited to
+    REPORT_MERGED_PDF_MAX_STATEMENTS investors (default 500).
+    """
+    help = (
+        'Render investor statements in bulk into a ZIP archive or one merged PDF '
+        '(merged PDFs hold at most REPORT_MERGED_PDF_MAX_STATEMENTS statements, default 500)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output path ending in .zip or .pdf')
+        parser.add_argument(
+            '--ids',
+            help='Comma-separated investor ids (default: all matching investors)',
+        )
+        parser.add_argument(
+            '--investor-type',
+            choices=[code for code, _ in Investor.INVESTOR_TYPE_CHOICES],
+        )
+        parser.add_argument(
+            '--status',
+            default='ACTIVE',
+            help="Investor status to include (default ACTIVE, 'all' for every status)",
+        )
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Statement date YYYY-MM-DD (default today)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Rendering processes for ZIP output (default REPORT_BATCH_WORKERS or CPU count)',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not output.endswith(('.zip', '.pdf')):
+            raise CommandError('Output must end in .zip or .pdf')
+
+        try:
+            ids = [int(value) for value in (options['ids'] or '').split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--ids must be comma-separated integers')
+
+        investors = statement_investors(
+            investor_ids=ids,
+            investor_type=options['investor_type'],
+            investor_status=None if options['status'].lower() == 'all' else options['status'],
+        )
+        if output.endswith('.pdf'):
+            try:
+                check_merged_batch_size(investors)
+            except MergedBatchTooLarge as exc:
+                raise CommandError(str(exc))
+        rendered = 0
+
+        def contexts():
+            nonlocal rendered
+            for context in iter_statement_contexts(investors, issued_on=options['date']):
+                rendered += 1
+                yield context
+
+        started = time.monotonic()
+        with open(output, 'wb') as file:
+            if output.endswith('.pdf'):
+                render_statements_merged(contexts(), file)
+            else:
+                for chunk in stream_statements_zip(contexts(), workers=max(1, options['workers'])):
+                    file.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} statement(s) written to {output} in {time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from apps.reports.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+def work(worker_name, poll_interval, once, stop):
+    """Claim and render jobs until stopped (or, with once, until the queue is empty)"""
+    # Shutdown is coordinated by the parent through the stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    while not stop.is_set():
+        close_old_connections()
+        job = claim_next_job(worker_name)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Render queued ReportJob PDFs.
+
+    Usage:
+        python manage.py run_report_worker
+        python manage.py run_report_worker --concurrency 4
+        python manage.py run_report_worker --once
+
+    Each unit of concurrency is a separate process, so CPU-bound
+    ReportLab rendering runs in parallel. Any number of workers, on any
+    number of hosts, can share the same database. SIGTERM lets running
+    jobs finish before exiting.
+    """
+    help = 'Process queued PDF report jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.REPORT_WORKER_CONCURRENCY,
+            help='Number of worker processes (default REPORT_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.REPORT_WORKER_POLL_INTERVAL,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        once = options['once']
+        base_name = f'{socket.gethostname()}:{os.getpid()}'
+
+        requeued, failed = requeue_stale_jobs()
+        if requeued or failed:
+            self.stdout.write(f'Requeued {requeued} and failed {failed} stale job(s).')
+
+        # Children inherit the process state; never share a DB connection across fork
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        processes = [
+            context.Process(
+                target=work,
+                args=(f'{base_name}/{index}', poll_interval, once, stop),
+                daemon=True,
+            )
+            for index in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Started {concurrency} report worker process(es).')
+
+        # Only flag the shutdown in the handler; setting the shared event
+        # from a signal handler can deadlock with a wait() in progress
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+        signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+
+        next_requeue = time.monotonic() + settings.REPORT_JOB_TIMEOUT / 2
+        try:
+            while not stopping and any(process.is_alive() for process in processes):
+                time.sleep(1)
+                if not once and time.monotonic() >= next_requeue:
+                    close_old_connections()
+                    requeue_stale_jobs()
+                    connections.close_all()
+                    next_requeue = time.monotonic() + settings.REPORT_JOB_TIMEOUT / 2
+        finally:
+            stop.set()
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS('Report workers stopped.'))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_report_job_unique_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the worker rendering the job', null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='file',
+            field=models.FileField(blank=True, help_text='Rendered PDF (a ZIP of PDFs for zipped statement batches)', null=True, upload_to='reports/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report_type',
+            field=models.CharField(choices=[('PAYMENT_RECEIPT', 'Payment Receipt'), ('INVESTOR_STATEMENT', 'Investor Statement'), ('STATEMENT_BATCH', 'Investor Statements (batch)')], help_text='Kind of report to render', max_length=30),
+        ),
+    ]
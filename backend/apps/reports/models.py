@@ -0,0 +1,128 @@
+import hashlib
+import json
+
+from django.db import models
+from django.db.models import Q
+from apps.authentication.models import User
+from .renderers import PAYMENT_RECEIPT, INVESTOR_STATEMENT, STATEMENT_BATCH
+
+
+class ReportJob(models.Model):
+    """
+    A PDF report rendered in the background by the report worker.
+
+    Jobs are created by the API, claimed by `run_report_worker` with a
+    conditional UPDATE and rendered into MEDIA_ROOT. At most one PENDING or
+    RUNNING job exists per set of parameters and requester; a user's
+    identical requests share it. Jobs of different users for the same
+    document share the rendered PDF through the artifact cache.
+    """
+
+    REPORT_TYPE_CHOICES = [
+        (PAYMENT_RECEIPT, 'Payment Receipt'),
+        (INVESTOR_STATEMENT, 'Investor Statement'),
+        (STATEMENT_BATCH, 'Investor Statements (batch)'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    ACTIVE_STATUSES = ['PENDING', 'RUNNING']
+
+    report_type = models.CharField(
+        max_length=30,
+        choices=REPORT_TYPE_CHOICES,
+        help_text='Kind of report to render'
+    )
+    params = models.JSONField(
+        default=dict,
+        help_text='Report parameters, e.g. {"object_id": 12}'
+    )
+    params_key = models.CharField(
+        max_length=64,
+        editable=False,
+        help_text='Hash of report type and parameters, used for deduplication'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='PENDING'
+    )
+    file = models.FileField(
+        upload_to='reports/%Y/%m/',
+        null=True,
+        blank=True,
+        help_text='Rendered PDF (a ZIP of PDFs for zipped statement batches)'
+    )
+    filename = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text='Download file name'
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        help_text='Failure details'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text='Worker that claimed the job'
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        help_text='User who requested the report'
+    )
+
+    # Audit Fields
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Last sign of life from the worker rendering the job'
+    )
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['params_key', 'requested_by'],
+                condition=Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_active_report_job_per_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} #{self.pk} ({self.status})"
+
+    @staticmethod
+    def make_params_key(report_type, params):
+        """Stable hash of a report type and its parameters"""
+        payload = json.dumps([report_type, params], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.params_key = self.make_params_key(self.report_type, self.params)
+        super().save(*args, **kwargs)
+
+    @property
+    def is_ready(self):
+        return self.status == 'COMPLETED' and bool(self.file)
@@ -0,0 +1,241 @@
+"""
+PDF renderers for receipts and statements.
+
+Rendering is split in two steps:
+    - build_*_context(): reads the database and returns a plain dict of
+      already formatted values
+    - render_*(): turns such a dict into PDF bytes without touching the
+      database, using the RECEIPT_TEMPLATE / STATEMENT_TEMPLATE
+      declarations built on the shared style registry (styles.py)
+
+Contexts are plain, picklable data, so PDFs can be rendered off the
+request path (report worker) as well as inline by the download views.
+Documents are rendered in ReportLab's invariant mode (no creation
+timestamp or random document id), so equal contexts give byte-identical
+PDFs.
+"""
+from django.utils import timezone
+
+from apps.payments.models import Payment
+from apps.investors.models import Investor
+from .layout import ReportTemplate, Text, Field, Gap, Rows, When
+
+
+PAYMENT_RECEIPT = 'PAYMENT_RECEIPT'
+INVESTOR_STATEMENT = 'INVESTOR_STATEMENT'
+# Many investors' statements in one ZIP or merged PDF (apps.reports.batch)
+STATEMENT_BATCH = 'STATEMENT_BATCH'
+
+
+def _money(value):
+    return f'${value:,.2f}'
+
+
+def receipt_filename(payment_id, last_name):
+    return f'receipt_{payment_id:06d}_{last_name}.pdf'
+
+
+def statement_filename(investor_id, last_name):
+    return f'statement_{last_name}_{investor_id}.pdf'
+
+
+def _issued_on(issued_on):
+    return (issued_on or timezone.now().date()).strftime('%B %d, %Y')
+
+
+def build_receipt_context(payment_id, issued_on=None):
+    """
+    Collect everything a payment receipt shows.
+
+    Args:
+        payment_id: Payment to render
+        issued_on: Date printed as "Date Issued" (defaults to today)
+
+    Raises:
+        Payment.DoesNotExist: If the payment does not exist
+    """
+    payment = Payment.objects.select_related(
+        'investor', 'investor__ledger', 'verified_by'
+    ).get(id=payment_id)
+    investor = payment.investor
+
+    payment_info = [
+        ['Payment Type:', payment.get_payment_type_display()],
+        ['Payment Method:', payment.get_payment_method_display()],
+        ['Reference Number:', payment.reference_number or 'N/A'],
+        ['Quarter:', payment.quarter or 'N/A'],
+        ['Status:', payment.get_payment_status_display()],
+    ]
+    if payment.verified_by and payment.verification_date:
+        payment_info.append(['Verified By:', payment.verified_by.username])
+        payment_info.append(['Verification Date:', payment.verification_date.strftime('%B %d, %Y %I:%M %p')])
+
+    return {
+        'report_type': PAYMENT_RECEIPT,
+        'filename': receipt_filename(payment.id, investor.last_name),
+        'receipt_info': [
+            ['Receipt Number:', f'#{payment.id:06d}'],
+            ['Date Issued:', _issued_on(issued_on)],
+            ['Payment Date:', payment.payment_date.strftime('%B %d, %Y')],
+        ],
+        'investor_info': [
+            ['Name:', investor.full_name],
+            ['Email:', investor.email],
+            ['Phone:', investor.phone or 'N/A'],
+            ['Investor Type:', investor.get_investor_type_display()],
+        ],
+        'payment_info': payment_info,
+        'amount': [['AMOUNT PAID:', _money(payment.amount)]],
+        'summary_info': [
+            ['Total Share Amount:', _money(investor.share_amount)],
+            ['Total Paid to Date:', _money(investor.total_paid)],
+            ['Outstanding Balance:', _money(investor.outstanding_balance)],
+            ['Completion:', f'{investor.payment_completion_percentage:.1f}%'],
+        ],
+        'notes': payment.notes,
+    }
+
+
+# Payment columns printed on a statement, in table order
+STATEMENT_PAYMENT_FIELDS = ['payment_date', 'payment_type', 'amount', 'payment_status', 'reference_number']
+
+
+def statement_context(investor, payments, issued_on=None):
+    """
+    Statement context from an investor (with_financials() or ledger loaded)
+    and its payments as STATEMENT_PAYMENT_FIELDS tuples, newest first.
+    """
+    type_display = dict(Payment.PAYMENT_TYPE_CHOICES)
+    status_display = dict(Payment.STATUS_CHOICES)
+    payment_rows = [
+        [
+            payment_date.strftime('%Y-%m-%d'),
+            type_display.get(payment_type, payment_type),
+            _money(amount),
+            status_display.get(payment_status, payment_status),
+            reference_number or '-',
+        ]
+        for payment_date, payment_type, amount, payment_status, reference_number in payments
+    ]
+
+    return {
+        'report_type': INVESTOR_STATEMENT,
+        'filename': statement_filename(investor.id, investor.last_name),
+        'investor_info': [
+            ['Investor:', investor.full_name],
+            ['Email:', investor.email],
+            ['Type:', investor.get_investor_type_display()],
+            ['Joined Date:', investor.joined_date.strftime('%B %d, %Y')],
+            ['Statement Date:', _issued_on(issued_on)],
+        ],
+        'summary_info': [
+            ['Share Amount:', _money(investor.share_amount)],
+            ['Total Paid:', _money(investor.total_paid)],
+            ['Outstanding:', _money(investor.outstanding_balance)],
+            ['Completion:', f'{investor.payment_completion_percentage:.1f}%'],
+        ],
+        'payment_rows': payment_rows,
+    }
+
+
+def build_statement_context(investor_id, issued_on=None):
+    """
+    Collect everything an investor statement shows.
+
+    Payments are read with a single values_list() query.
+
+    Args:
+        investor_id: Investor to render
+        issued_on: Date printed as "Statement Date" (defaults to today)
+
+    Raises:
+        Investor.DoesNotExist: If the investor does not exist
+    """
+    investor = Investor.objects.with_financials().get(id=investor_id)
+    payments = investor.payments.order_by('-payment_date', '-created_at').values_list(
+        *STATEMENT_PAYMENT_FIELDS
+    )
+    return statement_context(investor, payments, issued_on)
+
+
+RECEIPT_TEMPLATE = ReportTemplate(
+    Text("7-Seas Suites", 'title'),
+    Text("Investor Management Platform", 'section'),
+    Gap(0.3),
+    Text("PAYMENT RECEIPT", 'heading'),
+    Gap(0.2),
+    Rows('receipt_info', 'label_value'),
+    Gap(0.3),
+    Text("Investor Information", 'heading'),
+    Rows('investor_info', 'label_value'),
+    Gap(0.3),
+    Text("Payment Details", 'heading'),
+    Rows('payment_info', 'label_value'),
+    Gap(0.4),
+    Rows('amount', 'amount_banner'),
+    Gap(0.5),
+    Text("Investment Summary", 'heading'),
+    Rows('summary_info', 'label_value'),
+    Gap(0.5),
+    When(
+        'notes',
+        Text("Notes", 'heading'),
+        Field('notes', 'body'),
+        Gap(0.3),
+    ),
+    Gap(0.5),
+    Text(
+        "This is an official receipt from 7-Seas Suites.<br/>"
+        "For inquiries, please contact your account manager.",
+        'footer'
+    ),
+)
+
+STATEMENT_TEMPLATE = ReportTemplate(
+    Text("7-Seas Suites", 'title'),
+    Text("Investor Statement", 'subtitle'),
+    Gap(0.3),
+    Rows('investor_info', 'label_value_plain', columns='label_value'),
+    Gap(0.3),
+    Rows('summary_info', 'summary_panel', columns='label_value'),
+    Gap(0.4),
+    When(
+        'payment_rows',
+        Text("Payment History", 'section'),
+        Gap(0.1),
+        Rows('payment_rows', 'ledger', header=['Date', 'Type', 'Amount', 'Status', 'Reference']),
+    ),
+)
+
+
+def render_receipt(context):
+    """Render a payment receipt context to PDF bytes"""
+    return RECEIPT_TEMPLATE.render(context)
+
+
+def render_statement(context):
+    """Render an investor statement context to PDF bytes"""
+    return STATEMENT_TEMPLATE.render(context)
+
+
+def render_statements_merged(contexts, file):
+    """
+    Render many statements into one PDF written to file.
+
+    Each statement starts on a new page. The document is laid out in a
+    single pass and held in memory until written, so this runs in the
+    calling process and batches are capped by check_merged_batch_size().
+    """
+    STATEMENT_TEMPLATE.render_many(contexts, file)
+
+
+# report_type -> (context builder, renderer, missing-object exception)
+REPORTS = {
+    PAYMENT_RECEIPT: (build_receipt_context, render_receipt, Payment.DoesNotExist),
+    INVESTOR_STATEMENT: (build_statement_context, render_statement, Investor.DoesNotExist),
+}
+
+
+def render_context(context):
+    """Render any report context to PDF bytes"""
+    return REPORTS[context['report_type']][1](context)
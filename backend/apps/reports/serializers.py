@@ -0,0 +1,116 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from .batch import MergedBatchTooLarge, check_merged_batch_size, statement_investors
+from .models import ReportJob
+from .renderers import PAYMENT_RECEIPT, INVESTOR_STATEMENT
+
+# Model each report type is rendered for
+REPORT_SUBJECTS = {
+    PAYMENT_RECEIPT: Payment,
+    INVESTOR_STATEMENT: Investor,
+}
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for report job status.
+    download_url is set once the PDF is ready.
+    """
+    report_type_display = serializers.CharField(source='get_report_type_display', read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'report_type',
+            'report_type_display',
+            'params',
+            'status',
+            'filename',
+            'error',
+            'attempts',
+            'download_url',
+            'created_at',
+            'started_at',
+            'completed_at',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if not obj.is_ready:
+            return None
+        url = reverse('report-job-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    """
+    Serializer for queueing a report.
+    Validates that the subject (payment or investor) exists.
+    """
+    report_type = serializers.ChoiceField(
+        choices=[choice for choice in ReportJob.REPORT_TYPE_CHOICES if choice[0] in REPORT_SUBJECTS]
+    )
+    object_id = serializers.IntegerField(min_value=1, help_text='Payment id or investor id')
+
+    def validate(self, attrs):
+        model = REPORT_SUBJECTS[attrs['report_type']]
+        if not model.objects.filter(pk=attrs['object_id']).exists():
+            raise serializers.ValidationError(
+                {'object_id': f'{model._meta.verbose_name} not found.'}
+            )
+        return attrs
+
+
+class StatementBatchSerializer(serializers.Serializer):
+    """
+    Serializer for queueing a batch of investor statements.
+    job_params() returns the STATEMENT_BATCH job parameters.
+    """
+    output = serializers.ChoiceField(
+        choices=['zip', 'pdf'],
+        default='zip',
+        help_text="'zip' (one PDF per investor) or 'pdf' (one merged PDF)"
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        help_text='Investor ids (default: all matching investors)'
+    )
+    investor_type = serializers.ChoiceField(choices=Investor.INVESTOR_TYPE_CHOICES, required=False)
+    status = serializers.ChoiceField(
+        choices=[*Investor.STATUS_CHOICES, ('all', 'All')],
+        default='ACTIVE',
+        help_text="Investor status to include ('all' for every status)"
+    )
+    date = serializers.DateField(required=False, help_text='Statement date (default today)')
+
+    def validate(self, attrs):
+        """Refuse merged PDFs over REPORT_MERGED_PDF_MAX_STATEMENTS investors"""
+        if attrs['output'] == 'pdf':
+            investors = statement_investors(
+                investor_ids=attrs['ids'],
+                investor_type=attrs.get('investor_type'),
+                investor_status=None if attrs['status'] == 'all' else attrs['status'],
+            )
+            try:
+                check_merged_batch_size(investors)
+            except MergedBatchTooLarge as exc:
+                raise serializers.ValidationError({'output': str(exc)})
+        return attrs
+
+    def job_params(self):
+        data = self.validated_data
+        return {
+            'output': data['output'],
+            'ids': sorted(set(data['ids'])),
+            'investor_type': data.get('investor_type'),
+            'status': None if data['status'] == 'all' else data['status'],
+            'date': (data.get('date') or timezone.localdate()).isoformat(),
+        }
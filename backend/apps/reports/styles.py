@@ -0,0 +1,138 @@
+"""
+Process-wide registry of ReportLab styles for the reports app.
+
+Paragraph styles, table styles and the page template are compiled once,
+at import, and shared by every document rendered in the process. The
+registries are read-only mappings; documents must derive new styles
+instead of mutating these (ReportLab styles are plain objects and would
+otherwise leak changes into every later render).
+"""
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, TableStyle
+
+
+# Brand palette
+NAVY = colors.HexColor('#1B4965')
+GOLD = colors.HexColor('#C9A961')
+PANEL = colors.HexColor('#F5F5F5')
+STRIPE = colors.HexColor('#F9F9F9')
+
+
+def _paragraph_styles():
+    sample = getSampleStyleSheet()
+    body = ParagraphStyle('Body', parent=sample['Normal'], fontSize=11, leading=14)
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=24,
+            textColor=NAVY,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=sample['Heading2'],
+            fontSize=14,
+            textColor=GOLD,
+            spaceAfter=12,
+            fontName='Helvetica-Bold'
+        ),
+        'subtitle': sample['Heading2'],
+        'section': sample['Heading3'],
+        'body': body,
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=body,
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        ),
+    }
+
+
+def _table_styles():
+    return {
+        # Right-aligned bold labels, left-aligned values
+        'label_value': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'label_value_plain': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'summary_panel': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('BACKGROUND', (0, 0), (-1, -1), PANEL),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        'amount_banner': TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 16),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+            ('BACKGROUND', (0, 0), (-1, -1), GOLD),
+            ('ALIGN', (0, 0), (0, 0), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('LEFTPADDING', (0, 0), (-1, -1), 20),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 20),
+        ]),
+        # Header row plus striped, gridded body
+        'ledger': TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, STRIPE]),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]),
+    }
+
+
+PARAGRAPH_STYLES = MappingProxyType(_paragraph_styles())
+TABLE_STYLES = MappingProxyType(_table_styles())
+
+# Column widths shared by the documents
+COLUMNS = MappingProxyType({
+    'label_value': (2*inch, 4*inch),
+    'amount_banner': (4*inch, 2*inch),
+    'ledger': (1.2*inch, 1.5*inch, 1.2*inch, 1.2*inch, 1.5*inch),
+})
+
+# Page template: US letter with the margins used by all documents. Invariant
+# mode drops the creation timestamp and random document id, so equal
+# content yields byte-identical PDFs.
+PAGE = MappingProxyType({
+    'pagesize': letter,
+    'rightMargin': 72,
+    'leftMargin': 72,
+    'topMargin': 72,
+    'bottomMargin': 18,
+    'invariant': 1,
+})
+
+
+def document(file):
+    """A SimpleDocTemplate on the shared page template"""
+    return SimpleDocTemplate(file, **PAGE)
@@ -0,0 +1,140 @@
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from apps.reports.jobs import Heartbeat, claim_next_job, requeue_stale_jobs, run_job
+from apps.reports.models import ReportJob
+
+
+class StatementBatchJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', role='ADMIN')
+        cls.investors = []
+        for index, investor_type in enumerate(['LP', 'LP', 'GP']):
+            investor = Investor.objects.create(
+                first_name=f'Investor{index}',
+                last_name=f'Test{index}',
+                email=f'investor{index}@example.com',
+                investor_type=investor_type,
+                share_amount=Decimal('10000.00'),
+                joined_date=date(2024, 1, 1),
+            )
+            Payment.objects.create(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('500.00'),
+                payment_status='VERIFIED',
+                payment_date=date(2024, 3, 1),
+            )
+            cls.investors.append(investor)
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = media.name
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def queue(self, **body):
+        response = self.client.post('/api/reports/investor-statements/', body, format='json')
+        self.assertEqual(response.status_code, 202, response.data)
+        return response.data
+
+    def render_queued(self):
+        job = claim_next_job('test-worker')
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED', job.error)
+        return job
+
+    def download(self, job):
+        response = self.client.get(f'/api/reports/jobs/{job.pk}/download/')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_zip_batch_is_rendered_by_the_worker(self):
+        queued = self.queue(investor_type='LP', date='2024-06-30')
+        self.assertEqual((queued['report_type'], queued['status']), ('STATEMENT_BATCH', 'PENDING'))
+
+        job = self.render_queued()
+        self.assertEqual(job.filename, 'statements_2024-06-30.zip')
+        response, content = self.download(job)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            names = archive.namelist()
+            self.assertEqual(len(names), 2)
+            self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in names))
+
+    def test_merged_pdf_batch(self):
+        self.queue(output='pdf', ids=[self.investors[2].pk])
+        job = self.render_queued()
+        response, content = self.download(job)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(content.startswith(b'%PDF'))
+
+    @override_settings(REPORT_MERGED_PDF_MAX_STATEMENTS=2)
+    def test_merged_pdf_batches_are_capped(self):
+        response = self.client.post('/api/reports/investor-statements/', {'output': 'pdf'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at most 2 statements (3 selected)', str(response.data['output']))
+
+        # ZIP output streams and has no limit
+        self.queue()
+        self.queue(output='pdf', investor_type='LP')
+        with self.assertRaisesMessage(CommandError, 'at most 2 statements'):
+            call_command('generate_statements', os.path.join(self.media, 'all.pdf'))
+
+    def test_queued_merged_batch_over_the_cap_fails(self):
+        self.queue(output='pdf')
+        job = claim_next_job('test-worker')
+
+        with override_settings(REPORT_MERGED_PDF_MAX_STATEMENTS=2):
+            run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('use ZIP output', job.error)
+
+    def test_identical_batches_share_a_job(self):
+        first = self.queue(ids=[3, 1, 2])
+        second = self.client.post('/api/reports/investor-statements/', {'ids': [1, 2, 3]}, format='json')
+        self.assertEqual((second.status_code, second.data['id']), (200, first['id']))
+
+    def test_rejects_invalid_parameters(self):
+        response = self.client.post('/api/reports/investor-statements/', {'output': 'docx'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_an_admin(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='pass', role='VIEWER'))
+        response = client.post('/api/reports/investor-statements/', {}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(REPORT_JOB_TIMEOUT=60)
+    def test_heartbeat_keeps_a_long_job_from_being_requeued(self):
+        self.queue()
+        job = claim_next_job('test-worker')
+        long_ago = timezone.now() - timedelta(minutes=10)
+        ReportJob.objects.filter(pk=job.pk).update(started_at=long_ago, heartbeat_at=long_ago)
+
+        Heartbeat(job, interval=0)()
+        self.assertEqual(requeue_stale_jobs(), (0, 0))
+
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        self.assertEqual(requeue_stale_jobs(), (1, 0))
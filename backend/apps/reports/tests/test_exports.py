@@ -0,0 +1,214 @@
+import io
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.payments.models import Payment
+from apps.reports.exports import stream_xlsx
+
+
+def load_export(chunks):
+    return load_workbook(io.BytesIO(b''.join(chunks)))
+
+
+class XlsxRoundTripTests(SimpleTestCase):
+    """Workbooks written by stream_xlsx load back in openpyxl unchanged"""
+
+    def test_values_round_trip(self):
+        aware = timezone.make_aware(datetime(2024, 3, 5, 14, 30, 15), dt_timezone.utc)
+        rows = [
+            ['Jane & <Doe>', 42, 1.5, Decimal('1234.50'), date(2024, 1, 31), aware, True, None],
+            ['=SUM(A1)', -7, 0.1, Decimal('-0.01'), date(1999, 12, 31), datetime(2024, 1, 1), False, 'x'],
+        ]
+        headers = ['Name', 'Count', 'Ratio', 'Amount', 'Date', 'At', 'Flag', 'Notes']
+
+        workbook = load_export(stream_xlsx(headers, rows, title='Payments'))
+        sheet = workbook.active
+
+        self.assertEqual(workbook.sheetnames, ['Payments'])
+        self.assertEqual(sheet.freeze_panes, 'A2')
+        values = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(values[0], tuple(headers))
+        self.assertTrue(sheet['A1'].font.b)
+        self.assertEqual(values[1], (
+            'Jane & <Doe>', 42, 1.5, 1234.5, datetime(2024, 1, 31),
+            timezone.make_naive(aware), True, None,
+        ))
+        # Formula-like text stays text
+        self.assertEqual(sheet['A3'].data_type, 's')
+        self.assertEqual(values[2][:7], ('=SUM(A1)', -7, 0.1, -0.01, datetime(1999, 12, 31), datetime(2024, 1, 1), False))
+        self.assertEqual(sheet['E2'].number_format, 'yyyy-mm-dd')
+        self.assertEqual(sheet['F2'].number_format, 'yyyy-mm-dd hh:mm:ss')
+
+    def test_illegal_characters_and_non_finite_numbers(self):
+        rows = [['bell\x07 tab\tend', float('nan'), Decimal('Infinity'), object()]]
+
+        sheet = load_export(stream_xlsx(['Text', 'NaN', 'Inf', 'Other'], rows)).active
+
+        text, nan, inf, other = next(sheet.iter_rows(min_row=2, values_only=True))
+        self.assertEqual(text, 'bell tab\tend')
+        self.assertIsNone(nan)
+        self.assertIsNone(inf)
+        self.assertTrue(other.startswith('<object object'))
+
+    def test_many_rows_across_flushes(self):
+        rows = ([index, f'row {index}'] for index in range(1, 1203))
+
+        sheet = load_export(stream_xlsx(['N', 'Label'], rows)).active
+
+        self.assertEqual(sheet.max_row, 1203)
+        self.assertEqual([cell.value for cell in sheet[1203]], [1202, 'row 1202'])
+        self.assertEqual(sum(row[0] for row in sheet.iter_rows(min_row=2, values_only=True)), 1202 * 1203 // 2)
+
+
+class PaymentExportWorkbookTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2020, 1, 1),
+        )
+        Payment.objects.create(
+            investor=investor,
+            payment_type='QUARTERLY',
+            amount=Decimal('1250.50'),
+            currency='USD',
+            payment_status='VERIFIED',
+            payment_date=date(2024, 2, 1),
+            due_date=date(2024, 1, 31),
+            notes='=HYPERLINK("http://example.com")',
+        )
+
+    def test_export_loads_in_openpyxl(self):
+        from apps.payments.views import EXPORT_COLUMNS
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/payments/export/', {'output': 'xlsx'})
+
+        self.assertEqual(response.status_code, 200)
+        sheet = load_export(response.streaming_content).active
+        headers, row = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(list(headers), [column.header for column in EXPORT_COLUMNS])
+        values = dict(zip(headers, row))
+        self.assertEqual(values['Investor'], 'Jane Doe')
+        self.assertEqual(values['Amount'], 1250.5)
+        self.assertEqual(values['Amount (USD)'], 1250.5)
+        self.assertEqual(values['Status'], 'Verified')
+        self.assertEqual(values['Payment Date'], datetime(2024, 2, 1))
+        self.assertEqual(values['Notes'], '=HYPERLINK("http://example.com")')
+        self.assertEqual(sheet.cell(row=2, column=headers.index('Notes') + 1).data_type, 's')
+
+
+class AsgiExportStreamingTests(TestCase):
+    """Exports served by the ASGI handler are sent as they are written"""
+
+    PAYMENTS = 10000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass')
+        investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2020, 1, 1),
+        )
+        start = date(2020, 1, 1)
+        Payment.objects.bulk_create([
+            Payment(
+                investor=investor,
+                payment_type='QUARTERLY',
+                amount=Decimal('1250.00'),
+                currency='USD',
+                payment_status='VERIFIED',
+                payment_date=start + timedelta(days=index % 1000),
+                due_date=start + timedelta(days=index % 1000),
+                notes=f'Statement line {index} imported from the bank export',
+            )
+            for index in range(cls.PAYMENTS)
+        ], batch_size=2000)
+
+    def asgi_get(self, path, query_string):
+        """Run a GET through ASGIHandler; returns body messages and peak traced memory"""
+        token = str(RefreshToken.for_user(self.user).access_token)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'root_path': '',
+            'query_string': query_string.encode(),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            # Keep sizes only, so the test itself does not hold the body
+            body = message.get('body')
+            messages.append((message['type'], message.get('status'), len(body) if body else 0))
+
+        request_finished.disconnect(close_old_connections)
+        tracemalloc.start()
+        try:
+            async_to_sync(ASGIHandler())(scope, receive, send)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            request_finished.connect(close_old_connections)
+        return messages, peak
+
+    def export(self, query_string):
+        # Small chunks, so the rows held by the queryset iterator and the text
+        # of one flush don't dominate the peak of a test-sized export
+        with mock.patch('apps.reports.exports.EXPORT_CHUNK_SIZE', 200), \
+                mock.patch('apps.reports.exports.ROWS_PER_CHUNK', 100):
+            messages, peak = self.asgi_get('/api/payments/export/', query_string)
+        self.assertEqual(messages[0][:2], ('http.response.start', 200))
+        sizes = [size for kind, _, size in messages if kind == 'http.response.body']
+        return sizes, peak
+
+    def assert_streamed(self, output):
+        small_query = f'output={output}&payment_date_before=2020-04-09'
+        self.export(small_query)  # warm up imports and URL resolution
+        small_sizes, small_peak = self.export(small_query)
+        sizes, peak = self.export(f'output={output}')
+
+        self.assertGreater(len([size for size in sizes if size]), 10)
+        # Buffering would raise the peak by at least the extra body size
+        growth, extra_body = peak - small_peak, sum(sizes) - sum(small_sizes)
+        self.assertLess(growth, extra_body / 4, f'peak grew {growth} bytes for {extra_body} more bytes of export')
+
+    def test_csv_export_is_streamed(self):
+        self.assert_streamed('csv')
+
+    def test_xlsx_export_is_streamed(self):
+        self.assert_streamed('xlsx')
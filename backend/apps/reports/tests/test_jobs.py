@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.investors.models import Investor
+from apps.reports.jobs import claim_next_job, enqueue_report
+from apps.reports.models import ReportJob
+from apps.reports.renderers import INVESTOR_STATEMENT
+
+
+class ReportJobQueueTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.investor = Investor.objects.create(
+            first_name='Jane',
+            last_name='Doe',
+            email='jane@example.com',
+            investor_type='LP',
+            share_amount=Decimal('10000.00'),
+            joined_date=date(2024, 1, 1),
+        )
+        cls.alice = User.objects.create_user(username='alice', password='pass')
+        cls.bob = User.objects.create_user(username='bob', password='pass')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def queue(self, client):
+        return client.post(
+            '/api/reports/jobs/',
+            {'report_type': INVESTOR_STATEMENT, 'object_id': self.investor.pk},
+            format='json'
+        )
+
+    def test_identical_requests_of_one_user_share_a_job(self):
+        client = self.client_for(self.alice)
+        first, second = self.queue(client), self.queue(client)
+        self.assertEqual((first.status_code, second.status_code), (202, 200))
+        self.assertEqual(first.data['id'], second.data['id'])
+
+    def test_each_requester_gets_a_job_they_can_poll(self):
+        alice, bob = self.client_for(self.alice), self.client_for(self.bob)
+        alice_job, bob_job = self.queue(alice).data, self.queue(bob).data
+        self.assertNotEqual(alice_job['id'], bob_job['id'])
+
+        self.assertEqual(bob.get(f"/api/reports/jobs/{bob_job['id']}/").status_code, 200)
+        self.assertEqual(bob.get(f"/api/reports/jobs/{alice_job['id']}/").status_code, 404)
+
+    def test_a_finished_job_is_not_reused(self):
+        job, created = enqueue_report(INVESTOR_STATEMENT, {'object_id': self.investor.pk}, self.alice)
+        self.assertTrue(created)
+        ReportJob.objects.filter(pk=job.pk).update(status='COMPLETED')
+
+        again, created = enqueue_report(INVESTOR_STATEMENT, {'object_id': self.investor.pk}, self.alice)
+        self.assertTrue(created)
+        self.assertNotEqual(again.pk, job.pk)
+
+    def test_claiming_is_exclusive(self):
+        job, _ = enqueue_report(INVESTOR_STATEMENT, {'object_id': self.investor.pk}, self.alice)
+        claimed = claim_next_job('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, 'RUNNING', 1))
+        self.assertIsNone(claim_next_job('worker-2'))
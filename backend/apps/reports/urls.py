@@ -4,4 +4,8 @@ from . import views
 urlpatterns = [
     path('payment-receipt/<int:payment_id>/', views.generate_payment_receipt, name='payment-receipt'),
     path('investor-statement/<int:investor_id>/', views.generate_investor_statement, name='investor-statement'),
+    path('investor-statements/', views.batch_investor_statements, name='investor-statements-batch'),
+    path('jobs/', views.report_jobs, name='report-jobs'),
+    path('jobs/<int:job_id>/', views.report_job_detail, name='report-job-detail'),
+    path('jobs/<int:job_id>/download/', views.report_job_download, name='report-job-download'),
 ]
@@ -0,0 +1,68 @@
+"""
+Benchmarks for the backend.
+
+Run from the backend directory, e.g.:
+
+    python -m benchmarks.render_reports
+    python -m benchmarks.micro
+    python -m benchmarks.api_requests --synthetic 500 20000
+    python -m benchmarks.timeline --steps 10000 100000 1000000
+
+Test data comes from `python manage.py seed_synthetic`. Benchmarks that
+accept --baseline compare their results with a file written earlier with
+--save-baseline and exit with status 1 when a case regressed.
+"""
+import json
+import math
+import os
+
+
+def setup_django():
+    """Configure Django for a standalone benchmark run"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+    import django
+    django.setup()
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2)
+
+
+def compare_to_baseline(results, path, timings, counts=(), tolerance=0.25, min_delta=1.0):
+    """
+    Compare results with a saved baseline, matching cases by name.
+
+    Args:
+        results: List of result dicts with a 'name' key
+        path: Baseline file written by save_baseline()
+        timings: Keys of timings (ms) that regress when more than
+            `tolerance` (fraction) and `min_delta` (ms) slower
+        counts: Keys of counts (e.g. queries) that regress on any increase
+
+    Returns:
+        List of human-readable regression descriptions (empty if none)
+    """
+    with open(path) as handle:
+        baseline = {case['name']: case for case in json.load(handle)}
+
+    regressions = []
+    for result in results:
+        before = baseline.get(result['name'])
+        if before is None:
+            continue
+        for key in timings:
+            old, new = before.get(key), result.get(key)
+            if old is not None and new is not None and new - old > max(old * tolerance, min_delta):
+                regressions.append(f"{result['name']}: {key} {old} -> {new} ms")
+        for key in counts:
+            old, new = before.get(key), result.get(key)
+            if old is not None and new is not None and new > old:
+                regressions.append(f"{result['name']}: {key} {old} -> {new}")
+    return regressions
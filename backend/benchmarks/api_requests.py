@@ -0,0 +1,167 @@
+"""
+Request-level benchmark replaying the frontend's API calls.
+
+Replays the calls the dashboard page and the investor and payment list
+pages make (plus a search and a filtered list) through the DRF test
+client, and reports per call p50/p95 latency and the number of database
+queries, as a table or JSON.
+
+Dashboard responses are cached until the next data write; by default
+the cache is invalidated before every request so the numbers measure the
+database work. Pass --warm-cache to measure cached responses instead.
+
+Runs against the configured database (point DATABASE_URL at a populated
+one), or with --synthetic against a fresh test database filled by
+seed_synthetic, which makes runs reproducible. Usage (from the backend
+directory):
+
+    python -m benchmarks.api_requests --synthetic 500 20000
+    python -m benchmarks.api_requests --scenario dashboard --iterations 50 --json
+    python -m benchmarks.api_requests --synthetic 500 20000 --save-baseline api-baseline.json
+    python -m benchmarks.api_requests --synthetic 500 20000 --baseline api-baseline.json
+
+With --baseline the run exits with status 1 when a call needs more
+queries than in the baseline, or its p50 is more than --tolerance slower.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks import compare_to_baseline, percentile, save_baseline, setup_django
+
+
+SCENARIOS = {
+    # Dashboard.jsx on load
+    'dashboard': [
+        ('dashboard overview', '/api/dashboard/overview/', {}),
+        ('collections timeline', '/api/dashboard/collections-timeline/', {'period': 'monthly'}),
+        ('payment status', '/api/dashboard/payment-status/', {}),
+        ('overdue investors', '/api/dashboard/overdue-investors/', {'page_size': 5}),
+        ('recent activity', '/api/dashboard/recent-activity/', {}),
+        ('top investors', '/api/dashboard/top-investors/', {'by': 'share_amount'}),
+    ],
+    # InvestorList.jsx, PaymentList.jsx and their search boxes and filters
+    'lists': [
+        ('investors list', '/api/investors/', {}),
+        ('payments list', '/api/payments/', {}),
+        ('payments page 10', '/api/payments/', {'page': 10}),
+        ('payments pending', '/api/payments/', {'payment_status': 'PENDING'}),
+        ('payments search', '/api/payments/', {'search': 'kamau'}),
+        ('investors search', '/api/investors/', {'search': 'grace'}),
+        ('overdue payments', '/api/payments/overdue/', {}),
+    ],
+}
+
+
+def benchmark_user():
+    from apps.authentication.models import User
+
+    user = User.objects.filter(role='ADMIN', is_active=True).order_by('pk').first()
+    if user is None:
+        user = User.objects.create_user(username='benchmark', password=None, role='ADMIN')
+    return user
+
+
+def replay(calls, iterations=20, warmup=2, warm_cache=False):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from apps.dashboard.cache import bump_data_version
+
+    client = APIClient()
+    client.force_authenticate(benchmark_user())
+
+    results = []
+    for name, path, params in calls:
+        timings, queries = [], []
+        for iteration in range(warmup + iterations):
+            if not warm_cache:
+                bump_data_version()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, params)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise RuntimeError(f'{name}: GET {path} returned {response.status_code}')
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(len(captured))
+        results.append({
+            'name': name,
+            'path': path,
+            'params': params,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(queries),
+            'bytes': len(response.content),
+        })
+    return results
+
+
+def synthetic_database(investors, payments, seed):
+    """Create and seed a test database; returns a function tearing it down"""
+    from io import StringIO
+    from django.core.management import call_command
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    call_command('seed_synthetic', investors=investors, payments=payments, seed=seed, stdout=StringIO())
+    return lambda: connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=[*SCENARIOS, 'all'], default='all')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed requests per call (default 20)')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per call first (default 2)')
+    parser.add_argument('--warm-cache', action='store_true', help='Keep dashboard responses cached between requests')
+    parser.add_argument(
+        '--synthetic', nargs=2, type=int, metavar=('INVESTORS', 'PAYMENTS'),
+        help='Run against a fresh test database seeded with seed_synthetic'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for --synthetic (default 42)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write results to a baseline file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare with a baseline file; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown fraction (default 0.25)')
+    parser.add_argument('--min-delta', type=float, default=2.0, help='Ignore p50 slowdowns below this many ms')
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = synthetic_database(*args.synthetic, args.seed) if args.synthetic else None
+    try:
+        calls = [call for name, scenario in SCENARIOS.items() if args.scenario in (name, 'all') for call in scenario]
+        results = replay(calls, args.iterations, args.warmup, args.warm_cache)
+    finally:
+        if teardown:
+            teardown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'call':<24}{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}{'KiB':>8}")
+        for result in results:
+            print(
+                f"{result['name']:<24}{result['p50_ms']:>9}{result['p95_ms']:>9}"
+                f"{result['queries']:>9}{result['bytes'] / 1024:>8.1f}"
+            )
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, args.baseline, timings=['p50_ms'], counts=['queries'],
+            tolerance=args.tolerance, min_delta=args.min_delta
+        )
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
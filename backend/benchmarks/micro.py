@@ -0,0 +1,253 @@
+"""
+Micro benchmarks for model properties, list serializers and report
+renderers.
+
+Cases are written like pytest-benchmark tests: each bench_* function
+takes a `benchmark` callable and passes it the code under test, which is
+run repeatedly and timed. The runner below needs neither pytest nor a
+database; the cases work on unsaved model instances and synthetic report
+contexts.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro -k serializer --json
+    python -m benchmarks.micro --save-baseline micro-baseline.json
+    python -m benchmarks.micro --baseline micro-baseline.json   # exit 1 on regression
+
+Baselines are compared on the fastest round, the figure least disturbed
+by other load on the machine.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks import compare_to_baseline, save_baseline, setup_django
+
+
+ROWS = 100
+
+
+class Benchmark:
+    """
+    pytest-benchmark style fixture: benchmark(function, *args) runs the
+    function in timed rounds and returns its result.
+    """
+
+    def __init__(self, rounds=20, min_round_time=0.005):
+        self.rounds = rounds
+        self.min_round_time = min_round_time
+        self.stats = None
+
+    def __call__(self, function, *args, **kwargs):
+        result = function(*args, **kwargs)  # warm up caches and lazy imports
+
+        # Calibrate: enough calls per round to measure reliably
+        calls = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(calls):
+                function(*args, **kwargs)
+            if time.perf_counter() - started >= self.min_round_time or calls >= 10000:
+                break
+            calls *= 2
+
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            for _ in range(calls):
+                function(*args, **kwargs)
+            timings.append((time.perf_counter() - started) / calls)
+        self.stats = {
+            'min_ms': round(min(timings) * 1000, 4),
+            'median_ms': round(statistics.median(timings) * 1000, 4),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 4),
+            'stddev_ms': round(statistics.pstdev(timings) * 1000, 4),
+            'rounds': self.rounds,
+            'calls_per_round': calls,
+        }
+        return result
+
+
+def sample_investors(count=ROWS):
+    """Unsaved investors carrying the with_financials() annotations"""
+    from apps.investors.models import Investor
+
+    rng = random.Random(1)
+    investors = []
+    for index in range(count):
+        investor = Investor(
+            id=index + 1,
+            first_name=f'First{index}',
+            last_name=f'Last{index}',
+            email=f'investor{index}@synthetic.example',
+            phone='+254700000000',
+            investor_type=rng.choice(['LP', 'GP']),
+            share_amount=Decimal(rng.choice([25000, 50000, 100000])),
+            joined_date=date(2024, 1, 1),
+        )
+        investor.total_paid_usd = Decimal(rng.randint(0, 25000))
+        investor.outstanding_usd = investor.share_amount - investor.total_paid_usd
+        investor.has_overdue_payments = rng.random() < 0.2
+        investors.append(investor)
+    return investors
+
+
+def sample_payments(count=ROWS):
+    """Unsaved payments with their investors attached"""
+    from apps.payments.models import Payment
+
+    rng = random.Random(2)
+    investors = sample_investors(10)
+    today = date.today()
+    return [
+        Payment(
+            id=index + 1,
+            investor=investors[index % len(investors)],
+            payment_type='QUARTERLY',
+            amount=Decimal(rng.randint(1000, 1500000)),
+            currency=rng.choice(['USD', 'KES']),
+            payment_status=rng.choice(['VERIFIED', 'PENDING', 'FAILED']),
+            payment_method='BANK_TRANSFER',
+            payment_date=today - timedelta(days=rng.randint(0, 365)),
+            due_date=today - timedelta(days=rng.randint(-90, 180)),
+            reference_number=f'SYN{index:06d}',
+            quarter='Q1 2024',
+        )
+        for index in range(count)
+    ]
+
+
+def use_static_rates():
+    """Serve currency conversions from a fixed rate table instead of the database"""
+    from apps.payments.fx import RateTable, set_rate_table
+    set_rate_table(RateTable([('USD', 'KES', date(2000, 1, 1), Decimal('129'))]))
+
+
+def value_rows(serializer, instances):
+    """values() rows equivalent to a queryset of the instances"""
+    def resolve(value, lookup):
+        for attr in lookup.split('__'):
+            if value is None:
+                return None
+            value = getattr(value, attr)
+        return getattr(value, 'pk', value)
+    return [{lookup: resolve(instance, lookup) for lookup in serializer.lookups()} for instance in instances]
+
+
+# Model properties
+
+def bench_payment_amount_usd(benchmark):
+    payments = sample_payments()
+    benchmark(lambda: [payment.amount_usd for payment in payments])
+
+
+def bench_payment_days_overdue(benchmark):
+    payments = sample_payments()
+    benchmark(lambda: [payment.days_overdue for payment in payments])
+
+
+def bench_investor_completion_percentage(benchmark):
+    investors = sample_investors()
+    benchmark(lambda: [investor.payment_completion_percentage for investor in investors])
+
+
+# Serializers
+
+def bench_payment_list_serializer_instances(benchmark):
+    from apps.payments.serializers import PaymentListSerializer
+    payments = sample_payments()
+    benchmark(lambda: PaymentListSerializer(payments, many=True).data)
+
+
+def bench_payment_list_serializer_values(benchmark):
+    from apps.payments.serializers import PaymentListSerializer
+    serializer = PaymentListSerializer()
+    rows = value_rows(serializer, sample_payments())
+    benchmark(serializer.represent_values, rows)
+
+
+def bench_investor_list_serializer_instances(benchmark):
+    from apps.investors.serializers import InvestorListSerializer
+    investors = sample_investors()
+    benchmark(lambda: InvestorListSerializer(investors, many=True).data)
+
+
+def bench_investor_list_serializer_values(benchmark):
+    from apps.investors.serializers import InvestorListSerializer
+    serializer = InvestorListSerializer()
+    rows = value_rows(serializer, sample_investors())
+    benchmark(serializer.represent_values, rows)
+
+
+# Report renderers
+
+def bench_render_receipt(benchmark):
+    from apps.reports.renderers import render_receipt
+    from benchmarks.render_reports import receipt_context
+    benchmark(render_receipt, receipt_context())
+
+
+def bench_render_statement(benchmark):
+    from apps.reports.renderers import render_statement
+    from benchmarks.render_reports import statement_context
+    benchmark(render_statement, statement_context(40))
+
+
+def cases(keyword=None):
+    return [
+        (name[len('bench_'):], function)
+        for name, function in globals().items()
+        if name.startswith('bench_') and (not keyword or keyword in name)
+    ]
+
+
+def run(keyword=None, rounds=20):
+    results = []
+    for name, function in cases(keyword):
+        benchmark = Benchmark(rounds=rounds)
+        function(benchmark)
+        results.append({'name': name, **benchmark.stats})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='keyword', help='Only run cases whose name contains this')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write results to a baseline file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare with a baseline file; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown fraction (default 0.25)')
+    args = parser.parse_args()
+
+    setup_django()
+    use_static_rates()
+    results = run(args.keyword, args.rounds)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'case':<42}{'median ms':>11}{'min ms':>10}{'stddev':>10}")
+        for result in results:
+            print(f"{result['name']:<42}{result['median_ms']:>11}{result['min_ms']:>10}{result['stddev_ms']:>10}")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, args.baseline, timings=['min_ms'], tolerance=args.tolerance, min_delta=0.05
+        )
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Render micro benchmark for receipts and statements.
+
+Compares rendering with the shared style registry against the previous
+per-request setup (a fresh getSampleStyleSheet() plus every
+ParagraphStyle/TableStyle rebuilt for each document), on synthetic
+contexts so no database is needed.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.render_reports
+    python -m benchmarks.render_reports --iterations 200 --payments 120 --json
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from benchmarks import setup_django
+
+
+def legacy_style_setup():
+    """The style objects each render used to build before the registry"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    built = [
+        ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24,
+                       textColor=colors.HexColor('#1B4965'), spaceAfter=30,
+                       alignment=TA_CENTER, fontName='Helvetica-Bold'),
+        ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=14,
+                       textColor=colors.HexColor('#C9A961'), spaceAfter=12,
+                       fontName='Helvetica-Bold'),
+        ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9,
+                       textColor=colors.grey, alignment=TA_CENTER),
+    ]
+    for _ in range(5):
+        built.append(TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1B4965')),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+    return styles, built
+
+
+def receipt_context():
+    rows = [['Label:', 'Value']] * 4
+    return {
+        'report_type': 'PAYMENT_RECEIPT',
+        'filename': 'receipt_000001_Benchmark.pdf',
+        'receipt_info': [['Receipt Number:', '#000001'], ['Date Issued:', 'March 31, 2024'],
+                         ['Payment Date:', 'March 30, 2024']],
+        'investor_info': rows,
+        'payment_info': rows + [['Verified By:', 'admin']],
+        'amount': [['AMOUNT PAID:', '$12,500.00']],
+        'summary_info': rows,
+        'notes': 'Quarterly payment received by bank transfer.',
+    }
+
+
+def statement_context(payments):
+    return {
+        'report_type': 'INVESTOR_STATEMENT',
+        'filename': 'statement_Benchmark_1.pdf',
+        'investor_info': [['Investor:', 'Ada Benchmark'], ['Email:', 'ada@example.com'],
+                          ['Type:', 'Limited Partner'], ['Joined Date:', 'January 01, 2023'],
+                          ['Statement Date:', 'March 31, 2024']],
+        'summary_info': [['Share Amount:', '$250,000.00'], ['Total Paid:', '$120,000.00'],
+                         ['Outstanding:', '$130,000.00'], ['Completion:', '48.0%']],
+        'payment_rows': [
+            ['2024-03-30', 'Quarterly Payment', '$12,500.00', 'Verified', f'REF-{index:05d}']
+            for index in range(payments)
+        ],
+    }
+
+
+def measure(function, iterations):
+    """Return per-call timings (seconds) and mean allocated bytes per call"""
+    function()  # warm up caches and lazy imports
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    rounds = max(1, iterations // 10)
+    before = tracemalloc.take_snapshot()
+    for _ in range(rounds):
+        function()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    return timings, allocated / rounds
+
+
+def summarize(name, timings, allocated):
+    return {
+        'name': name,
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p95_ms': round(sorted(timings)[int(len(timings) * 0.95) - 1] * 1000, 3),
+        'allocated_kib': round(allocated / 1024, 1),
+    }
+
+
+def run(iterations=100, payments=40):
+    from apps.reports.renderers import render_receipt, render_statement
+
+    receipt = receipt_context()
+    statement = statement_context(payments)
+    cases = [
+        ('style setup (legacy, per request)', legacy_style_setup),
+        ('receipt (registry)', lambda: render_receipt(receipt)),
+        ('receipt (legacy style setup + render)', lambda: (legacy_style_setup(), render_receipt(receipt))),
+        ('statement (registry)', lambda: render_statement(statement)),
+        ('statement (legacy style setup + render)', lambda: (legacy_style_setup(), render_statement(statement))),
+    ]
+    return [summarize(name, *measure(function, iterations)) for name, function in cases]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--payments', type=int, default=40, help='Payment rows per statement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.iterations, args.payments)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<42}{'median ms':>11}{'p95 ms':>10}{'KiB/call':>10}")
+    for result in results:
+        print(f"{result['name']:<42}{result['median_ms']:>11}{result['p95_ms']:>10}{result['allocated_kib']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+List serialization benchmark for payments and investors.
+
+Serializes one large page of the payments list (and the investors list)
+four ways and reports time per page and JSON payload size:
+
+    instances     model instances through the full list serializer
+                  (the list view before sparse fieldsets)
+    values        values() rows through the fast path, all fields
+    sparse .only  instances narrowed with .only() to a table's fields
+    sparse values values() rows for the same fields
+
+Runs against the configured database, so point DATABASE_URL at a
+populated one. Usage (from the backend directory):
+
+    python -m benchmarks.serialize_lists
+    python -m benchmarks.serialize_lists --page-size 500 --repeat 20 --json
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks import setup_django
+
+
+PAYMENT_TABLE_FIELDS = 'id,investor_name,amount,currency,payment_status,payment_date'
+INVESTOR_TABLE_FIELDS = 'id,full_name,share_amount,total_paid,payment_completion_percentage'
+
+
+def fieldset_request(fields=None):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    return Request(APIRequestFactory().get('/', {'fields': fields} if fields else {}))
+
+
+def cases(page_size):
+    from apps.investors.models import Investor
+    from apps.investors.serializers import InvestorListSerializer
+    from apps.payments.models import Payment
+    from apps.payments.serializers import PaymentListSerializer
+
+    payments = Payment.objects.select_related('investor', 'verified_by').order_by('-payment_date', '-created_at')
+    investors = Investor.objects.with_financials().order_by('-created_at')
+
+    def instances(serializer_class, queryset):
+        return lambda: serializer_class(list(queryset[:page_size]), many=True).data
+
+    def values(serializer_class, queryset, fields=None):
+        serializer = serializer_class(context={'request': fieldset_request(fields)})
+        return lambda: serializer.represent_values(queryset.values(*serializer.lookups())[:page_size])
+
+    def narrowed(serializer_class, queryset, fields):
+        context = {'request': fieldset_request(fields)}
+        queryset = serializer_class(context=context).narrow_queryset(queryset)
+        return lambda: serializer_class(list(queryset[:page_size]), many=True, context=context).data
+
+    return [
+        ('payments', 'instances', instances(PaymentListSerializer, payments)),
+        ('payments', 'values', values(PaymentListSerializer, payments)),
+        ('payments', 'sparse .only', narrowed(PaymentListSerializer, payments, PAYMENT_TABLE_FIELDS)),
+        ('payments', 'sparse values', values(PaymentListSerializer, payments, PAYMENT_TABLE_FIELDS)),
+        ('investors', 'instances', instances(InvestorListSerializer, investors)),
+        ('investors', 'values', values(InvestorListSerializer, investors)),
+        ('investors', 'sparse .only', narrowed(InvestorListSerializer, investors, INVESTOR_TABLE_FIELDS)),
+        ('investors', 'sparse values', values(InvestorListSerializer, investors, INVESTOR_TABLE_FIELDS)),
+    ]
+
+
+def run(page_size=500, repeat=10):
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+    results = []
+    for listing, mode, serialize in cases(page_size):
+        payload = renderer.render(serialize())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            renderer.render(serialize())
+            timings.append(time.perf_counter() - started)
+        results.append({
+            'list': listing,
+            'mode': mode,
+            'rows': len(json.loads(payload)),
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'payload_kib': round(len(payload) / 1024, 1),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.page_size, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'list':<11}{'mode':<15}{'rows':>6}{'median ms':>11}{'payload KiB':>13}")
+    for result in results:
+        print(
+            f"{result['list']:<11}{result['mode']:<15}{result['rows']:>6}"
+            f"{result['median_ms']:>11}{result['payload_kib']:>13}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Scaling benchmark for the collections timeline.
+
+Fills a fresh test database with payments in steps (by default 10k,
+100k and 1M rows) and after each step times:
+
+- timeline: collections_timeline_data(), which buckets and sums in SQL
+- timeline by investor type: the same, split into series
+- python loop: the pre-aggregation approach for reference, fetching every
+  verified payment and bucketing it in Python
+
+It also reports how many grouped rows the timeline query hands to
+Python. That number depends only on the date range and the series, not
+on the number of payments; --check exits with status 1 if it grows
+between steps.
+
+Runs against a test database on the configured server. SQLite has no
+native date_trunc, and Django evaluates it with a Python function called
+for each row inside the database. Point DATABASE_URL at PostgreSQL for
+production-like timings. Usage (from the backend directory):
+
+    python -m benchmarks.timeline
+    python -m benchmarks.timeline --steps 10000 100000 --json
+    python -m benchmarks.timeline --steps 1000000 --skip-python-loop --check
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks import setup_django
+
+
+INVESTORS = 1000
+HISTORY_DAYS = 3 * 365
+BATCH_SIZE = 5000
+
+
+def best_of(function, rounds):
+    """Fastest of `rounds` calls, in ms, and the last result"""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(min(timings), 2), result
+
+
+def create_database():
+    """Create an empty test database; returns a function tearing it down"""
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    return lambda: connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed_investors(rng, count):
+    from django.utils import timezone
+    from apps.investors.models import Investor
+    from apps.payments.management.commands.seed_synthetic import synthetic_investors
+
+    today = timezone.now().date()
+    return Investor.objects.bulk_create(synthetic_investors(rng, count, 0, today), batch_size=BATCH_SIZE)
+
+
+def add_payments(rng, investors, count):
+    """Insert count payments spread over HISTORY_DAYS, 70% of them verified"""
+    from django.db import transaction
+    from django.utils import timezone
+    from apps.payments.models import Payment
+
+    today = timezone.now().date()
+    with transaction.atomic():
+        for start in range(0, count, BATCH_SIZE):
+            batch = []
+            for _ in range(min(BATCH_SIZE, count - start)):
+                payment_date = today - timedelta(days=rng.randint(0, HISTORY_DAYS))
+                currency = 'KES' if rng.random() < 0.3 else 'USD'
+                amount = Decimal(rng.randint(100, 50000))
+                batch.append(Payment(
+                    investor=rng.choice(investors),
+                    payment_type='QUARTERLY',
+                    amount=amount * 129 if currency == 'KES' else amount,
+                    currency=currency,
+                    payment_status='VERIFIED' if rng.random() < 0.7 else 'PENDING',
+                    payment_date=payment_date,
+                    due_date=payment_date,
+                ))
+            Payment.objects.bulk_create(batch)
+
+
+def python_loop_timeline(period='monthly'):
+    """Bucket every verified payment in Python (the approach replaced by SQL bucketing)"""
+    from apps.dashboard.timeline import bucket_start
+    from apps.payments.fx import convert
+    from apps.payments.models import Payment
+
+    totals = {}
+    rows = Payment.objects.filter(payment_status='VERIFIED').values_list('payment_date', 'amount', 'currency')
+    for payment_date, amount, currency in rows.iterator(chunk_size=BATCH_SIZE):
+        bucket = bucket_start(payment_date, period)
+        totals[bucket] = totals.get(bucket, Decimal('0')) + convert(amount, currency, 'USD', payment_date)
+    return totals
+
+
+def grouped_rows(group_by=None):
+    """Rows the timeline query returns to Python"""
+    from django.db.models import Sum
+    from django.db.models.functions import TruncMonth
+    from apps.dashboard.timeline import GROUP_BY_FIELDS
+    from apps.payments.models import Payment, usd_amount_expression
+
+    values = ['bucket', GROUP_BY_FIELDS[group_by][0]] if group_by else ['bucket']
+    return Payment.objects.filter(payment_status='VERIFIED').annotate(
+        bucket=TruncMonth('payment_date')
+    ).order_by().values(*values).annotate(total=Sum(usd_amount_expression())).count()
+
+
+def measure(payments, rounds, python_loop=True):
+    from apps.dashboard.timeline import collections_timeline_data
+
+    timeline_ms, _ = best_of(lambda: collections_timeline_data('monthly'), rounds)
+    grouped_ms, _ = best_of(lambda: collections_timeline_data('monthly', group_by='investor_type'), rounds)
+    result = {
+        'payments': payments,
+        'timeline_ms': timeline_ms,
+        'timeline_by_type_ms': grouped_ms,
+        'rows_to_python': grouped_rows(),
+        'rows_to_python_by_type': grouped_rows('investor_type'),
+        'python_loop_ms': None,
+    }
+    if python_loop:
+        result['python_loop_ms'], _ = best_of(python_loop_timeline, max(1, rounds // 2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--steps', type=int, nargs='+', default=[10000, 100000, 1000000],
+        help='Payment counts to measure at, ascending (default 10000 100000 1000000)'
+    )
+    parser.add_argument('--rounds', type=int, default=5, help='Timed calls per case; the fastest counts (default 5)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+    parser.add_argument('--skip-python-loop', action='store_true', help="Don't time the Python reference loop")
+    parser.add_argument('--check', action='store_true', help='Exit 1 if rows returned to Python grow with the payments')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.payments.fx import invalidate
+
+    rng = random.Random(args.seed)
+    teardown = create_database()
+    results = []
+    try:
+        invalidate()
+        investors = seed_investors(rng, INVESTORS)
+        seeded = 0
+        for step in sorted(args.steps):
+            add_payments(rng, investors, step - seeded)
+            seeded = step
+            results.append(measure(step, args.rounds, not args.skip_python_loop))
+            if not args.json:
+                print(f'measured {step} payments', file=sys.stderr)
+    finally:
+        teardown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'payments':>10}{'timeline ms':>13}{'by type ms':>12}{'rows':>7}{'rows/type':>11}{'python ms':>11}")
+        for result in results:
+            python_ms = result['python_loop_ms'] if result['python_loop_ms'] is not None else '-'
+            print(
+                f"{result['payments']:>10}{result['timeline_ms']:>13}{result['timeline_by_type_ms']:>12}"
+                f"{result['rows_to_python']:>7}{result['rows_to_python_by_type']:>11}{python_ms:>11}"
+            )
+
+    if args.check:
+        growing = [
+            result['payments'] for previous, result in zip(results, results[1:])
+            if result['rows_to_python'] > previous['rows_to_python']
+            or result['rows_to_python_by_type'] > previous['rows_to_python_by_type']
+        ]
+        if growing:
+            print(f'REGRESSION rows returned to Python grew at {growing} payments', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.common.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -88,6 +89,59 @@ DATABASES = {
     )
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The cache must be shared by all gunicorn workers so that a write handled
+# by one worker invalidates the dashboard for the others: a file-based cache
+# by default, Redis when REDIS_URL is set (requires the redis package).
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        }
+    }
+
+# Dashboard response cache
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+# Threads (and database connections) per process rendering /api/dashboard/bundle/ sections
+DASHBOARD_BUNDLE_WORKERS = config('DASHBOARD_BUNDLE_WORKERS', default=6, cast=int)
+
+# Live updates at /api/dashboard/events/ (apps.dashboard.events). The
+# backend fans events out to every server process: 'local' (one process),
+# 'file' (DASHBOARD_EVENTS_FILE) or 'postgres' (LISTEN/NOTIFY)
+DASHBOARD_EVENTS_BACKEND = config('DASHBOARD_EVENTS_BACKEND', default='local')
+DASHBOARD_EVENTS_FILE = config('DASHBOARD_EVENTS_FILE', default=str(BASE_DIR / 'events' / 'events.log'))
+DASHBOARD_EVENTS_KPI_INTERVAL = config('DASHBOARD_EVENTS_KPI_INTERVAL', default=2.0, cast=float)  # seconds
+DASHBOARD_EVENTS_KEEPALIVE = config('DASHBOARD_EVENTS_KEEPALIVE', default=15, cast=int)  # seconds
+DASHBOARD_EVENTS_MAX_AGE = config('DASHBOARD_EVENTS_MAX_AGE', default=300, cast=int)  # seconds
+DASHBOARD_EVENTS_RETRY_MS = config('DASHBOARD_EVENTS_RETRY_MS', default=3000, cast=int)
+# Seconds a stream ticket from /api/dashboard/events/ticket/ can be used to connect
+DASHBOARD_EVENTS_TICKET_MAX_AGE = config('DASHBOARD_EVENTS_TICKET_MAX_AGE', default=30, cast=int)
+
+# Seconds a process may use its cached FX rates before checking whether
+# another process changed them (apps.payments.fx)
+FX_RATES_CHECK_INTERVAL = config('FX_RATES_CHECK_INTERVAL', default=5.0, cast=float)
+
+# Request metrics (apps.common.metrics), served at /api/dashboard/metrics/
+# METRICS_DIR shares the totals of all gunicorn workers through files; when
+# empty each process only reports its own requests
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float)  # seconds
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=1000, cast=int)
+METRICS_REPEATED_QUERY_THRESHOLD = config('METRICS_REPEATED_QUERY_THRESHOLD', default=10, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -125,6 +179,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Background report rendering (python manage.py run_report_worker)
+REPORT_WORKER_CONCURRENCY = config('REPORT_WORKER_CONCURRENCY', default=2, cast=int)
+REPORT_WORKER_POLL_INTERVAL = config('REPORT_WORKER_POLL_INTERVAL', default=1.0, cast=float)
+REPORT_JOB_TIMEOUT = config('REPORT_JOB_TIMEOUT', default=300, cast=int)  # seconds before a RUNNING job is requeued
+REPORT_JOB_MAX_ATTEMPTS = config('REPORT_JOB_MAX_ATTEMPTS', default=3, cast=int)
+REPORT_BATCH_WORKERS = config('REPORT_BATCH_WORKERS', default=0, cast=int)  # generate_statements processes; 0 = one per CPU
+REPORT_MERGED_PDF_MAX_STATEMENTS = config('REPORT_MERGED_PDF_MAX_STATEMENTS', default=500, cast=int)  # merged PDFs are built in memory
+
+# Rendered PDF cache (content-addressed, least recently used files evicted)
+REPORT_CACHE_DIR = config('REPORT_CACHE_DIR', default=str(BASE_DIR / 'report_cache'))
+REPORT_CACHE_MAX_BYTES = config('REPORT_CACHE_MAX_BYTES', default=256 * 1024 * 1024, cast=int)
+
 # File Upload Settings
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
@@ -11,6 +11,14 @@ INSTALLED_APPS += [
     'django_extensions',
 ]
 
+# Single runserver process, so an in-memory cache is enough
+if not REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Email backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -24,6 +24,12 @@ SECURE_HSTS_SECONDS = 31536000 if _ssl_enabled else 0
 SECURE_HSTS_INCLUDE_SUBDOMAINS = _ssl_enabled
 SECURE_HSTS_PRELOAD = _ssl_enabled
 
+# Share request metrics across the gunicorn workers
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / 'metrics'))
+
+# Fan live dashboard events out to all workers through the database
+DASHBOARD_EVENTS_BACKEND = config('DASHBOARD_EVENTS_BACKEND', default='postgres')
+
 # Production logging
 LOGGING = {
     'version': 1,
@@ -8,12 +8,34 @@ while ! nc -z db 5432; do
 done
 echo "PostgreSQL started"
 
+# Auxiliary containers (e.g. the report worker) pass their own command
+if [ "$#" -gt 0 ]; then
+  exec "$@"
+fi
+
 echo "Running migrations..."
 python manage.py migrate --noinput
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Request metrics are per server run; drop the previous run's worker files
+rm -rf "${METRICS_DIR:-/app/metrics}"
+
+# SERVER_MODE=asgi runs uvicorn workers under gunicorn, so async views
+# (e.g. /api/dashboard/bundle/, the /api/dashboard/events/ stream) don't
+# hold a worker while they wait
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  echo "Starting Gunicorn with Uvicorn workers..."
+  exec gunicorn config.asgi:application \
+      --worker-class uvicorn.workers.UvicornWorker \
+      --bind 0.0.0.0:8000 \
+      --workers 3 \
+      --timeout 120 \
+      --access-logfile - \
+      --error-logfile -
+fi
+
 echo "Starting Gunicorn..."
 exec gunicorn config.wsgi:application \
     --bind 0.0.0.0:8000 \
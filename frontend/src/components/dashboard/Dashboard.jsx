@@ -37,6 +37,19 @@ import StatCard from '../common/StatCard';
 import { dashboardService } from '../../services/dashboardService';
 import { formatCurrency, formatKES, formatDate, formatPercent, getStatusColor } from '../../utils/formatters';
 
+// Live events after which the charts and tables are reloaded
+const REFRESH_EVENTS = [
+  'payment.created',
+  'payment.updated',
+  'payment.verified',
+  'payment.failed',
+  'payment.deleted',
+  'payments.changed',
+  'investor.changed',
+  'investor.deleted',
+  'resync',
+];
+
 const COLORS = {
   verified: '#4caf50',
   pending: '#ff9800',
@@ -57,24 +70,78 @@ const Dashboard = () => {
     fetchDashboardData();
   }, []);
 
-  const fetchDashboardData = async () => {
+  // Live updates: KPI deltas are applied as they arrive; other changes
+  // reload the dashboard, debounced so a burst of writes costs one request
+  useEffect(() => {
+    let source;
+    let opened = false;
+    let closed = false;
+    let refreshTimer;
+    let reconnectTimer;
+
+    const refresh = () => {
+      clearTimeout(refreshTimer);
+      refreshTimer = setTimeout(() => fetchDashboardData({ silent: true }), 1000);
+    };
+
+    const connect = async () => {
+      try {
+        source = await dashboardService.openEvents();
+      } catch (err) {
+        if (!closed) {
+          reconnectTimer = setTimeout(connect, 5000);
+        }
+        return;
+      }
+      if (closed) {
+        source.close();
+        return;
+      }
+      source.onopen = () => {
+        // Catch up on anything missed while reconnecting
+        if (opened) {
+          refresh();
+        }
+        opened = true;
+      };
+      source.addEventListener('kpis', (event) => {
+        const changed = JSON.parse(event.data);
+        setOverview((current) => (current ? { ...current, ...changed } : current));
+      });
+      REFRESH_EVENTS.forEach((name) => source.addEventListener(name, refresh));
+      source.onerror = () => {
+        // The stream's ticket has expired by the time the browser would
+        // retry the same URL: reconnect with a new ticket instead
+        source.close();
+        reconnectTimer = setTimeout(connect, 3000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (source) {
+        source.close();
+      }
+      clearTimeout(refreshTimer);
+      clearTimeout(reconnectTimer);
+    };
+  }, []);
+
+  const fetchDashboardData = async ({ silent = false } = {}) => {
     try {
-      setLoading(true);
+      if (!silent) {
+        setLoading(true);
+      }
       setError(null);
 
-      const [overviewRes, timelineRes, statusRes, overdueRes, activityRes] = await Promise.all([
-        dashboardService.getOverview(),
-        dashboardService.getCollectionsTimeline('monthly'),
-        dashboardService.getPaymentStatus(),
-        dashboardService.getOverdueInvestors(),
-        dashboardService.getRecentActivity(),
-      ]);
+      const { data } = await dashboardService.getBundle({ period: 'monthly', overdue_page_size: 5 });
 
-      setOverview(overviewRes.data);
-      setTimeline(timelineRes.data);
-      setPaymentStatus(statusRes.data);
-      setOverdueInvestors(overdueRes.data);
-      setRecentActivity(activityRes.data);
+      setOverview(data.overview);
+      setTimeline(data.collections_timeline);
+      setPaymentStatus(data.payment_status);
+      setOverdueInvestors(data.overdue_investors.results);
+      setRecentActivity(data.recent_activity);
     } catch (err) {
       setError('Failed to load dashboard data. Please try again.');
       console.error('Dashboard error:', err);
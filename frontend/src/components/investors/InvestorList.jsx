@@ -35,9 +35,11 @@ import {
   Refresh as RefreshIcon,
   Add as AddIcon,
   Search as SearchIcon,
+  Download as DownloadIcon,
 } from '@mui/icons-material';
 import { investorService } from '../../services/investorService';
 import { formatCurrency, formatKES } from '../../utils/formatters';
+import { saveBlob, exportFilename } from '../../utils/download';
 
 const InvestorList = () => {
   const [investors, setInvestors] = useState([]);
@@ -84,6 +86,16 @@ const InvestorList = () => {
     }
   };
 
+  const handleExport = async () => {
+    try {
+      const response = await investorService.export(searchQuery ? { search: searchQuery } : {});
+      saveBlob(response.data, exportFilename('investors', 'xlsx'));
+    } catch (err) {
+      console.error('Error exporting investors:', err);
+      setSnackbar({ open: true, message: 'Failed to export investors. Please try again.', severity: 'error' });
+    }
+  };
+
   // --- Delete Handlers ---
   const handleDeleteClick = (investor) => {
     setInvestorToDelete(investor);
@@ -278,6 +290,14 @@ const InvestorList = () => {
           Investors
         </Typography>
         <Box sx={{ display: 'flex', gap: 2 }}>
+          <Button
+            variant="outlined"
+            startIcon={<DownloadIcon />}
+            onClick={handleExport}
+            sx={{ borderColor: '#C9A961', color: '#C9A961' }}
+          >
+            Export
+          </Button>
           <Button
             variant="outlined"
             startIcon={<RefreshIcon />}
@@ -33,7 +33,9 @@ import {
 } from '@mui/icons-material';
 import { paymentService } from '../../services/paymentService';
 import { investorService } from '../../services/investorService';
+import { reportService } from '../../services/reportService';
 import { formatCurrency, formatDate, getStatusColor } from '../../utils/formatters';
+import { saveBlob, exportFilename } from '../../utils/download';
 import { useAuth } from '../../contexts/AuthContext';
 
 const PaymentList = () => {
@@ -85,37 +87,25 @@ const PaymentList = () => {
     }
   };
 
-  const downloadReceipt = async (paymentId, investorName) => {
+  const downloadReceipt = async (paymentId) => {
     try {
-      const token = localStorage.getItem('accessToken');
-      const response = await fetch(
-        `http://localhost:8000/api/reports/payment-receipt/${paymentId}/`,
-        {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!response.ok) {
-        throw new Error('Failed to download receipt');
-      }
-
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement('a');
-      a.href = url;
-      a.download = `receipt_${paymentId}_${investorName}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
+      await reportService.generate('PAYMENT_RECEIPT', paymentId);
     } catch (err) {
       console.error('Error downloading receipt:', err);
       alert('Failed to download receipt. Please try again.');
     }
   };
 
+  const handleExport = async () => {
+    try {
+      const response = await paymentService.export();
+      saveBlob(response.data, exportFilename('payments', 'xlsx'));
+    } catch (err) {
+      console.error('Error exporting payments:', err);
+      setSnackbar({ open: true, message: 'Failed to export payments. Please try again.', severity: 'error' });
+    }
+  };
+
   // --- Verify Handlers ---
   const handleVerifyClick = (payment) => {
     setPaymentToVerify(payment);
@@ -271,6 +261,14 @@ const PaymentList = () => {
           Payments
         </Typography>
         <Box sx={{ display: 'flex', gap: 2 }}>
+          <Button
+            variant="outlined"
+            startIcon={<DownloadIcon />}
+            onClick={handleExport}
+            sx={{ borderColor: '#C9A961', color: '#C9A961' }}
+          >
+            Export
+          </Button>
           <Button
             variant="outlined"
             startIcon={<RefreshIcon />}
@@ -375,7 +373,7 @@ const PaymentList = () => {
                     <TableCell align="center">
                       <Tooltip title="Download Receipt">
                         <IconButton
-                          onClick={() => downloadReceipt(payment.id, payment.investor_name)}
+                          onClick={() => downloadReceipt(payment.id)}
                           sx={{ color: '#C9A961' }}
                           size="small"
                         >
@@ -20,6 +20,7 @@ import {
 } from '@mui/icons-material';
 import { investorService } from '../../services/investorService';
 import { paymentService } from '../../services/paymentService';
+import { reportService } from '../../services/reportService';
 
 const Reports = () => {
   const [investors, setInvestors] = useState([]);
@@ -58,31 +59,7 @@ const Reports = () => {
 
     try {
       setDownloadingStatement(true);
-      const investor = investors.find((inv) => inv.id === selectedInvestor);
-      const token = localStorage.getItem('accessToken');
-
-      const response = await fetch(
-        `http://localhost:8000/api/reports/investor-statement/${selectedInvestor}/`,
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!response.ok) {
-        throw new Error('Failed to download statement');
-      }
-
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement('a');
-      a.href = url;
-      a.download = `statement_${investor.last_name}_${investor.id}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
+      await reportService.generate('INVESTOR_STATEMENT', selectedInvestor);
     } catch (err) {
       console.error('Error downloading statement:', err);
       alert('Failed to download statement. Please try again.');
@@ -96,31 +73,7 @@ const Reports = () => {
 
     try {
       setDownloadingReceipt(true);
-      const payment = payments.find((pmt) => pmt.id === selectedPayment);
-      const token = localStorage.getItem('accessToken');
-
-      const response = await fetch(
-        `http://localhost:8000/api/reports/payment-receipt/${selectedPayment}/`,
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!response.ok) {
-        throw new Error('Failed to download receipt');
-      }
-
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement('a');
-      a.href = url;
-      a.download = `receipt_${selectedPayment}_${payment.investor_name}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
+      await reportService.generate('PAYMENT_RECEIPT', selectedPayment);
     } catch (err) {
       console.error('Error downloading receipt:', err);
       alert('Failed to download receipt. Please try again.');
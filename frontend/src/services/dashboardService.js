@@ -1,6 +1,28 @@
 import api from './api';
 
 export const dashboardService = {
+  /**
+   * Get every dashboard section in one request
+   * @param {object} params - period, overdue_page_size, top_by
+   */
+  getBundle: (params = {}) => {
+    return api.get('/dashboard/bundle/', {
+      params,
+    });
+  },
+
+  /**
+   * Open the live updates stream (server-sent events)
+   * EventSource can't send headers, so the URL carries a short-lived
+   * stream ticket instead of the access token
+   * @returns {Promise<EventSource>}
+   */
+  openEvents: async () => {
+    const response = await api.post('/dashboard/events/ticket/');
+    const ticket = encodeURIComponent(response.data.ticket);
+    return new EventSource(`${api.defaults.baseURL}/dashboard/events/?ticket=${ticket}`);
+  },
+
   /**
    * Get dashboard overview with KPIs
    */
@@ -10,7 +32,7 @@ export const dashboardService = {
 
   /**
    * Get collections timeline data for charts
-   * @param {string} period - 'monthly', 'weekly', or 'quarterly'
+   * @param {string} period - 'monthly', 'daily', 'weekly', or 'quarterly'
    */
   getCollectionsTimeline: (period = 'monthly') => {
     return api.get('/dashboard/collections-timeline/', {
@@ -18,6 +40,16 @@ export const dashboardService = {
     });
   },
 
+  /**
+   * Get KPI history from the daily/monthly snapshots
+   * @param {object} params - period ('monthly' or 'daily'), metric, start, end
+   */
+  getTrends: (params = {}) => {
+    return api.get('/dashboard/trends/', {
+      params,
+    });
+  },
+
   /**
    * Get payment status distribution for pie chart
    */
@@ -26,10 +58,13 @@ export const dashboardService = {
   },
 
   /**
-   * Get list of investors with overdue payments
+   * Get list of investors with overdue payments (cursor-paginated)
+   * @param {object} params - page_size, cursor, min_days, min_amount
    */
-  getOverdueInvestors: () => {
-    return api.get('/dashboard/overdue-investors/');
+  getOverdueInvestors: (params = {}) => {
+    return api.get('/dashboard/overdue-investors/', {
+      params,
+    });
   },
 
   /**
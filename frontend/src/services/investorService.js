@@ -56,6 +56,18 @@ export const investorService = {
   getPayments: (id, params = {}) => {
     return api.get(`/investors/${id}/payments/`, { params });
   },
+
+  /**
+   * Download investors matching the list filters as a spreadsheet Blob
+   * @param {Object} params - List filters, search and ordering
+   * @param {string} output - 'csv' or 'xlsx'
+   */
+  export: (params = {}, output = 'xlsx') => {
+    return api.get('/investors/export/', {
+      params: { ...params, output },
+      responseType: 'blob',
+    });
+  },
 };
 
 export default investorService;
@@ -73,6 +73,18 @@ export const paymentService = {
   getOverdue: () => {
     return api.get('/payments/overdue/');
   },
+
+  /**
+   * Download payments matching the list filters as a spreadsheet Blob
+   * @param {Object} params - List filters, search and ordering
+   * @param {string} output - 'csv' or 'xlsx'
+   */
+  export: (params = {}, output = 'xlsx') => {
+    return api.get('/payments/export/', {
+      params: { ...params, output },
+      responseType: 'blob',
+    });
+  },
 };
 
 export default paymentService;
@@ -0,0 +1,63 @@
+import api from './api';
+import { saveBlob } from '../utils/download';
+
+const POLL_INTERVAL_MS = 1000;
+const MAX_POLLS = 300;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const reportService = {
+  /**
+   * Queue a PDF report (identical pending requests share one job)
+   * @param {string} reportType - 'PAYMENT_RECEIPT' or 'INVESTOR_STATEMENT'
+   * @param {number} objectId - Payment id or investor id
+   */
+  createJob: (reportType, objectId) => {
+    return api.post('/reports/jobs/', {
+      report_type: reportType,
+      object_id: objectId,
+    });
+  },
+
+  /**
+   * Get report job status
+   */
+  getJob: (id) => {
+    return api.get(`/reports/jobs/${id}/`);
+  },
+
+  /**
+   * Download the PDF of a completed job as a Blob
+   */
+  downloadJob: (id) => {
+    return api.get(`/reports/jobs/${id}/download/`, {
+      responseType: 'blob',
+    });
+  },
+
+  /**
+   * Queue a report, wait until the worker has rendered it and save the PDF
+   * @param {string} reportType - 'PAYMENT_RECEIPT' or 'INVESTOR_STATEMENT'
+   * @param {number} objectId - Payment id or investor id
+   */
+  generate: async (reportType, objectId) => {
+    let { data: job } = await reportService.createJob(reportType, objectId);
+
+    for (let poll = 0; job.status !== 'COMPLETED'; poll += 1) {
+      if (job.status === 'FAILED') {
+        throw new Error(job.error || 'Report generation failed');
+      }
+      if (poll >= MAX_POLLS) {
+        throw new Error('Report generation timed out');
+      }
+      await sleep(POLL_INTERVAL_MS);
+      ({ data: job } = await reportService.getJob(job.id));
+    }
+
+    const response = await reportService.downloadJob(job.id);
+    saveBlob(response.data, job.filename);
+    return job;
+  },
+};
+
+export default reportService;
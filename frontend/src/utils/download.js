@@ -0,0 +1,22 @@
+/**
+ * Save a Blob (e.g. an axios `responseType: 'blob'` response) as a file
+ * @param {Blob} blob - File contents
+ * @param {string} filename - Suggested file name
+ */
+export const saveBlob = (blob, filename) => {
+  const url = window.URL.createObjectURL(blob);
+  const a = document.createElement('a');
+  a.href = url;
+  a.download = filename;
+  document.body.appendChild(a);
+  a.click();
+  window.URL.revokeObjectURL(url);
+  document.body.removeChild(a);
+};
+
+/**
+ * File name for a dated export, e.g. investors_2024-03-31.xlsx
+ */
+export const exportFilename = (name, output) => {
+  return `${name}_${new Date().toISOString().slice(0, 10)}.${output}`;
+};